@@ -0,0 +1,146 @@
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models.query import FlatValuesListIterable, ModelIterable, ValuesIterable, ValuesListIterable
+
+from .instrumentation_middleware import get_request_metrics
+
+if TYPE_CHECKING:
+    import asyncpg
+
+# (event loop, database alias) -> task creating the pool, a pool can only be used from its own loop
+_pools = {}
+
+_PLACEHOLDER_RE = re.compile(r'%(s|%)')
+
+
+def _get_connect_kwargs(alias: str) -> dict:
+    settings_dict = connections[alias].settings_dict
+    options = settings_dict['OPTIONS']
+    kwargs = {
+        'database': settings_dict['NAME'],
+        'user': settings_dict['USER'] or None,
+        'password': settings_dict['PASSWORD'] or None,
+        'host': settings_dict['HOST'] or None,
+        'port': settings_dict['PORT'] or None,
+    }
+    if 'sslmode' in options:
+        kwargs['ssl'] = options['sslmode']
+    if 'connect_timeout' in options:
+        kwargs['timeout'] = float(options['connect_timeout'])
+
+    return kwargs
+
+
+async def _create_pool(alias: str) -> 'asyncpg.Pool':
+    # imported with the first pool, so WSGI workers that never serve the async API do not load it
+    import asyncpg
+
+    return await asyncpg.create_pool(
+        min_size=settings.ASYNC_DB_POOL_MIN_SIZE,
+        max_size=settings.ASYNC_DB_POOL_MAX_SIZE,
+        max_inactive_connection_lifetime=settings.ASYNC_DB_POOL_MAX_IDLE,
+        **_get_connect_kwargs(alias)
+    )
+
+
+async def get_pool(alias: str = 'default') -> 'asyncpg.Pool':
+    """Connection pool of the running event loop, created on first use"""
+    loop = asyncio.get_event_loop()
+    key = (loop, alias)
+    task = _pools.get(key)
+    if task is None:
+        # loops of requests served outside of ASGI end with the request
+        for closed_key in [closed_key for closed_key in _pools if closed_key[0].is_closed()]:
+            del _pools[closed_key]
+        # concurrent first requests wait for the same pool
+        task = _pools[key] = asyncio.ensure_future(_create_pool(alias))
+
+    try:
+        return await task
+    except Exception:
+        _pools.pop(key, None)
+        raise
+
+
+async def close_pool() -> None:
+    """Close the pools of the running event loop"""
+    loop = asyncio.get_event_loop()
+    for key in [key for key in _pools if key[0] is loop]:
+        task = _pools.pop(key)
+        if task.done() and task.exception() is None:
+            await task.result().close()
+
+
+def _to_asyncpg_sql(sql: str) -> str:
+    # Django emits psycopg2 placeholders, asyncpg expects numbered ones
+    numbers = iter(range(1, sql.count('%s') + 1))
+    return _PLACEHOLDER_RE.sub(lambda match: '${number}'.format(number=next(numbers)) if match.group(1) == 's' else '%',
+                               sql)
+
+
+async def execute_sql(sql: str, params=(), using: str = 'default') -> list:
+    """Run SQL with psycopg2 style placeholders and return its records"""
+    pool = await get_pool(using)
+    metrics = get_request_metrics()
+    start = time.perf_counter()
+    try:
+        return await pool.fetch(_to_asyncpg_sql(sql), *params)
+    finally:
+        # same accounting as the connection.execute_wrapper of the instrumentation middleware
+        if metrics is not None:
+            metrics.db += time.perf_counter() - start
+            metrics.queries += 1
+
+
+def _compile(queryset):
+    try:
+        return queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+
+
+async def fetch(queryset) -> list:
+    """
+    Evaluate a queryset through the pool of the running event loop.
+    Returns what list(queryset) would: dicts for values(), tuples or flat values for values_list()
+    and model instances, without select_related(), otherwise
+    """
+    compiled = _compile(queryset)
+    if compiled is None:
+        return []
+
+    records = await execute_sql(*compiled, using=queryset.db)
+
+    iterable_class = queryset._iterable_class
+    if iterable_class is FlatValuesListIterable:
+        return [record[0] for record in records]
+    if iterable_class is ValuesListIterable:
+        return [tuple(record) for record in records]
+
+    query = queryset.query
+    if iterable_class is ValuesIterable:
+        names = [*query.extra_select, *query.values_select, *query.annotation_select]
+        return [dict(zip(names, record)) for record in records]
+
+    if iterable_class is not ModelIterable or query.select_related or query.deferred_loading[0]:
+        raise ValueError('Only values(), values_list() and plain model querysets can be fetched')
+
+    model = queryset.model
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    return [model.from_db(queryset.db, attnames, tuple(record)) for record in records]
+
+
+async def count(queryset) -> int:
+    compiled = _compile(queryset.order_by().values('pk'))
+    if compiled is None:
+        return 0
+
+    sql, params = compiled
+    records = await execute_sql('SELECT COUNT(*) FROM ({sql}) subquery'.format(sql=sql), params, using=queryset.db)
+    return records[0][0]
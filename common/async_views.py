@@ -0,0 +1,129 @@
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import async_db
+from .authentications import CachedTokenAuthentication
+from .compiled_serializers import compile_serializer
+from .exceptions import AuthenticationException
+from .instrumentation_middleware import timed
+from .metrics import AUTH_TOKEN_CACHE_HITS, AUTH_TOKEN_CACHE_MISSES, AUTH_TOKEN_CACHE_SIZE
+from .mixins import CompiledListMixin
+from .pagination import GeneralPagination
+from .shared_versions import get_shared_version_async
+
+
+class AsyncTokenAuthentication(CachedTokenAuthentication):
+    """
+    CachedTokenAuthentication for async views, sharing its cache.
+    A cache miss is looked up through the async connection pool
+    """
+
+    async def authenticate_async(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.'))
+
+        return await self.authenticate_credentials_async(key)
+
+    async def authenticate_credentials_async(self, key):
+        version = await get_shared_version_async(self.shared_version)
+        credentials = self.cache.get(key, version=version)
+        if credentials is not None:
+            AUTH_TOKEN_CACHE_HITS.inc()
+            return credentials
+
+        AUTH_TOKEN_CACHE_MISSES.inc()
+
+        model = self.get_model()
+        tokens = await async_db.fetch(model.objects.filter(key=key))
+        if not tokens:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        token = tokens[0]
+        users = await async_db.fetch(get_user_model().objects.filter(pk=token.user_id, is_active=True))
+        if not users:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        token.user = users[0]
+        credentials = (token.user, token)
+        self.cache.set(key, credentials, version=version)
+        AUTH_TOKEN_CACHE_SIZE.set(len(self.cache))
+
+        return credentials
+
+
+def async_api_view(view):
+    """
+    Read-only async view authenticated by token like the v1 API.
+    Requests not served by ASGI run in an event loop of their own, so its connection pool is closed with them
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(('GET', 'HEAD'))
+
+        try:
+            try:
+                credentials = await AsyncTokenAuthentication().authenticate_async(request)
+            except exceptions.AuthenticationFailed as exc:
+                raise AuthenticationException(str(exc.detail))
+            if credentials is None:
+                raise AuthenticationException(str(exceptions.NotAuthenticated.default_detail))
+
+            request.user, request.auth = credentials
+            return await view(request, *args, **kwargs)
+        finally:
+            if not isinstance(request, ASGIRequest):
+                await async_db.close_pool()
+
+    return wrapper
+
+
+def render_json(data, status: int = 200) -> HttpResponse:
+    """The bytes the v1 API renders for the same data"""
+    with timed('serialize'):
+        content = JSONRenderer().render(data)
+    return HttpResponse(content, status=status, content_type='application/json')
+
+
+async def render_list(request, queryset, serializer_class, pagination_class=GeneralPagination) -> HttpResponse:
+    """CompiledListMixin.list() for async views"""
+    compiled_serializer = compile_serializer(serializer_class)
+    fields = dict.fromkeys(compiled_serializer.fields + CompiledListMixin.compiled_list_extra_fields)
+    queryset = queryset.values(*fields)
+
+    paginator = pagination_class()
+    page = await paginator.paginate_queryset_async(queryset, Request(request))
+    if page is not None:
+        with timed('serialize'):
+            data = compiled_serializer.render_many(page)
+        return render_json(paginator.get_paginated_data(data))
+
+    rows = await async_db.fetch(queryset)
+    with timed('serialize'):
+        data = compiled_serializer.render_many(rows)
+    return render_json(data)
+
+
+def render_object(row: dict, serializer_class) -> HttpResponse:
+    with timed('serialize'):
+        data = compile_serializer(serializer_class)(row)
+    return render_json(data)
@@ -1,4 +1,11 @@
-from rest_framework.authentication import SessionAuthentication
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+
+from .cache import LRUCache
+from .metrics import AUTH_TOKEN_CACHE_HITS, AUTH_TOKEN_CACHE_MISSES, AUTH_TOKEN_CACHE_SIZE
+from .shared_versions import get_shared_version
 
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
@@ -12,3 +19,40 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
 
     def enforce_csrf(self, request):
         return
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in TokenAuthentication that keeps
+    token -> (user, token) in a per-process LRU cache for AUTH_TOKEN_CACHE_TTL.
+    Entries are cached with the auth_tokens shared version, so a token deleted
+    or a user deactivated, given another role or password by any worker is looked up again
+    """
+
+    cache = LRUCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+    shared_version = 'auth_tokens'
+
+    def authenticate_credentials(self, key):
+        # read before the lookup, a change made meanwhile leaves the entry stale
+        version = get_shared_version(self.shared_version)
+        credentials = self.cache.get(key, version=version)
+        if credentials is not None:
+            AUTH_TOKEN_CACHE_HITS.inc()
+            return credentials
+
+        AUTH_TOKEN_CACHE_MISSES.inc()
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user__role').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        credentials = (token.user, token)
+        self.cache.set(key, credentials, version=version)
+        AUTH_TOKEN_CACHE_SIZE.set(len(self.cache))
+
+        return credentials
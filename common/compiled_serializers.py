@@ -0,0 +1,92 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# to_representation of these fields returns database values unchanged
+_PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+def _iso_datetime(value, tz):
+    """DateTimeField.to_representation for ISO 8601 output with the timezone resolved once per call"""
+    if tz is not None and value.tzinfo is not tz:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _is_iso_datetime_field(field) -> bool:
+    return (
+        type(field) is serializers.DateTimeField and
+        not hasattr(field, 'timezone') and
+        (getattr(field, 'format', api_settings.DATETIME_FORMAT) or '').lower() == ISO_8601
+    )
+
+
+class CompiledSerializer:
+    """
+    Read-only renderer generated from a serializer class.
+    Turns a values() row into the same dict the serializer would produce for the model instance
+    without per-field dispatch
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.fields = []
+        namespace = {'_iso_datetime': _iso_datetime}
+        expression = self._compile(serializer_class(), '', namespace)
+
+        source = 'def render(row, tz):\n    return {expression}\n'.format(expression=expression)
+        exec(compile(source, '<compiled {name}>'.format(name=serializer_class.__name__), 'exec'), namespace)
+
+        self.fields = tuple(dict.fromkeys(self.fields))
+        self.render = namespace['render']
+
+    def _compile(self, serializer, prefix: str, namespace: dict) -> str:
+        items = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or getattr(field, 'many', False):
+                raise ValueError('{serializer}.{field} can not be compiled'.format(
+                    serializer=serializer.__class__.__name__, field=name))
+
+            key = prefix + field.source.replace('.', '__')
+            self.fields.append(key)
+
+            if isinstance(field, serializers.BaseSerializer):
+                value = self._compile(field, key + '__', namespace)
+            elif type(field) in _PASSTHROUGH_FIELDS:
+                value = 'row[{key!r}]'.format(key=key)
+            elif _is_iso_datetime_field(field) and settings.USE_TZ:
+                value = '_iso_datetime(row[{key!r}], tz)'.format(key=key)
+            else:
+                converter = '_to_representation_{index}'.format(index=len(namespace))
+                namespace[converter] = field.to_representation
+                value = '{converter}(row[{key!r}])'.format(converter=converter, key=key)
+
+            items.append('{name!r}: (None if row[{key!r}] is None else {value})'.format(
+                name=name, key=key, value=value))
+
+        return '{' + ', '.join(items) + '}'
+
+    @staticmethod
+    def _get_timezone():
+        return timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def __call__(self, row: dict) -> dict:
+        return self.render(row, self._get_timezone())
+
+    def render_many(self, rows) -> list:
+        render = self.render
+        tz = self._get_timezone()
+        return [render(row, tz) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class) -> CompiledSerializer:
+    return CompiledSerializer(serializer_class)
@@ -0,0 +1,63 @@
+import psycopg2.extras
+from django.conf import settings
+from django.db.backends.postgresql import base, creation
+
+from common.metrics import pool_observer
+from .pool import ConnectionPool, close_pools, get_pool
+
+
+def _connect(conn_params: dict):
+    connection = psycopg2.connect(**conn_params)
+    # same as the PostgreSQL backend, jsonb is decoded by JSONField
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda value: value)
+    return connection
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # pooled connections to the test database would block DROP DATABASE
+        close_pools(database=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that takes connections from a per-process pool and returns them on close(),
+    so a request reuses a warm connection instead of opening one
+    """
+
+    creation_class = DatabaseCreation
+
+    _pool = None
+
+    def get_pool(self, conn_params: dict = None) -> ConnectionPool:
+        conn_params = conn_params if conn_params is not None else self.get_connection_params()
+        return get_pool(
+            conn_params,
+            connect=lambda: _connect(conn_params),
+            max_size=settings.DB_POOL_MAX_SIZE,
+            max_age=settings.DB_POOL_MAX_AGE,
+            health_check_interval=settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+            timeout=settings.DB_POOL_TIMEOUT,
+            observer=pool_observer(self.alias),
+        )
+
+    def get_new_connection(self, conn_params):
+        self._pool = self.get_pool(conn_params)
+        connection = self._pool.getconn()
+
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.putconn(self.connection)
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+# connection parameters -> pool, shared by every thread of the process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Bounded thread-safe pool of open psycopg2 connections of one process.
+    Idle connections are checked before reuse and reopened once they are max_age seconds old.
+    `observer(pool, event)` is called after every change: one of EVENTS, `returned` or `closed`
+    """
+
+    EVENTS = ('created', 'reused', 'recycled', 'discarded', 'timeouts')
+
+    def __init__(self, connect, max_size: int, max_age: float, health_check_interval: float, timeout: float,
+                 observer=None):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._connect = connect
+        self._observer = observer
+        # reentrant, so an observer may read stats()
+        self._condition = threading.Condition(threading.RLock())
+        self._reset()
+
+    def _reset(self) -> None:
+        # a forked worker must not touch the sockets of its parent, they are dropped without closing
+        self._pid = os.getpid()
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self.created = self.reused = self.recycled = self.discarded = self.timeouts = 0
+
+    def _observe(self, event: str) -> None:
+        # called with the condition held
+        if self._observer is not None:
+            self._observer(self, event)
+
+    def _is_expired(self, connection) -> bool:
+        return time.monotonic() - self._opened_at[connection] > self.max_age
+
+    def _discard(self, connection, recycled: bool = False) -> None:
+        # called with the condition held
+        self._opened_at.pop(connection, None)
+        self._size -= 1
+        if recycled:
+            self.recycled += 1
+        else:
+            self.discarded += 1
+        self._condition.notify()
+        self._observe('recycled' if recycled else 'discarded')
+
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def _checkout(self):
+        """An idle connection with the seconds it was idle, or (None, None) once a slot for a new one is reserved"""
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            if self._pid != os.getpid():
+                self._reset()
+
+            while True:
+                while self._idle:
+                    # most recently used first, the least used ones age out
+                    connection, returned_at = self._idle.pop()
+                    if connection.closed:
+                        self._discard(connection)
+                    elif self._is_expired(connection):
+                        self._discard(connection, recycled=True)
+                    else:
+                        return connection, time.monotonic() - returned_at
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    self.timeouts += 1
+                    self._observe('timeouts')
+                    raise psycopg2.OperationalError(
+                        'No database connection became free in {timeout} seconds, all {size} are in use'.format(
+                            timeout=self.timeout, size=self.max_size))
+
+    @staticmethod
+    def _ping(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except psycopg2.Error:
+            return False
+        return True
+
+    def getconn(self):
+        while True:
+            connection, idle_for = self._checkout()
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+                with self._condition:
+                    self._opened_at[connection] = time.monotonic()
+                    self.created += 1
+                    self._observe('created')
+                return connection
+
+            # recently returned connections are trusted, the others must answer before reuse
+            if idle_for < self.health_check_interval or self._ping(connection):
+                with self._condition:
+                    self.reused += 1
+                    self._observe('reused')
+                return connection
+
+            with self._condition:
+                self._discard(connection)
+
+    def putconn(self, connection) -> None:
+        if not connection.closed and connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+
+        with self._condition:
+            if connection not in self._opened_at:
+                # opened before a fork or a close_all()
+                if self._pid == os.getpid():
+                    connection.close()
+                return
+
+            if connection.closed or connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                self._discard(connection)
+            elif self._is_expired(connection):
+                self._discard(connection, recycled=True)
+            else:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+                self._observe('returned')
+
+    def close_all(self) -> None:
+        """Close idle connections and forget the checked out ones, which are closed when they are returned"""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._reset()
+            self._condition.notify_all()
+            self._observe('closed')
+
+        for connection in idle:
+            connection.close()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'busy': self._size - len(self._idle),
+                'max_size': self.max_size,
+                'created': self.created,
+                'reused': self.reused,
+                'recycled': self.recycled,
+                'discarded': self.discarded,
+                'timeouts': self.timeouts,
+            }
+
+
+def get_pool(conn_params: dict, connect, **options) -> ConnectionPool:
+    """The pool of connections opened with `conn_params`, created with `options` on first use"""
+    key = tuple(sorted((name, str(value)) for name, value in conn_params.items()))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(key, ConnectionPool(connect, **options))
+    return pool
+
+
+def close_pools(database: str = None) -> None:
+    """Close the pools of a database, of every database if None"""
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if database is None or ('database', database) in key]
+
+    for pool in pools:
+        pool.close_all()
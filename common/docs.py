@@ -0,0 +1,39 @@
+import threading
+
+from django.urls import include, path
+from django.views.decorators.csrf import csrf_exempt
+
+
+def _lazy_view(factory_name: str, kwargs: dict):
+    """
+    View built by rest_framework.documentation.<factory_name>(**kwargs) on its first request,
+    serving its schema from the cache of CachedSchemaView
+    """
+    views = []
+    lock = threading.Lock()
+
+    @csrf_exempt
+    def view(request, *args, **view_kwargs):
+        if not views:
+            with lock:
+                if not views:
+                    from rest_framework import documentation
+                    from .schemas import CachedSchemaView
+
+                    schema_view = getattr(documentation, factory_name)(**kwargs)
+                    views.append(CachedSchemaView.as_view(**schema_view.initkwargs))
+        return views[0](request, *args, **view_kwargs)
+
+    return view
+
+
+def include_lazy_docs_urls(**kwargs):
+    """
+    include_docs_urls() of rest_framework that imports its schema generator and docs renderers on the first
+    request to the docs instead of in every worker at startup
+    """
+    urls = [
+        path('', _lazy_view('get_docs_view', kwargs), name='docs-index'),
+        path('schema.js', _lazy_view('get_schemajs_view', kwargs), name='schema-js'),
+    ]
+    return include((urls, 'api-docs'), namespace='api-docs')
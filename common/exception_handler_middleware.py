@@ -1,3 +1,5 @@
+from django.utils.deprecation import MiddlewareMixin
+
 from .exceptions import (
     ObjectNotFoundException, ValidationException, AuthenticationException,
     BadRequestException, NotAcceptableException, IntegrityException,
@@ -18,13 +20,7 @@ EXCEPTION_MAPPER = {
 }
 
 
-class RequestExceptionHandlerMiddleware(object):
-
-    def __init__(self, get_response=None):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        return self.get_response(request)
+class RequestExceptionHandlerMiddleware(MiddlewareMixin):
 
     def process_exception(self, request, exception):
         error_class = EXCEPTION_MAPPER.get(exception.__class__.__name__, None)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db', 'serialize', 'view', 'total', 'started_at', 'view_started_at')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = self.serialize = self.view = self.total = 0.0
+        self.started_at = time.perf_counter()
+        self.view_started_at = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook, one call per executed statement
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+
+def get_request_metrics():
+    """Metrics of the request being handled, None outside of a request"""
+    return _current_metrics.get()
+
+
+@contextmanager
+def timed(name: str):
+    """Add the time spent in the block to a timing of the current request"""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, name, getattr(metrics, name) + time.perf_counter() - start)
+
+
+class RequestInstrumentationMiddleware(object):
+    """
+    Count queries and time the database, the view and the response serialization of every request.
+    Timings are returned as Server-Timing and X-Query-Count headers and recorded in the Prometheus metrics
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # served by ASGI, __acall__ does not hold a thread for the whole request
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        # sync views still query through Django connections, async ones count their queries in common.async_db
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics: RequestMetrics):
+        if metrics.view_started_at is not None and not metrics.view:
+            metrics.view = time.perf_counter() - metrics.view_started_at
+        metrics.total = time.perf_counter() - metrics.started_at
+
+        response['Server-Timing'] = ', '.join((
+            'db;dur={duration:.2f};desc="{queries} queries"'.format(
+                duration=metrics.db * 1000, queries=metrics.queries),
+            'serialize;dur={duration:.2f}'.format(duration=metrics.serialize * 1000),
+            'view;dur={duration:.2f}'.format(duration=metrics.view * 1000),
+            'total;dur={duration:.2f}'.format(duration=metrics.total * 1000),
+        ))
+        response['X-Query-Count'] = str(metrics.queries)
+
+        if metrics.queries > settings.REQUEST_QUERY_BUDGET:
+            logger.warning('%s %s made %s queries, over the budget of %s (%.2f ms in the database)',
+                           request.method, request.path, metrics.queries, settings.REQUEST_QUERY_BUDGET,
+                           metrics.db * 1000)
+
+        observe_request(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.view_started_at = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after the view returns
+        metrics = _current_metrics.get()
+        if metrics is None or metrics.view_started_at is None:
+            return response
+
+        render_started_at = time.perf_counter()
+        metrics.view = render_started_at - metrics.view_started_at
+
+        def finish_render(rendered_response):
+            metrics.serialize += time.perf_counter() - render_started_at
+
+        response.add_post_render_callback(finish_render)
+        return response
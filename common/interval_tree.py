@@ -0,0 +1,64 @@
+class IntervalTree:
+    """
+    Static centered interval tree over closed intervals (low, high, value).
+    Build is O(n log n), stabbing query is O(log n + k).
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, intervals):
+        intervals = list(intervals)
+        self._size = len(intervals)
+        self._root = self._build(intervals)
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def _build(cls, intervals):
+        if not intervals:
+            return None
+
+        endpoints = sorted(endpoint for low, high, _ in intervals for endpoint in (low, high))
+        center = endpoints[len(endpoints) // 2]
+
+        left, right, overlapping = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                overlapping.append(interval)
+
+        return (
+            center,
+            sorted(overlapping, key=lambda interval: interval[0]),
+            sorted(overlapping, key=lambda interval: interval[1], reverse=True),
+            cls._build(left),
+            cls._build(right),
+        )
+
+    def query(self, point) -> list:
+        """Values of all intervals containing point"""
+        result = []
+        node = self._root
+        while node is not None:
+            center, by_low, by_high, left, right = node
+            if point < center:
+                for low, _, value in by_low:
+                    if low > point:
+                        break
+                    result.append(value)
+                node = left
+            elif point > center:
+                for _, high, value in by_high:
+                    if high < point:
+                        break
+                    result.append(value)
+                node = right
+            else:
+                result.extend(value for _, _, value in by_low)
+                break
+
+        return result
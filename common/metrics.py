@@ -0,0 +1,87 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+
+# gunicorn workers write to files in this directory and any of them aggregates on scrape
+MULTIPROCESS_DIR_ENV = 'prometheus_multiproc_dir'
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf'))
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by view, method and status code',
+    ('view', 'method', 'status'))
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request by view', ('view',), buckets=QUERY_BUCKETS)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Database time per request by view', ('view',))
+
+# counted where they happen, files of exited workers are kept so the sums never go backwards
+AUTH_TOKEN_CACHE_HITS = Counter('auth_token_cache_hits', 'Auth token cache hits')
+AUTH_TOKEN_CACHE_MISSES = Counter('auth_token_cache_misses', 'Auth token cache misses')
+DB_POOL_EVENTS = Counter(
+    'db_pool_events', 'Pooled connections created, reused, recycled for age, discarded as unhealthy '
+    'and checkouts timed out', ('alias', 'event'))
+
+# current values of every live worker, set when they change
+AUTH_TOKEN_CACHE_SIZE = Gauge(
+    'auth_token_cache_size', 'Cached auth tokens', multiprocess_mode='livesum')
+DB_CONNECTIONS_OPEN = Gauge(
+    'db_connections_open', 'Open database connections', ('alias',), multiprocess_mode='livesum')
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Pooled database connections by state', ('alias', 'state'), multiprocess_mode='livesum')
+
+DB_POOL_STATES = ('idle', 'busy')
+
+
+def _view_name(request) -> str:
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match is not None else 'unresolved'
+
+
+def observe_request(request, response, request_metrics) -> None:
+    """Record a finished request, `request_metrics` are the RequestMetrics of the instrumentation middleware"""
+    view = _view_name(request)
+    REQUEST_DURATION.labels(view, request.method, response.status_code).observe(request_metrics.total)
+    REQUEST_DB_QUERIES.labels(view).observe(request_metrics.queries)
+    REQUEST_DB_DURATION.labels(view).observe(request_metrics.db)
+
+
+def pool_observer(alias: str):
+    """ConnectionPool observer exporting the pool of a database alias"""
+
+    def observe(pool, event: str) -> None:
+        if event in pool.EVENTS:
+            DB_POOL_EVENTS.labels(alias, event).inc()
+
+        stats = pool.stats()
+        DB_CONNECTIONS_OPEN.labels(alias).set(stats['size'])
+        for state in DB_POOL_STATES:
+            DB_POOL_CONNECTIONS.labels(alias, state).set(stats[state])
+
+    return observe
+
+
+def get_registry():
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, served to requests with the `Bearer <METRICS_TOKEN>` authorization only"""
+    if not settings.METRICS_TOKEN:
+        raise Http404
+
+    expected = 'Bearer {token}'.format(token=settings.METRICS_TOKEN)
+    if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', '').encode(), expected.encode()):
+        response = HttpResponse(status=401)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
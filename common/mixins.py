@@ -0,0 +1,64 @@
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .compiled_serializers import compile_serializer
+from .instrumentation_middleware import timed
+from .response_cache import prerender, prerendered_response
+
+
+class CompiledListMixin:
+    """
+    Render list responses from values() rows with the compiled serializer_class
+    instead of instantiating models and serializers for every row
+    """
+
+    # extra columns pagination needs to build keyset cursors
+    compiled_list_extra_fields = ('id', 'created_at')
+
+    def list(self, request, *args, **kwargs):
+        compiled_serializer = compile_serializer(self.get_serializer_class())
+        fields = dict.fromkeys(compiled_serializer.fields + self.compiled_list_extra_fields)
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with timed('serialize'):
+                data = compiled_serializer.render_many(page)
+            return self.get_paginated_response(data)
+
+        with timed('serialize'):
+            data = compiled_serializer.render_many(queryset)
+        return Response(data)
+
+
+class VersionedListCacheMixin:
+    """
+    Serve JSON list pages as pre-rendered bytes cached by the version of the listed data and the query params,
+    with a strong ETag, so a matching If-None-Match is answered with 304 Not Modified.
+    Views set list_cache and list_version, a callable returning a value that changes with every write to the data
+    """
+
+    list_cache = None
+    list_version = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.list_cache is None or not callable(cls.list_version):
+            raise ImproperlyConfigured('{view} must set list_cache and a callable list_version'.format(
+                view=cls.__name__))
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            # the browsable API renders a page per user
+            return super().list(request, *args, **kwargs)
+
+        # read before the rows, so a page of rows written meanwhile is cached under the version they replace
+        key = (self.list_version(),
+               tuple((name, tuple(values)) for name, values in sorted(request.query_params.lists())))
+        rendered = self.list_cache.get(key)
+        if rendered is None:
+            rendered = prerender(self, request, super().list(request, *args, **kwargs))
+            self.list_cache.set(key, rendered)
+
+        return prerendered_response(request, *rendered)
@@ -1,14 +1,304 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, InvalidPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 from rest_framework import pagination
 from rest_framework.response import Response
 
+from . import async_db
+from .cache import LRUCache
+from .exceptions import BadRequestException, ObjectNotFoundException
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts PostgreSQL statistics instead of running COUNT(*)
+    once the estimated number of rows reaches PAGINATION_COUNT_ESTIMATE_THRESHOLD.
+    Filtered lists are only planned when their table is that large, smaller ones are counted right away.
+    An estimate may be below the real number of rows, so it never rejects a page that has rows
+    """
+
+    count_is_exact = True
+
+    # (database alias, table) -> reltuples of this process, so smaller lists cost their COUNT(*) only
+    table_estimates = LRUCache(maxsize=1000, ttl=settings.PAGINATION_TABLE_ESTIMATE_TTL)
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate_count()
+        if estimate is not None and estimate >= settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            self.count_is_exact = False
+            return estimate
+
+        return super().count
+
+    async def count_async(self) -> int:
+        """count for async views, queried through the async connection pool"""
+        if 'count' not in self.__dict__:
+            estimate = await self._estimate_count_async()
+            if estimate is not None and estimate >= settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+                self.count_is_exact = False
+                self.count = estimate
+            else:
+                self.count = await async_db.count(self.object_list)
+
+        return self.count
+
+    def _has_exact_count(self) -> bool:
+        # counting sets count_is_exact
+        return self.count is not None and self.count_is_exact
+
+    def validate_number(self, number):
+        if self._has_exact_count():
+            return super().validate_number(number)
+
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self._has_exact_count():
+            return super().page(number)
+
+        return self._get_fetched_page(list(self._get_page_rows(number)), number)
+
+    async def page_async(self, number):
+        """page() for async views, rows are fetched through the async connection pool"""
+        await self.count_async()
+        number = self.validate_number(number)
+        if self._has_exact_count():
+            rows = super().page(number).object_list
+        else:
+            rows = self._get_page_rows(number)
+
+        return self._get_fetched_page(await async_db.fetch(rows), number)
+
+    def _get_page_rows(self, number: int):
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom:bottom + self.per_page]
+
+    def _get_fetched_page(self, rows: list, number: int):
+        # rows of an estimated count decide whether the page exists
+        if not rows and number > 1 and not self.count_is_exact:
+            raise EmptyPage(_('That page contains no results'))
+
+        return self._get_page(rows, number, self)
+
+    def _get_table_key(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != 'postgresql':
+            return None
+
+        return queryset.db, queryset.model._meta.db_table
+
+    @staticmethod
+    def _get_table_query(table_key):
+        return 'SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [table_key[1]]
+
+    def _get_plan_query(self):
+        """EXPLAIN of a filtered list, None if the table estimate is enough. Raises EmptyResultSet"""
+        queryset = self.object_list
+        if not queryset.query.where:
+            return None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        return 'EXPLAIN (FORMAT JSON) ' + sql, params
+
+    @staticmethod
+    def _parse_estimate(row):
+        if row is None:
+            return None
+
+        estimate = row[0]
+        if isinstance(estimate, str):
+            estimate = json.loads(estimate)
+        if isinstance(estimate, list):
+            estimate = estimate[0]['Plan']['Plan Rows']
+
+        # reltuples is -1 for a table that has never been analyzed
+        return int(estimate) if estimate >= 0 else None
+
+    @staticmethod
+    def _is_below_threshold(table_estimate) -> bool:
+        # a filtered list is never larger than its table
+        return table_estimate is None or table_estimate < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+
+    def _estimate_count(self):
+        table_key = self._get_table_key()
+        if table_key is None:
+            return None
+
+        with connections[self.object_list.db].cursor() as cursor:
+            table_estimate = self.table_estimates.get(table_key, default=-1)
+            if table_estimate == -1:
+                cursor.execute(*self._get_table_query(table_key))
+                table_estimate = self._parse_estimate(cursor.fetchone())
+                self.table_estimates.set(table_key, table_estimate)
+            if self._is_below_threshold(table_estimate):
+                return table_estimate
+
+            try:
+                plan_query = self._get_plan_query()
+            except EmptyResultSet:
+                return 0
+            if plan_query is None:
+                return table_estimate
+
+            cursor.execute(*plan_query)
+            return self._parse_estimate(cursor.fetchone())
+
+    async def _estimate_count_async(self):
+        table_key = self._get_table_key()
+        if table_key is None:
+            return None
+
+        using = self.object_list.db
+        table_estimate = self.table_estimates.get(table_key, default=-1)
+        if table_estimate == -1:
+            records = await async_db.execute_sql(*self._get_table_query(table_key), using=using)
+            table_estimate = self._parse_estimate(records[0] if records else None)
+            self.table_estimates.set(table_key, table_estimate)
+        if self._is_below_threshold(table_estimate):
+            return table_estimate
+
+        try:
+            plan_query = self._get_plan_query()
+        except EmptyResultSet:
+            return 0
+        if plan_query is None:
+            return table_estimate
+
+        records = await async_db.execute_sql(*plan_query, using=using)
+        return self._parse_estimate(records[0] if records else None)
+
 
 class GeneralPagination(pagination.PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
     page_size_query_param = 'limit'
     page_query_param = 'page'
 
+    # keyset mode is opt-in: pass an empty `cursor` for the first page,
+    # then the `next_cursor` of the previous response
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-created_at', 'id')
+
+    use_cursor = False
+    next_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        return self._get_cursor_page(list(self._get_cursor_queryset(queryset, request, page_size)), page_size)
+
+    async def paginate_queryset_async(self, queryset, request):
+        """
+        paginate_queryset() for async views, rows are fetched through the async connection pool.
+        `request` is a rest_framework Request wrapping the Django one
+        """
+        self.use_cursor = self.cursor_query_param in request.query_params
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        if self.use_cursor:
+            rows = await async_db.fetch(self._get_cursor_queryset(queryset, request, page_size))
+            return self._get_cursor_page(rows, page_size)
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        await paginator.count_async()
+
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+
+        try:
+            self.page = await paginator.page_async(page_number)
+        except InvalidPage as exc:
+            raise ObjectNotFoundException(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        return list(self.page)
+
+    def _get_cursor_queryset(self, queryset, request, page_size: int):
+        queryset = queryset.order_by(*self.cursor_ordering)
+
+        position = self._decode_cursor(request.query_params[self.cursor_query_param])
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+        # one extra row tells whether there is a next page
+        return queryset[:page_size + 1]
+
+    def _get_cursor_page(self, rows: list, page_size: int) -> list:
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = self._encode_cursor(rows[-1]) if has_next else None
+
+        return rows
+
     def get_paginated_response(self, data):
-        return Response({
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data) -> dict:
+        if self.use_cursor:
+            return {
+                'next_cursor': self.next_cursor,
+                'list': data
+            }
+
+        return {
             'total_count': self.page.paginator.count,
+            'total_count_is_exact': self.page.paginator.count_is_exact,
             'total_pages': self.page.paginator.num_pages,
             'list': data
-        })
+        }
+
+    @staticmethod
+    def _encode_cursor(row) -> str:
+        # rows are model instances or values() dicts
+        if isinstance(row, dict):
+            created_at, pk = row['created_at'], row['id']
+        else:
+            created_at, pk = row.created_at, row.pk
+        position = '{created_at}|{pk}'.format(created_at=created_at.isoformat(), pk=pk)
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        if not cursor:
+            return None
+
+        try:
+            created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise BadRequestException('Invalid cursor')
+
+        if created_at is None:
+            raise BadRequestException('Invalid cursor')
+
+        return created_at, pk
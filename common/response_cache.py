@@ -0,0 +1,22 @@
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+
+def prerender(view, request, response: Response) -> tuple:
+    """(content, content type, strong ETag) of a response rendered as view.finalize_response() would"""
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = view.get_renderer_context()
+    content = response.rendered_content
+
+    return content, response['Content-Type'], '"{digest}"'.format(digest=hashlib.sha256(content).hexdigest())
+
+
+def prerendered_response(request, content: bytes, content_type: str, etag: str) -> HttpResponse:
+    """Response of pre-rendered bytes, 304 Not Modified given a matching If-None-Match"""
+    response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    return get_conditional_response(request, etag=etag, response=response)
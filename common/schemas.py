@@ -1,4 +1,12 @@
+import math
+
+from rest_framework import exceptions
+from rest_framework.response import Response
 from rest_framework.schemas import AutoSchema
+from rest_framework.schemas.views import SchemaView
+
+from .cache import LRUCache
+from .response_cache import prerender, prerendered_response
 
 
 class DefaultSchema(AutoSchema):
@@ -13,3 +21,39 @@ class DefaultSchema(AutoSchema):
             return self.view.action == 'list'
 
         return method.lower() == 'get'
+
+
+class CachedSchemaView(SchemaView):
+    """
+    SchemaView that generates a public schema once per API version and url
+    and serves anonymous requests the rendered bytes from memory with a strong ETag.
+    The cache lives as long as the worker, so every deploy starts with a fresh schema
+    """
+
+    # (version, url) -> schema, (version, url, media type) -> (content, content type, etag)
+    cache = LRUCache(maxsize=64, ttl=math.inf)
+
+    def get(self, request, *args, **kwargs):
+        if not self.public:
+            # links depend on the permissions of the user
+            return super().get(request, *args, **kwargs)
+
+        key = (request.version, request.build_absolute_uri())
+        schema = self.cache.get(key)
+        if schema is None:
+            schema = self.schema_generator.get_schema(request, self.public)
+            if schema is None:
+                raise exceptions.PermissionDenied()
+            self.cache.set(key, schema)
+
+        if request.user.is_authenticated:
+            # the docs page greets authenticated users by name
+            return Response(schema)
+
+        rendered_key = key + (request.accepted_media_type,)
+        rendered = self.cache.get(rendered_key)
+        if rendered is None:
+            rendered = prerender(self, request, Response(schema))
+            self.cache.set(rendered_key, rendered)
+
+        return prerendered_response(request, *rendered)
@@ -0,0 +1,104 @@
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+
+from . import async_db
+
+# name -> version read by the request being handled, every version is read at most once per request
+_request_versions = ContextVar('shared_versions', default=None)
+# (monotonic time of the read, name -> version) of the last read of this process,
+# requests that start within SHARED_VERSIONS_MAX_AGE seconds of it reuse it instead of reading again
+_process_versions = (-math.inf, {})
+
+VERSIONS_SQL = 'SELECT name, version FROM common_shared_version'
+
+
+def _get_read_versions():
+    versions = _request_versions.get()
+    if versions:
+        return versions
+
+    read_at, process_versions = _process_versions
+    if time.monotonic() - read_at < settings.SHARED_VERSIONS_MAX_AGE:
+        return _remember(process_versions)
+    return None
+
+
+def _remember(read_versions: dict) -> dict:
+    versions = _request_versions.get()
+    if versions is not None:
+        versions.update(read_versions)
+    return read_versions
+
+
+def _store(read_at: float, read_versions: dict) -> dict:
+    global _process_versions
+    _process_versions = (read_at, read_versions)
+    return _remember(read_versions)
+
+
+def get_shared_version(name: str) -> int:
+    """
+    Version of data cached by every worker, moved forward by database triggers on every write to it,
+    whichever worker or statement made the write. Entries cached with an older version are stale
+    """
+    versions = _get_read_versions()
+    if versions is None:
+        read_at = time.monotonic()
+        with connection.cursor() as cursor:
+            cursor.execute(VERSIONS_SQL)
+            versions = _store(read_at, dict(cursor.fetchall()))
+
+    return versions.get(name, 0)
+
+
+async def get_shared_version_async(name: str) -> int:
+    """get_shared_version() for async views, read through the async connection pool"""
+    versions = _get_read_versions()
+    if versions is None:
+        read_at = time.monotonic()
+        records = await async_db.execute_sql(VERSIONS_SQL)
+        versions = _store(read_at, dict(tuple(record) for record in records))
+
+    return versions.get(name, 0)
+
+
+@contextmanager
+def read_once():
+    """Read every shared version at most once within the block, like while a request is handled"""
+    token = _request_versions.set({})
+    try:
+        yield
+    finally:
+        _request_versions.reset(token)
+
+
+class SharedVersionsMiddleware(object):
+    """
+    Read the shared versions once per request, with the first cache that needs one,
+    so every cache checked while handling the request shares a single query
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        with read_once():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with read_once():
+            return await self.get_response(request)
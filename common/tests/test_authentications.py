@@ -0,0 +1,133 @@
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from common.authentications import CachedTokenAuthentication
+from common.cache import LRUCache
+from core.views import ProposalListCreateAPIView
+from users import roles
+from users.models import User
+from users.tests.user_factory import UserFactory
+
+
+class LRUCacheTest(SimpleTestCase):
+
+    def test_least_recently_used_entry_is_evicted_given_full_cache(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2})
+
+    def test_entry_is_missed_given_other_version(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1, version=1)
+
+        self.assertEqual(cache.get('a', version=1), 1)
+        self.assertIsNone(cache.get('a', version=2))
+        self.assertIsNone(cache.get('a'))
+
+    def test_entry_is_expired_given_elapsed_ttl(self):
+        cache = LRUCache(maxsize=2, ttl=-1)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+
+class CachedTokenAuthenticationTest(APITestCase):
+    def setUp(self) -> None:
+        CachedTokenAuthentication.cache.clear()
+        ProposalListCreateAPIView.list_cache.clear()
+        self.user = UserFactory(email='user@example.com', role_id=roles.ADMINISTRATOR['codename'])
+        self.token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('v1:proposals')
+
+    def test_token_lookup_is_cached_between_requests(self):
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        hits = CachedTokenAuthentication.cache.stats()['hits']
+
+        # the shared versions, which the cached page is checked with as well
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(CachedTokenAuthentication.cache.stats()['hits'], hits + 1)
+
+    @override_settings(SHARED_VERSIONS_MAX_AGE=60)
+    def test_cached_token_costs_no_query_given_recently_read_versions(self):
+        self.client.get(self.url)
+
+        # the shared versions read by the previous request are reused
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cached_token_is_kept_given_profile_or_last_login_saved(self):
+        self.client.get(self.url)
+        self.user.first_name = 'Changed'
+        self.user.save()
+        User.objects.filter(pk=self.user.pk).update(last_login=timezone.now())
+        hits = CachedTokenAuthentication.cache.stats()['hits']
+
+        self.client.get(self.url)
+
+        self.assertEqual(CachedTokenAuthentication.cache.stats()['hits'], hits + 1)
+
+    def test_cached_token_is_looked_up_again_given_role_changed_by_queryset_update(self):
+        self.client.get(self.url)
+        User.objects.filter(pk=self.user.pk).update(role_id=roles.PARTNER['codename'])
+        hits = CachedTokenAuthentication.cache.stats()['hits']
+
+        self.client.get(self.url)
+
+        self.assertEqual(CachedTokenAuthentication.cache.stats()['hits'], hits)
+
+    def test_cached_token_is_rejected_given_deleted_token(self):
+        self.client.get(self.url)
+        self.token.delete()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_token_is_rejected_given_token_deleted_by_another_worker(self):
+        self.client.get(self.url)
+        # raw SQL sends no signal, like a delete made by another worker process
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM authtoken_token WHERE key = %s', [self.token.key])
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_token_is_rejected_given_user_deactivated_by_queryset_update(self):
+        self.client.get(self.url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_token_is_rejected_given_deactivated_user(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
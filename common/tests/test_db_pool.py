@@ -0,0 +1,113 @@
+import psycopg2
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from common.db_pool.pool import ConnectionPool
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        self.conn_params = connection.get_connection_params()
+        self.pools = []
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.close_all()
+
+    def _pool(self, **options) -> ConnectionPool:
+        options = dict({'max_size': 2, 'max_age': 60, 'health_check_interval': 60, 'timeout': 1}, **options)
+        pool = ConnectionPool(lambda: psycopg2.connect(**self.conn_params), **options)
+        self.pools.append(pool)
+        return pool
+
+    def test_returned_connection_is_reused(self):
+        pool = self._pool()
+        first = pool.getconn()
+        pool.putconn(first)
+
+        second = pool.getconn()
+
+        self.assertIs(second, first)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['reused'], 1)
+        self.assertEqual(pool.stats()['busy'], 1)
+
+    def test_observer_is_called_after_every_change(self):
+        events = []
+        pool = self._pool(observer=lambda pool, event: events.append((event, pool.stats()['busy'])))
+
+        pool.putconn(pool.getconn())
+
+        self.assertEqual(events, [('created', 1), ('returned', 0)])
+
+    def test_checkout_times_out_given_every_connection_in_use(self):
+        pool = self._pool(max_size=1, timeout=0.05)
+        pool.getconn()
+
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn()
+
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_connection_is_recycled_given_max_age_reached(self):
+        pool = self._pool(max_age=0)
+        first = pool.getconn()
+        pool.putconn(first)
+
+        second = pool.getconn()
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+
+    def test_connection_closed_by_server_is_replaced_given_health_check(self):
+        pool = self._pool(health_check_interval=0)
+        first = pool.getconn()
+        pool.putconn(first)
+        with psycopg2.connect(**self.conn_params) as admin_connection, admin_connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [first.get_backend_pid()])
+
+        second = pool.getconn()
+
+        self.assertIsNot(second, first)
+        self.assertEqual(pool.stats()['discarded'], 1)
+
+    def test_open_transaction_is_rolled_back_on_return(self):
+        pool = self._pool()
+        first = pool.getconn()
+        with first.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        pool.putconn(first)
+
+        self.assertEqual(first.get_transaction_status(), psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_connections_of_parent_process_are_not_reused_after_fork(self):
+        pool = self._pool()
+        first = pool.getconn()
+        pool.putconn(first)
+        # what a forked worker sees
+        pool._pid = -1
+
+        second = pool.getconn()
+
+        self.assertIsNot(second, first)
+        self.assertFalse(first.closed)
+        first.close()
+
+
+class PooledDatabaseWrapperTest(TestCase):
+
+    def test_closed_connection_goes_back_to_pool(self):
+        wrapper = connection.copy()
+        wrapper.ensure_connection()
+        raw_connection = wrapper.connection
+
+        wrapper.close()
+        wrapper.ensure_connection()
+
+        self.assertIs(wrapper.connection, raw_connection)
+        self.assertFalse(raw_connection.closed)
+        wrapper.close()
@@ -0,0 +1,56 @@
+import warnings
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from common.authentications import CachedTokenAuthentication
+from common.schemas import CachedSchemaView
+from users import roles
+from users.tests.user_factory import UserFactory
+
+
+class DocsTest(TestCase):
+
+    def tearDown(self):
+        CachedSchemaView.cache.clear()
+        CachedTokenAuthentication.cache.clear()
+
+    def _get(self, name: str, **headers):
+        with warnings.catch_warnings():
+            # django-filter warns about views whose filters can not be described
+            warnings.simplefilter('ignore')
+            return self.client.get(reverse(name), **headers)
+
+    def test_docs_and_schema_js_are_served(self):
+        response = self._get('api-docs:docs-index')
+        schema_js_response = self._get('api-docs:schema-js')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse('api-docs:schema-js'))
+        self.assertEqual(schema_js_response.status_code, 200)
+        self.assertTrue(schema_js_response['Content-Type'].startswith('application/javascript'))
+        self.assertNotEqual(schema_js_response['ETag'], response['ETag'])
+
+    def test_schema_is_generated_once_and_revalidated_by_etag(self):
+        response = self._get('api-docs:docs-index')
+        misses = CachedSchemaView.cache.stats()['misses']
+
+        cached_response = self._get('api-docs:docs-index')
+        not_modified_response = self._get('api-docs:docs-index', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(CachedSchemaView.cache.stats()['misses'], misses)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response['ETag'], response['ETag'])
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(not_modified_response.content, b'')
+
+    def test_authenticated_user_gets_own_page_from_cached_schema(self):
+        self._get('api-docs:docs-index')
+        user = UserFactory(role_id=roles.ADMINISTRATOR['codename'])
+        token = Token.objects.create(user=user)
+
+        response = self._get('api-docs:docs-index', HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.assertContains(response, 'You are logged in as {email}'.format(email=user.get_username()))
+        self.assertNotIn('ETag', response)
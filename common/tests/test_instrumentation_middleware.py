@@ -0,0 +1,54 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from common.instrumentation_middleware import get_request_metrics, timed
+from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
+from users import roles
+from users.tests.user_factory import UserFactory
+
+
+class RequestInstrumentationMiddlewareTest(APITestCase):
+
+    def setUp(self):
+        user = UserFactory(role_id=roles.ADMINISTRATOR['codename'])
+        token = Token.objects.create(user=user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:proposals')
+        ProposalFactory(organization=OrganizationFactory(), min_score=0, max_score=100)
+
+    def test_query_count_header_matches_executed_queries(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Query-Count'], '5')
+
+    def test_server_timing_header_contains_every_timing(self):
+        response = self.client.get(self.url)
+
+        timings = {timing.split(';')[0]: timing for timing in response['Server-Timing'].split(', ')}
+        self.assertEqual(set(timings), {'db', 'serialize', 'view', 'total'})
+        self.assertIn('desc="5 queries"', timings['db'])
+
+    def test_headers_are_set_on_error_responses(self):
+        self.client.credentials()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['X-Query-Count'], '0')
+
+    @override_settings(REQUEST_QUERY_BUDGET=3)
+    def test_warning_is_logged_given_query_budget_exceeded(self):
+        with self.assertLogs('common.instrumentation_middleware', level='WARNING') as logs:
+            self.client.get(self.url)
+
+        self.assertIn('GET {url} made 5 queries'.format(url=self.url), logs.output[0])
+
+    def test_timed_does_nothing_outside_of_request(self):
+        with timed('serialize'):
+            pass
+
+        self.assertIsNone(get_request_metrics())
@@ -0,0 +1,72 @@
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from common.authentications import CachedTokenAuthentication
+from users import roles
+from users.tests.user_factory import UserFactory
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTest(APITestCase):
+
+    def setUp(self):
+        user = UserFactory(role_id=roles.ADMINISTRATOR['codename'])
+        token = Token.objects.create(user=user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:proposals')
+
+    def tearDown(self):
+        CachedTokenAuthentication.cache.clear()
+
+    def _sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requests_are_counted_by_view_method_and_status(self):
+        labels = {'view': 'v1:proposals', 'method': 'GET', 'status': '200'}
+        before = self._sample('http_request_duration_seconds_count', **labels)
+        queries_before = self._sample('http_request_db_queries_sum', view='v1:proposals')
+
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.assertEqual(self._sample('http_request_duration_seconds_count', **labels), before + 2)
+        self.assertGreater(self._sample('http_request_db_queries_sum', view='v1:proposals'), queries_before)
+
+    def test_auth_token_cache_lookups_are_counted(self):
+        hits = self._sample('auth_token_cache_hits_total')
+        misses = self._sample('auth_token_cache_misses_total')
+
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.assertEqual(self._sample('auth_token_cache_hits_total'), hits + 1)
+        self.assertEqual(self._sample('auth_token_cache_misses_total'), misses + 1)
+        self.assertEqual(self._sample('auth_token_cache_size'), len(CachedTokenAuthentication.cache))
+
+    def test_metrics_endpoint_renders_prometheus_text_format(self):
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-token')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'http_request_duration_seconds_bucket{', response.content)
+        self.assertIn(b'view="v1:proposals"', response.content)
+
+    def test_metrics_endpoint_rejects_scrape_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_is_disabled_given_no_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,152 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from common.cache import LRUCache
+from common.pagination import EstimatedCountPaginator
+from core.models import Proposal
+from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
+from users import roles
+from users.tests.user_factory import UserFactory
+
+
+class GeneralPaginationCursorTest(APITestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory(email='user@example.com', role_id=roles.ADMINISTRATOR['codename'])
+        token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:proposals')
+
+        organization = OrganizationFactory()
+        self.proposals = [ProposalFactory(organization=organization, min_score=0, max_score=100) for _ in range(5)]
+
+    def test_page_number_response_is_kept_given_no_cursor(self):
+        response_json = self.client.get(self.url, {'limit': 2}).json()
+
+        self.assertEqual(response_json['total_count'], 5)
+        self.assertEqual(response_json['total_pages'], 3)
+        self.assertNotIn('next_cursor', response_json)
+
+    def test_cursor_pages_walk_all_rows_in_order(self):
+        # warm up the token cache so only the shared versions and the page query are counted
+        self.client.get(self.url)
+        seen_ids = []
+        cursor = ''
+        while cursor is not None:
+            with self.assertNumQueries(2):
+                response_json = self.client.get(self.url, {'limit': 2, 'cursor': cursor}).json()
+            self.assertNotIn('total_count', response_json)
+            seen_ids += [proposal['id'] for proposal in response_json['list']]
+            cursor = response_json['next_cursor']
+
+        expected_ids = [proposal.id for proposal in sorted(self.proposals,
+                                                           key=lambda p: (-p.created_at.timestamp(), p.id))]
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_bad_request_given_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EstimatedCountPaginatorTest(APITestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory(email='user@example.com', role_id=roles.ADMINISTRATOR['codename'])
+        token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:proposals')
+
+        organization = OrganizationFactory()
+        for _ in range(3):
+            ProposalFactory(organization=organization, min_score=0, max_score=100)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_proposal')
+
+    def test_exact_count_given_rows_below_threshold(self):
+        response_json = self.client.get(self.url).json()
+
+        self.assertEqual(response_json['total_count'], 3)
+        self.assertTrue(response_json['total_count_is_exact'])
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=4)
+    def test_filtered_list_is_counted_without_planning_given_table_below_threshold(self):
+        self._analyze()
+        paginator = EstimatedCountPaginator(Proposal.objects.filter(min_score=0), per_page=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 3)
+
+        self.assertTrue(paginator.count_is_exact)
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any(query['sql'].startswith('EXPLAIN') for query in queries))
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=4)
+    def test_table_estimate_is_reused_given_list_below_threshold(self):
+        self._analyze()
+
+        with mock.patch.object(EstimatedCountPaginator, 'table_estimates', LRUCache(maxsize=1, ttl=60)):
+            EstimatedCountPaginator(Proposal.objects.all(), per_page=2).count
+
+            # COUNT(*) only
+            with self.assertNumQueries(1):
+                self.assertEqual(EstimatedCountPaginator(Proposal.objects.filter(min_score=0), per_page=2).count, 3)
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_table_statistics_are_used_given_unfiltered_list_above_threshold(self):
+        self._analyze()
+        paginator = EstimatedCountPaginator(Proposal.objects.all(), per_page=2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_exact)
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_planner_estimate_is_used_given_filtered_list_above_threshold(self):
+        self._analyze()
+        queryset = Proposal.objects.filter(min_score=12345)
+
+        paginator = EstimatedCountPaginator(queryset, per_page=2)
+
+        # the planner never estimates less than a row, while nothing matches
+        self.assertEqual(paginator.count, 1)
+        self.assertFalse(paginator.count_is_exact)
+        self.assertEqual(queryset.count(), 0)
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_zero_count_given_empty_result_set_above_threshold(self):
+        self._analyze()
+        paginator = EstimatedCountPaginator(Proposal.objects.filter(pk__in=[]), per_page=2)
+
+        # the table statistics only, an empty result set is neither planned nor counted
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 0)
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_page_with_rows_is_served_given_estimate_below_row_count(self):
+        self._analyze()
+        organization = OrganizationFactory()
+        for _ in range(4):
+            ProposalFactory(organization=organization, min_score=0, max_score=100)
+
+        # 3 analyzed rows make 2 pages of 2, while 7 rows make 4
+        response = self.client.get(self.url, {'limit': 2, 'page': 4})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_count'], 3)
+        self.assertEqual(len(response.json()['list']), 1)
+
+        response = self.client.get(self.url, {'limit': 2, 'page': 5})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
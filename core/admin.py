@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from common.pagination import EstimatedCountPaginator
 from .models import (
     Organization, Proposal, ClientApplication, OrganizationClientApplication
 )
@@ -7,19 +8,23 @@ from .models import (
 
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
-    pass
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Proposal)
 class ProposalAdmin(admin.ModelAdmin):
-    pass
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(ClientApplication)
 class ClientApplicationAdmin(admin.ModelAdmin):
-    pass
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(OrganizationClientApplication)
 class OrganizationClientApplicationAdmin(admin.ModelAdmin):
-    pass
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
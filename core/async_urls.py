@@ -0,0 +1,15 @@
+from django.urls import path
+
+from .async_views import (
+    client_application_list, client_application_retrieve, proposal_list,
+    organization_application_list, organization_application_retrieve)
+
+# read-only routes of the v1 API served by async views, for ASGI workers
+urlpatterns = [
+    path('applications/', client_application_list, name='client_applications'),
+    path('applications/<int:pk>/', client_application_retrieve, name='client_applications_retrieve'),
+    path('organization_applications/', organization_application_list, name='organization_applications'),
+    path('organization_applications/<int:pk>/', organization_application_retrieve,
+         name='organization_applications_detail'),
+    path('proposals/', proposal_list, name='proposals'),
+]
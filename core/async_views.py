@@ -0,0 +1,61 @@
+from common.async_views import async_api_view, render_list, render_object
+from common.compiled_serializers import compile_serializer
+from common.exceptions import PermissionDeniedException
+from users.permissions import CAN_CREATE_CLIENT_APPLICATION
+from users.services import UserService
+from .serializers import (
+    ClientApplicationSerializer, ClientApplicationRetrieveSerializer, ProposalSerializer,
+    OrganizationClientApplicationSerializer)
+from .services import ClientApplicationService, ProposalService, OrganizationClientApplicationService
+
+
+@async_api_view
+async def client_application_list(request):
+    if not await UserService.has_permission_async(user=request.user, permission_codename=CAN_CREATE_CLIENT_APPLICATION):
+        raise PermissionDeniedException('You do not have permission to perform this action')
+
+    if UserService.is_partner_user(user=request.user):
+        queryset = ClientApplicationService.filter(partner=request.user)
+    else:
+        queryset = ClientApplicationService.filter()
+
+    return await render_list(request, queryset, ClientApplicationSerializer)
+
+
+@async_api_view
+async def client_application_retrieve(request, pk):
+    application = await ClientApplicationService.get_application_values_async(
+        user=request.user,
+        application_pk=pk,
+        fields=compile_serializer(ClientApplicationRetrieveSerializer).fields
+    )
+
+    return render_object(application, ClientApplicationRetrieveSerializer)
+
+
+@async_api_view
+async def proposal_list(request):
+    return await render_list(request, ProposalService.filter(), ProposalSerializer)
+
+
+@async_api_view
+async def organization_application_list(request):
+    queryset = await OrganizationClientApplicationService.get_user_applications_async(user=request.user)
+
+    return await render_list(request, queryset, OrganizationClientApplicationSerializer)
+
+
+@async_api_view
+async def organization_application_retrieve(request, pk):
+    application = await OrganizationClientApplicationService.get_values_async(
+        fields=compile_serializer(OrganizationClientApplicationSerializer).fields + ('organization',),
+        pk=pk
+    )
+
+    if not await OrganizationClientApplicationService.can_see_organization_async(
+            organization_id=application['organization'],
+            user=request.user
+    ):
+        raise PermissionDeniedException('You have not permission to perform this action')
+
+    return render_object(application, OrganizationClientApplicationSerializer)
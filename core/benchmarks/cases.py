@@ -0,0 +1,175 @@
+import inspect
+from collections import OrderedDict
+
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common.compiled_serializers import compile_serializer
+from common.pagination import GeneralPagination
+from core import serializers
+from core.constants import CONSUMER, NEW, SENT
+from core.models import ClientApplication
+from core.services import ClientApplicationService, ProposalService, OrganizationClientApplicationService
+from .runner import rolled_back
+from .seed import Dataset
+
+PAGE_SIZE = 20
+
+SERVICES = 'services'
+SERIALIZERS = 'serializers'
+PAGINATION = 'pagination'
+GROUPS = (SERVICES, SERIALIZERS, PAGINATION)
+
+
+def _service_cases(dataset: Dataset) -> OrderedDict:
+    client_application_pk = dataset.client_application_ids[0]
+    organization_application_pk = dataset.organization_application_ids[0]
+    client_application = ClientApplicationService.get(pk=client_application_pk)
+    bulk_payload = [{
+        'partner': dataset.partner.pk, 'first_name': 'Bob', 'last_name': 'Martin', 'middle_name': 'Petrovich',
+        'date_of_birth': '1990-01-01', 'phone_number': '+996777666555', 'passport_number': 'AN54325325', 'score': 50,
+    }] * 100
+
+    return OrderedDict((
+        ('ClientApplicationService.filter', lambda: list(ClientApplicationService.filter()[:PAGE_SIZE])),
+        ('ClientApplicationService.filter(partner)',
+         lambda: list(ClientApplicationService.filter(partner=dataset.partner)[:PAGE_SIZE])),
+        ('ClientApplicationService.get_application',
+         lambda: ClientApplicationService.get_application(user=dataset.partner, application_pk=client_application_pk)),
+        ('ClientApplicationService.bulk_create(100)',
+         rolled_back(lambda: ClientApplicationService.bulk_create(applications=bulk_payload))),
+        ('ProposalService.filter', lambda: list(ProposalService.filter()[:PAGE_SIZE])),
+        ('ProposalService.get', lambda: ProposalService.get(pk=dataset.proposal_ids[0])),
+        ('ProposalService.get_eligible_proposal_ids',
+         lambda: ProposalService.get_eligible_proposal_ids(score=client_application.score, credit_type=CONSUMER)),
+        ('ProposalService.get_eligible_proposals',
+         lambda: list(ProposalService.get_eligible_proposals(score=client_application.score))),
+        ('OrganizationClientApplicationService.get', lambda: OrganizationClientApplicationService.get(
+            pk=organization_application_pk)),
+        ('OrganizationClientApplicationService.get_user_applications(administrator)', lambda: list(
+            OrganizationClientApplicationService.get_user_applications(user=dataset.administrator)[:PAGE_SIZE])),
+        ('OrganizationClientApplicationService.get_user_applications(specialist)', lambda: list(
+            OrganizationClientApplicationService.get_user_applications(user=dataset.specialist)[:PAGE_SIZE])),
+        ('OrganizationClientApplicationService.get_user_applications(partner)', lambda: list(
+            OrganizationClientApplicationService.get_user_applications(user=dataset.partner)[:PAGE_SIZE])),
+        ('OrganizationClientApplicationService.export_rows(1000)', lambda: list(zip(
+            range(1000),
+            OrganizationClientApplicationService.export_rows(OrganizationClientApplicationService.filter())))),
+        ('OrganizationClientApplicationService.fan_out', rolled_back(
+            lambda: OrganizationClientApplicationService.fan_out(client_application=client_application))),
+        ('OrganizationClientApplicationService.bulk_update_status(100)', rolled_back(
+            lambda: OrganizationClientApplicationService.bulk_update_status(
+                user=dataset.administrator, application_ids=dataset.organization_application_ids, status=SENT))),
+    ))
+
+
+def _serializer_payloads(dataset: Dataset) -> dict:
+    """Valid input for every writing serializer"""
+    client_application = {
+        'partner': dataset.partner.pk, 'first_name': 'Bob', 'last_name': 'Martin', 'middle_name': 'Petrovich',
+        'date_of_birth': '1990-01-01', 'phone_number': '+996777666555', 'passport_number': 'AN54325325', 'score': 50,
+    }
+    organization_application = {
+        'client_application': dataset.client_application_ids[0], 'proposal': dataset.proposal_ids[0], 'status': NEW,
+    }
+    now = timezone.now().isoformat()
+    proposal = ProposalService.get(pk=dataset.proposal_ids[0])
+
+    return {
+        serializers.ClientApplicationCreateSerializer: client_application,
+        serializers.ClientApplicationUpdateSerializer: client_application,
+        serializers.ClientApplicationBulkItemSerializer: client_application,
+        serializers.ClientApplicationBulkCreateSerializer: {'applications': [client_application] * 100},
+        serializers.ProposalCreateSerializer: {
+            'name': 'Proposal', 'credit_type': CONSUMER, 'organization': proposal.organization_id,
+            'start_rotation_date': now, 'end_rotation_date': now, 'min_score': 0, 'max_score': 100,
+        },
+        serializers.OrganizationClientApplicationCreateSerializer: organization_application,
+        serializers.OrganizationClientApplicationUpdateSerializer: organization_application,
+        serializers.OrganizationClientApplicationExportSerializer: {'file_format': 'csv'},
+        serializers.OrganizationClientApplicationFanOutSerializer: {
+            'client_application': dataset.client_application_ids[0]},
+        serializers.ChangeOrgApplicationStatusSerializer: {'status': SENT},
+        serializers.BulkChangeOrgApplicationStatusSerializer: {
+            'ids': dataset.organization_application_ids, 'status': SENT},
+    }
+
+
+def _serializer_instances(dataset: Dataset) -> dict:
+    """A page of instances for every reading serializer"""
+    client_applications = list(ClientApplicationService.filter()[:PAGE_SIZE])
+    proposals = list(ProposalService.filter()[:PAGE_SIZE])
+    organization_applications = list(OrganizationClientApplicationService.filter()[:PAGE_SIZE])
+
+    return {
+        serializers.ClientApplicationSerializer: client_applications,
+        serializers.ClientApplicationRetrieveSerializer: client_applications,
+        serializers.OrganizationSerializer: [proposal.organization for proposal in proposals],
+        serializers.ProposalSerializer: proposals,
+        serializers.OrganizationClientApplicationSerializer: organization_applications,
+    }
+
+
+def _serializer_cases(dataset: Dataset) -> OrderedDict:
+    cases = OrderedDict()
+    payloads = _serializer_payloads(dataset)
+    instances = _serializer_instances(dataset)
+
+    for name, serializer_class in inspect.getmembers(serializers, inspect.isclass):
+        if not issubclass(serializer_class, serializers.serializers.BaseSerializer) or \
+                serializer_class.__module__ != serializers.__name__:
+            continue
+
+        if serializer_class in instances:
+            page = instances[serializer_class]
+            compiled_serializer = compile_serializer(serializer_class)
+            queryset = serializer_class.Meta.model.objects.filter(pk__in=[instance.pk for instance in page])
+            rows = list(queryset.values(*compiled_serializer.fields))
+
+            cases['{name}.data({size})'.format(name=name, size=len(page))] = \
+                lambda serializer_class=serializer_class, page=page: serializer_class(page, many=True).data
+            cases['{name}.compiled({size})'.format(name=name, size=len(rows))] = \
+                lambda compiled_serializer=compiled_serializer, rows=rows: compiled_serializer.render_many(rows)
+
+        if serializer_class in payloads:
+            cases['{name}.is_valid'.format(name=name)] = \
+                lambda serializer_class=serializer_class, data=payloads[serializer_class]: \
+                serializer_class(data=data).is_valid(raise_exception=True)
+
+    return cases
+
+
+def _paginate(queryset, query_params: dict):
+    request = Request(APIRequestFactory().get('/', query_params))
+    paginator = GeneralPagination()
+    page = paginator.paginate_queryset(queryset, request)
+
+    return paginator.get_paginated_response(list(page)).data
+
+
+def _pagination_cases(dataset: Dataset) -> OrderedDict:
+    queryset = OrganizationClientApplicationService.filter().values('id', 'status', 'created_at')
+    last_page = max(dataset.size // GeneralPagination.page_size, 1)
+    deep_row = OrganizationClientApplicationService.filter().order_by(*GeneralPagination.cursor_ordering).values(
+        'id', 'created_at')[max(dataset.size - GeneralPagination.page_size, 0)]
+    deep_cursor = GeneralPagination._encode_cursor(deep_row)
+    client_applications = ClientApplication.objects.values('id', 'created_at')
+
+    return OrderedDict((
+        ('GeneralPagination.page(first)', lambda: _paginate(queryset, {})),
+        ('GeneralPagination.page(last)', lambda: _paginate(queryset, {'page': last_page})),
+        ('GeneralPagination.page(filtered)', lambda: _paginate(
+            client_applications.filter(partner=dataset.partner), {})),
+        ('GeneralPagination.cursor(first)', lambda: _paginate(queryset, {'cursor': ''})),
+        ('GeneralPagination.cursor(last)', lambda: _paginate(queryset, {'cursor': deep_cursor})),
+    ))
+
+
+def get_cases(dataset: Dataset) -> OrderedDict:
+    """Benchmark cases by group, each case a callable without arguments"""
+    return OrderedDict((
+        (SERVICES, _service_cases(dataset)),
+        (SERIALIZERS, _serializer_cases(dataset)),
+        (PAGINATION, _pagination_cases(dataset)),
+    ))
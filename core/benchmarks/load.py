@@ -0,0 +1,237 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict, namedtuple
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+
+from core.constants import ORGANIZATION_APPLICATION_TYPES
+from core.models import ClientApplication, OrganizationClientApplication, Proposal
+from users import roles
+from .runner import percentile
+
+User = get_user_model()
+
+API_PREFIXES = {
+    'v1': '/api/v1/',
+    # read-only routes served by async views
+    'async': '/api/async/v1/',
+}
+
+Request = namedtuple('Request', ('route', 'method', 'path', 'body'))
+
+# fixtures of one authenticated user: token and the rows it may touch
+Actor = namedtuple('Actor', ('role', 'token', 'user_pk', 'client_application_ids',
+                             'organization_application_ids', 'proposal_ids'))
+
+STATUSES = [status for status, _ in ORGANIZATION_APPLICATION_TYPES]
+
+
+def _client_application_payload(rng: random.Random, partner_pk: int) -> dict:
+    return {
+        'partner': partner_pk, 'first_name': 'Load', 'last_name': 'Test', 'middle_name': 'Client',
+        'date_of_birth': '1990-01-01', 'phone_number': '+996{number:09d}'.format(number=rng.randint(0, 10 ** 9 - 1)),
+        'passport_number': 'AN{number:08d}'.format(number=rng.randint(0, 10 ** 8 - 1)),
+        'score': round(rng.uniform(0, 100), 2),
+    }
+
+
+def _partner_requests(rng: random.Random, actor: Actor) -> list:
+    application_pk = rng.choice(actor.client_application_ids)
+    return [
+        (2, Request('POST applications/', 'POST', 'applications/', _client_application_payload(rng, actor.user_pk))),
+        (5, Request('GET applications/', 'GET', 'applications/', None)),
+        (3, Request('GET applications/<pk>/', 'GET', 'applications/{pk}/'.format(pk=application_pk), None)),
+    ]
+
+
+def _specialist_requests(rng: random.Random, actor: Actor) -> list:
+    application_pk = rng.choice(actor.organization_application_ids)
+    return [
+        (5, Request('GET organization_applications/', 'GET', 'organization_applications/', None)),
+        (3, Request('POST organization_applications/<pk>/doChangeStatus/', 'POST',
+                    'organization_applications/{pk}/doChangeStatus/'.format(pk=application_pk),
+                    {'status': rng.choice(STATUSES)})),
+    ]
+
+
+def _administrator_requests(rng: random.Random, actor: Actor) -> list:
+    client_application_pk = rng.choice(actor.client_application_ids)
+    organization_application_pk = rng.choice(actor.organization_application_ids)
+    payload = _client_application_payload(rng, actor.user_pk)
+    return [
+        (3, Request('PUT applications/<pk>/', 'PUT', 'applications/{pk}/'.format(pk=client_application_pk), payload)),
+        (2, Request('PUT organization_applications/<pk>/', 'PUT',
+                    'organization_applications/{pk}/'.format(pk=organization_application_pk), {
+                        'client_application': client_application_pk,
+                        'proposal': rng.choice(actor.proposal_ids),
+                        'status': rng.choice(STATUSES),
+                    })),
+        (2, Request('GET organization_applications/', 'GET', 'organization_applications/', None)),
+        (3, Request('GET proposals/', 'GET', 'proposals/', None)),
+    ]
+
+
+SCENARIOS = {
+    'partner': _partner_requests,
+    'specialist': _specialist_requests,
+    'administrator': _administrator_requests,
+}
+
+
+ROLE_CODENAMES = {
+    'partner': roles.PARTNER['codename'],
+    'specialist': roles.ORGANIZATION_SPECIALIST['codename'],
+    'administrator': roles.ADMINISTRATOR['codename'],
+}
+
+
+def _actor_fixtures(role: str, user: User) -> dict:
+    if role == 'partner':
+        return {'client_application_ids': ClientApplication.objects.filter(partner=user)}
+    if role == 'specialist':
+        return {'organization_application_ids': OrganizationClientApplication.objects.filter(
+            organization__employers=user)}
+    return {
+        'client_application_ids': ClientApplication.objects.all(),
+        'organization_application_ids': OrganizationClientApplication.objects.all(),
+        'proposal_ids': Proposal.objects.all(),
+    }
+
+
+def collect_actors(roles_to_collect, users_per_role: int, ids_per_actor: int = 100) -> dict:
+    """
+    Tokens and touchable rows of up to `users_per_role` active users of every role.
+    Users without rows to work on are skipped
+    """
+    actors = {}
+    for role in roles_to_collect:
+        actors[role] = []
+        for user in User.objects.filter(role_id=ROLE_CODENAMES[role], is_active=True).order_by('id'):
+            fixtures = {
+                name: list(queryset.order_by('-id').values_list('id', flat=True)[:ids_per_actor])
+                for name, queryset in _actor_fixtures(role, user).items()
+            }
+            if not all(fixtures.values()):
+                continue
+
+            token, _ = Token.objects.get_or_create(user=user)
+            actors[role].append(Actor(role=role, token=token.key, user_pk=user.pk,
+                                      client_application_ids=fixtures.get('client_application_ids'),
+                                      organization_application_ids=fixtures.get('organization_application_ids'),
+                                      proposal_ids=fixtures.get('proposal_ids')))
+            if len(actors[role]) == users_per_role:
+                break
+
+    return actors
+
+
+def next_request(rng: random.Random, actor: Actor, read_only: bool = False) -> Request:
+    scenario = SCENARIOS[actor.role](rng, actor)
+    if read_only:
+        scenario = [(weight, request) for weight, request in scenario if request.method == 'GET']
+    weights, requests = zip(*scenario)
+    return rng.choices(requests, weights=weights)[0]
+
+
+class LoadTest:
+    """
+    Drive the v1 routes from `concurrency` threads, each picking a random actor by role mix
+    and a random request from the actor's scenario, until `duration` seconds pass.
+    The async API only serves reads, so its scenarios are limited to GET requests
+    """
+
+    def __init__(self, base_url: str, actors: dict, mix: dict, concurrency: int, duration: float, seed: int = 0,
+                 api: str = 'v1', read_only: bool = False):
+        self.base_url = urlsplit(base_url)
+        self.api_prefix = API_PREFIXES[api]
+        self.read_only = read_only or api == 'async'
+        self.actors = actors
+        self.mix = mix
+        self.concurrency = concurrency
+        self.duration = duration
+        self.seed = seed
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.base_url.scheme == 'https':
+            connection_class = http.client.HTTPSConnection
+        else:
+            connection_class = http.client.HTTPConnection
+        return connection_class(self.base_url.hostname, self.base_url.port, timeout=30)
+
+    def _worker(self, index: int, deadline: float, samples: dict) -> None:
+        rng = random.Random(self.seed + index)
+        roles, weights = zip(*self.mix.items())
+        connection = self._connect()
+
+        while time.perf_counter() < deadline:
+            actor = rng.choice(self.actors[rng.choices(roles, weights=weights)[0]])
+            request = next_request(rng, actor, read_only=self.read_only)
+            headers = {'Authorization': 'Token {token}'.format(token=actor.token), 'Content-Type': 'application/json'}
+            body = json.dumps(request.body) if request.body is not None else None
+
+            start = time.perf_counter()
+            try:
+                connection.request(request.method, self.base_url.path.rstrip('/') + self.api_prefix + request.path,
+                                   body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = self._connect()
+                status = None
+            samples[request.route].append((time.perf_counter() - start, status))
+
+        connection.close()
+
+    def run(self) -> dict:
+        deadline = time.perf_counter() + self.duration
+        # every thread collects its own samples, merged once the run is over
+        thread_samples = [defaultdict(list) for _ in range(self.concurrency)]
+        threads = [threading.Thread(target=self._worker, args=(index, deadline, thread_samples[index]))
+                   for index in range(self.concurrency)]
+
+        started_at = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started_at
+
+        samples = defaultdict(list)
+        for worker_samples in thread_samples:
+            for route, route_samples in worker_samples.items():
+                samples[route] += route_samples
+
+        all_samples = [sample for route_samples in samples.values() for sample in route_samples]
+        return {
+            'elapsed': round(elapsed, 3),
+            'routes': {route: self._summarize(route_samples, elapsed)
+                       for route, route_samples in sorted(samples.items())},
+            'total': self._summarize(all_samples, elapsed),
+        }
+
+    @staticmethod
+    def _summarize(samples: list, elapsed: float) -> dict:
+        if not samples:
+            return {'requests': 0, 'requests_per_sec': 0, 'statuses': {}}
+
+        latencies = sorted(latency for latency, _ in samples)
+        statuses = defaultdict(int)
+        for _, status in samples:
+            statuses[str(status) if status is not None else 'error'] += 1
+
+        return {
+            'requests': len(samples),
+            'requests_per_sec': round(len(samples) / elapsed, 2),
+            'statuses': dict(statuses),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p90_ms': round(percentile(latencies, 90) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'max_ms': round(latencies[-1] * 1000, 3),
+        }
@@ -0,0 +1,48 @@
+import time
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class _Rollback(Exception):
+    pass
+
+
+def rolled_back(func):
+    """Run a writing benchmark case inside a transaction that is always rolled back"""
+    def wrapper():
+        try:
+            with transaction.atomic():
+                func()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    return wrapper
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, iterations: int, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        queries += len(context.captured_queries)
+
+    timings.sort()
+    return {
+        'ops_per_sec': round(iterations / sum(timings), 2),
+        'p50_ms': round(percentile(timings, 50) * 1000, 4),
+        'p99_ms': round(percentile(timings, 99) * 1000, 4),
+        'queries': round(queries / iterations, 2),
+    }
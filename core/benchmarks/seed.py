@@ -0,0 +1,255 @@
+import io
+import itertools
+import random
+from array import array
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.constants import CONSUMER, MORTGAGE, CAR_LOAN, NEW, SENT, RECEIVED, ACCEPTED, DECLINED, ISSUED
+from core.models import Organization, Proposal, ClientApplication, OrganizationClientApplication
+from users import roles
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = 'benchmark'
+COPY_CHUNK_SIZE = 100000
+
+CREDIT_TYPE_WEIGHTS = ((CONSUMER, 60), (CAR_LOAN, 25), (MORTGAGE, 15))
+STATUS_WEIGHTS = ((NEW, 30), (SENT, 25), (RECEIVED, 15), (ACCEPTED, 10), (DECLINED, 15), (ISSUED, 5))
+FIRST_NAMES = ('Aibek', 'Aigerim', 'Bakyt', 'Nurlan', 'Elena', 'Ivan', 'Maria', 'Timur', 'Dinara', 'Azamat')
+LAST_NAMES = ('Asanov', 'Ivanov', 'Toktogulov', 'Petrova', 'Sadykov', 'Kim', 'Abdyldaev', 'Smirnova')
+
+Counts = namedtuple('Counts', (
+    'partners', 'specialists', 'organizations', 'proposals', 'client_applications', 'organization_applications'))
+
+Dataset = namedtuple('Dataset', (
+    'size', 'administrator', 'specialist', 'partner',
+    'client_application_ids', 'proposal_ids', 'organization_application_ids'))
+
+
+def default_counts(organization_applications: int) -> Counts:
+    """Row counts of the other tables in production proportions"""
+    organizations = max(organization_applications // 50000, 20)
+    return Counts(
+        partners=max(organization_applications // 1000, 5),
+        specialists=organizations * 2,
+        organizations=organizations,
+        proposals=organizations * 10,
+        client_applications=max(organization_applications // 2, 1),
+        organization_applications=organization_applications,
+    )
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+    return str(value)
+
+
+def copy_rows(model, fields: tuple, rows) -> int:
+    """Load rows, tuples in `fields` order, into the model table with COPY in chunks"""
+    columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+    sql = 'COPY {table} ({columns}) FROM STDIN'.format(
+        table=connection.ops.quote_name(model._meta.db_table), columns=columns)
+
+    count = 0
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while True:
+            chunk = list(itertools.islice(rows, COPY_CHUNK_SIZE))
+            if not chunk:
+                return count
+
+            buffer = io.StringIO()
+            for row in chunk:
+                buffer.write('\t'.join(_copy_value(value) for value in row))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            count += len(chunk)
+
+
+def reserve_ids(model, count: int) -> range:
+    """Move the primary key sequence past `count` ids, so rows can be copied with known ids"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT setval(pg_get_serial_sequence(%(table)s, %(column)s), '
+            'nextval(pg_get_serial_sequence(%(table)s, %(column)s)) + %(count)s - 1)',
+            {'table': model._meta.db_table, 'column': model._meta.pk.column, 'count': count}
+        )
+        last_id = cursor.fetchone()[0]
+
+    return range(last_id - count + 1, last_id + 1)
+
+
+def _cumulative_weights(weights) -> list:
+    return list(itertools.accumulate(weights))
+
+
+def _pareto_weights(rng: random.Random, count: int) -> list:
+    # a few partners and proposals get most of the traffic
+    return _cumulative_weights(rng.paretovariate(1.16) for _ in range(count))
+
+
+def _generate_users(rng: random.Random, counts: Counts, now) -> tuple:
+    password = make_password(BENCHMARK_PASSWORD)
+    user_ids = reserve_ids(User, 1 + counts.partners + counts.specialists)
+    partner_ids = user_ids[1:1 + counts.partners]
+    specialist_ids = user_ids[1 + counts.partners:]
+
+    def rows():
+        yield (user_ids[0], 'bench_admin@example.com', password, roles.ADMINISTRATOR['codename'], 'Admin', 'Admin')
+        for index, user_id in enumerate(partner_ids):
+            yield (user_id, 'bench_partner_{index}@example.com'.format(index=index), password,
+                   roles.PARTNER['codename'], rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+        for index, user_id in enumerate(specialist_ids):
+            yield (user_id, 'bench_specialist_{index}@example.com'.format(index=index), password,
+                   roles.ORGANIZATION_SPECIALIST['codename'], rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+
+    copy_rows(User, ('id', 'email', 'password', 'role', 'first_name', 'last_name',
+                     'is_superuser', 'is_staff', 'is_active', 'date_joined', 'created_at', 'updated_at'),
+              (row + (False, False, True, now, now, now) for row in rows()))
+
+    return partner_ids, specialist_ids
+
+
+def _generate_organizations(rng: random.Random, counts: Counts, specialist_ids: range, now) -> range:
+    organization_ids = reserve_ids(Organization, counts.organizations)
+    copy_rows(Organization, ('id', 'name', 'created_at', 'updated_at'), (
+        (organization_id, 'Organization {index}'.format(index=index), now, now)
+        for index, organization_id in enumerate(organization_ids)
+    ))
+
+    through = Organization.employers.through
+    copy_rows(through, ('organization', 'user'), (
+        (organization_ids[index % len(organization_ids)], specialist_id)
+        for index, specialist_id in enumerate(specialist_ids)
+    ))
+
+    return organization_ids
+
+
+def _generate_proposals(rng: random.Random, counts: Counts, organization_ids: range, now) -> range:
+    proposal_ids = reserve_ids(Proposal, counts.proposals)
+    credit_types, weights = zip(*CREDIT_TYPE_WEIGHTS)
+    cum_weights = _cumulative_weights(weights)
+
+    def rows():
+        for index, proposal_id in enumerate(proposal_ids):
+            min_score = round(rng.uniform(0, 80))
+            yield (proposal_id, organization_ids[index % len(organization_ids)],
+                   'Proposal {index}'.format(index=index), rng.choices(credit_types, cum_weights=cum_weights)[0],
+                   now - timedelta(days=rng.randint(0, 90)), now + timedelta(days=rng.randint(-30, 180)),
+                   min_score, min_score + round(rng.uniform(5, 40)), now, now)
+
+    copy_rows(Proposal, ('id', 'organization', 'name', 'credit_type', 'start_rotation_date', 'end_rotation_date',
+                         'min_score', 'max_score', 'created_at', 'updated_at'), rows())
+
+    return proposal_ids
+
+
+def _generate_client_applications(rng: random.Random, counts: Counts, partner_ids: range, now) -> tuple:
+    client_application_ids = reserve_ids(ClientApplication, counts.client_applications)
+    partner_weights = _pareto_weights(rng, len(partner_ids))
+    # a year of applications, created in id order
+    step = timedelta(days=365) / counts.client_applications
+    started_at = now - timedelta(days=365)
+    created_offsets = array('d')
+
+    def rows():
+        for index, client_application_id in enumerate(client_application_ids):
+            created_at = started_at + step * index
+            created_offsets.append((created_at - started_at).total_seconds())
+            yield (client_application_id, rng.choices(partner_ids, cum_weights=partner_weights)[0],
+                   rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES),
+                   date(1950, 1, 1) + timedelta(days=rng.randint(0, 52 * 365)),
+                   '+996{number:09d}'.format(number=rng.randint(0, 10 ** 9 - 1)),
+                   'AN{number:08d}'.format(number=rng.randint(0, 10 ** 8 - 1)),
+                   round(min(max(rng.gauss(60, 15), 0), 100), 2), created_at, created_at)
+
+    copy_rows(ClientApplication, ('id', 'partner', 'first_name', 'last_name', 'middle_name', 'date_of_birth',
+                                  'phone_number', 'passport_number', 'score', 'created_at', 'updated_at'), rows())
+
+    return client_application_ids, started_at, created_offsets
+
+
+def _generate_organization_applications(rng: random.Random, counts: Counts, client_applications: tuple,
+                                        proposal_ids: range, organization_ids: range, now) -> None:
+    client_application_ids, started_at, created_offsets = client_applications
+    # proposals are spread over organizations in _generate_proposals order
+    proposal_organization_ids = {
+        proposal_id: organization_ids[index % len(organization_ids)] for index, proposal_id in enumerate(proposal_ids)
+    }
+    proposal_weights = _pareto_weights(rng, len(proposal_ids))
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    status_weights = _cumulative_weights(weights)
+
+    def rows():
+        for _ in range(counts.organization_applications):
+            index = rng.randrange(len(client_application_ids))
+            # sent to organizations within a week of the client application
+            created_at = min(started_at + timedelta(seconds=created_offsets[index] + rng.uniform(0, 7 * 86400)), now)
+            proposal_id = rng.choices(proposal_ids, cum_weights=proposal_weights)[0]
+            yield (client_application_ids[index], proposal_id, proposal_organization_ids[proposal_id],
+                   rng.choices(statuses, cum_weights=status_weights)[0], created_at, created_at)
+
+    copy_rows(OrganizationClientApplication,
+              ('client_application', 'proposal', 'organization', 'status', 'created_at', 'updated_at'), rows())
+
+
+def generate(counts: Counts, seed: int = 0) -> None:
+    """
+    Load synthetic users, organizations, proposals, client applications and organization applications with COPY.
+    Every user gets the same precomputed BENCHMARK_PASSWORD hash, rows are deterministic for a given seed
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    with transaction.atomic():
+        partner_ids, specialist_ids = _generate_users(rng, counts, now)
+        organization_ids = _generate_organizations(rng, counts, specialist_ids, now)
+        proposal_ids = _generate_proposals(rng, counts, organization_ids, now)
+        client_applications = _generate_client_applications(rng, counts, partner_ids, now)
+        _generate_organization_applications(rng, counts, client_applications, proposal_ids, organization_ids, now)
+
+    # fresh planner statistics, estimated page counts depend on them
+    with connection.cursor() as cursor:
+        for model in (User, Organization, Proposal, ClientApplication, OrganizationClientApplication):
+            cursor.execute('ANALYZE {table}'.format(table=connection.ops.quote_name(model._meta.db_table)))
+
+
+def get_dataset(size: int) -> Dataset:
+    """Handles into an already seeded dataset"""
+    specialist = User.objects.filter(
+        email__startswith='bench_specialist_', organizations__proposal__organizationclientapplication__isnull=False
+    ).earliest('id')
+    partner = User.objects.filter(
+        email__startswith='bench_partner_', clientapplication__isnull=False).earliest('id')
+
+    return Dataset(
+        size=size,
+        administrator=User.objects.get(email='bench_admin@example.com'),
+        specialist=specialist,
+        partner=partner,
+        client_application_ids=list(
+            ClientApplication.objects.filter(partner=partner).values_list('id', flat=True)[:100]),
+        proposal_ids=list(Proposal.objects.values_list('id', flat=True)),
+        organization_application_ids=list(OrganizationClientApplication.objects.values_list('id', flat=True)[:100]),
+    )
+
+
+def seed(size: int) -> Dataset:
+    """Seed `size` organization applications with the other tables in default proportions"""
+    generate(default_counts(size), seed=size)
+    return get_dataset(size)
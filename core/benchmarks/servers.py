@@ -0,0 +1,117 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import namedtuple
+from urllib.error import URLError
+
+from django.conf import settings
+
+GUNICORN_CONFIG = os.path.join(settings.BASE_DIR, 'scripts', 'gunicorn.conf.py')
+
+# concurrency model of a WSGI server, applied through the GUNICORN_* variables of scripts/gunicorn.conf.py
+Mode = namedtuple('Mode', ('name', 'worker_class', 'threads', 'preload'))
+
+WORKER_CLASSES = ('sync', 'gthread')
+
+
+def parse_mode(value: str, threads: int) -> Mode:
+    """`sync`, `gthread`, `sync+preload` or `gthread+preload`"""
+    worker_class, _, option = value.partition('+')
+    if worker_class not in WORKER_CLASSES or option not in ('', 'preload'):
+        raise ValueError('Unknown mode {mode}, expected one of {worker_classes} with an optional +preload'.format(
+            mode=value, worker_classes=', '.join(WORKER_CLASSES)))
+
+    return Mode(value, worker_class, threads if worker_class == 'gthread' else 1, option == 'preload')
+
+
+def _gunicorn_executable() -> str:
+    # the one installed next to the running interpreter, e.g. in a virtualenv that is not activated
+    executable = os.path.join(os.path.dirname(sys.executable), 'gunicorn')
+    return executable if os.path.exists(executable) else 'gunicorn'
+
+
+def start_gunicorn(port: int, workers: int, mode: Mode, environment: dict = None) -> subprocess.Popen:
+    """Serve the WSGI app with scripts/gunicorn.conf.py, `environment` is added to the one of this process"""
+    environment = dict(os.environ, **(environment or {}))
+    environment.update(GUNICORN_WORKER_CLASS=mode.worker_class, GUNICORN_THREADS=str(mode.threads),
+                       GUNICORN_PRELOAD=str(mode.preload).lower())
+
+    # own process group, so every worker is stopped with the master
+    return subprocess.Popen([_gunicorn_executable(), '-b', '127.0.0.1:{port}'.format(port=port),
+                             '--workers={workers}'.format(workers=workers), '--config', GUNICORN_CONFIG,
+                             '--log-level', 'warning', 'project.wsgi'],
+                            cwd=settings.BASE_DIR, env=environment, start_new_session=True)
+
+
+def wait_healthy(url: str, server: subprocess.Popen, timeout: float = 30) -> bool:
+    """Whether `url`/health answered before the server exited or `timeout` seconds passed"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            urllib.request.urlopen(url.rstrip('/') + '/health', timeout=1)
+            return True
+        except (URLError, OSError):
+            time.sleep(0.2)
+    return False
+
+
+def stop(server: subprocess.Popen) -> None:
+    try:
+        os.killpg(server.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    server.wait()
+
+
+def process_tree(pid: int) -> list:
+    """`pid` and its descendants, e.g. a gunicorn master and its workers"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{pid}/stat'.format(pid=entry)) as stat:
+                # the command name in parentheses may contain spaces
+                parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    pids = [pid]
+    for current in pids:
+        pids += children.get(current, [])
+    return pids
+
+
+def _read_memory(pid: int) -> dict:
+    """Rss and Pss of a process in kB, Pss counts a page shared by n processes as 1/n of it"""
+    usage = {'Rss': 0, 'Pss': 0}
+    # smaps_rollup sums smaps, it is missing before Linux 4.14
+    for name in ('smaps_rollup', 'smaps'):
+        try:
+            with open('/proc/{pid}/{name}'.format(pid=pid, name=name)) as smaps:
+                for line in smaps:
+                    key, _, value = line.partition(':')
+                    if key in usage:
+                        usage[key] += int(value.split()[0])
+            return usage
+        except FileNotFoundError:
+            continue
+    return usage
+
+
+def memory_usage(pid: int) -> dict:
+    """
+    Memory of a process tree in MB. Rss counts pages shared copy-on-write in every process,
+    while the Pss sum is what the whole tree really takes
+    """
+    pids = process_tree(pid)
+    usages = [_read_memory(process) for process in pids]
+    return {
+        'processes': len(pids),
+        'rss_mb': round(sum(usage['Rss'] for usage in usages) / 1024, 1),
+        'pss_mb': round(sum(usage['Pss'] for usage in usages) / 1024, 1),
+    }
@@ -0,0 +1,109 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Boots the project like a fresh gunicorn worker and prints the milliseconds of every phase as JSON.
+# AppConfig.create() is wrapped before django.setup(), so the ready() of every app is timed on its own
+BOOT_SCRIPT = '''
+import json
+import time
+
+import django
+from django.apps import AppConfig
+
+ready_ms = {}
+create = AppConfig.create.__func__
+
+
+def timed_create(cls, entry):
+    app_config = create(cls, entry)
+    ready = app_config.ready
+
+    def timed_ready():
+        start = time.perf_counter()
+        ready()
+        ready_ms[app_config.label] = (time.perf_counter() - start) * 1000
+
+    app_config.ready = timed_ready
+    return app_config
+
+
+AppConfig.create = classmethod(timed_create)
+phases_ms = {}
+
+
+def phase(name, func):
+    start = time.perf_counter()
+    func()
+    phases_ms[name] = (time.perf_counter() - start) * 1000
+
+
+phase('setup', django.setup)
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_resolver
+
+phase('middleware', WSGIHandler)
+phase('urls', lambda: get_resolver().url_patterns)
+print(json.dumps({'phases': phases_ms, 'ready': ready_ms}))
+'''
+
+
+def parse_importtime(output: str) -> list:
+    """(module, self ms, cumulative ms) of every import reported by `python -X importtime`"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append((module.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return imports
+
+
+def boot() -> dict:
+    """Phase, ready() and import times of one fresh interpreter booting the project"""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT], cwd=settings.BASE_DIR,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if process.returncode:
+        raise RuntimeError('Booting the project failed:\n{stderr}'.format(stderr=process.stderr[-2000:]))
+
+    result = json.loads(process.stdout.splitlines()[-1])
+    imports = parse_importtime(process.stderr)
+
+    packages = defaultdict(float)
+    for module, self_ms, _ in imports:
+        packages[module.split('.')[0]] += self_ms
+
+    result.update(process=elapsed, imports=sum(self_ms for _, self_ms, _ in imports), packages=packages,
+                  modules={module: cumulative_ms for module, _, cumulative_ms in imports})
+    return result
+
+
+def _median(values: list) -> float:
+    return round(statistics.median(values), 2)
+
+
+def measure_startup(runs: int) -> dict:
+    """Median milliseconds of `runs` boots: the whole process, every phase and ready(), imports by package and module"""
+    boots = [boot() for _ in range(runs)]
+
+    def medians(key: str) -> dict:
+        names = dict.fromkeys(name for result in boots for name in result[key])
+        return {name: _median([result[key].get(name, 0) for result in boots]) for name in names}
+
+    return {
+        'runs': runs,
+        'process_ms': _median([result['process'] for result in boots]),
+        'imports_ms': _median([result['imports'] for result in boots]),
+        'phases_ms': medians('phases'),
+        'ready_ms': medians('ready'),
+        'packages_ms': medians('packages'),
+        'modules_ms': medians('modules'),
+    }
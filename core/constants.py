@@ -27,3 +27,45 @@ ORGANIZATION_APPLICATION_TYPES = (
     (DECLINED, DECLINED.capitalize()),
     (ISSUED, ISSUED.capitalize()),
 )
+
+# Statuses of organization applications still waiting on the organization
+
+OPEN_ORGANIZATION_APPLICATION_STATUSES = (NEW, SENT, RECEIVED)
+
+# Allowed organization application status transitions
+
+ORGANIZATION_APPLICATION_TRANSITIONS = {
+    NEW: (SENT,),
+    SENT: (RECEIVED,),
+    RECEIVED: (ACCEPTED, DECLINED),
+    ACCEPTED: (ISSUED,),
+    DECLINED: (),
+    ISSUED: (),
+}
+
+# Bulk operations
+
+BULK_MAX_SIZE = 5000
+BULK_CREATE_BATCH_SIZE = 1000
+
+# Organization applications export
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+
+EXPORT_FORMATS = (
+    (CSV, CSV.upper()),
+    (NDJSON, NDJSON.upper()),
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = (
+    'id', 'status', 'created_at', 'updated_at',
+    'client_application_id', 'client_application__first_name', 'client_application__last_name',
+    'client_application__middle_name', 'client_application__date_of_birth',
+    'client_application__phone_number', 'client_application__passport_number',
+    'client_application__score', 'client_application__partner_id', 'client_application__partner__email',
+    'proposal_id', 'proposal__name', 'proposal__credit_type',
+    'proposal__organization_id', 'proposal__organization__name',
+)
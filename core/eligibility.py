@@ -0,0 +1,71 @@
+import threading
+
+from common.interval_tree import IntervalTree
+
+
+class ProposalEligibilityIndex:
+    """
+    In-memory index answering which proposals a score qualifies for at a given moment.
+    Proposals are bucketed by credit type, each bucket is an interval tree over
+    the [min_score, max_score] band that is rebuilt only when one of its proposals changes.
+    """
+
+    fields = ('id', 'credit_type', 'min_score', 'max_score', 'start_rotation_date', 'end_rotation_date')
+
+    def __init__(self, proposals=()):
+        self._proposals = {}
+        self._trees = {}
+        self._lock = threading.Lock()
+
+        for proposal in proposals:
+            self.add(proposal)
+
+    def __len__(self):
+        return len(self._proposals)
+
+    def add(self, proposal: dict) -> None:
+        with self._lock:
+            previous = self._proposals.get(proposal['id'])
+            if previous is not None:
+                self._trees.pop(previous['credit_type'], None)
+
+            self._proposals[proposal['id']] = {field: proposal[field] for field in self.fields}
+            self._trees.pop(proposal['credit_type'], None)
+
+    def remove(self, proposal_id) -> None:
+        with self._lock:
+            previous = self._proposals.pop(proposal_id, None)
+            if previous is not None:
+                self._trees.pop(previous['credit_type'], None)
+
+    def _get_tree(self, credit_type: str) -> IntervalTree:
+        tree = self._trees.get(credit_type)
+        if tree is not None:
+            return tree
+
+        with self._lock:
+            tree = self._trees.get(credit_type)
+            if tree is None:
+                tree = IntervalTree(
+                    (proposal['min_score'], proposal['max_score'], proposal)
+                    for proposal in self._proposals.values()
+                    if proposal['credit_type'] == credit_type
+                )
+                self._trees[credit_type] = tree
+
+            return tree
+
+    def _get_credit_types(self) -> set:
+        with self._lock:
+            return {proposal['credit_type'] for proposal in self._proposals.values()}
+
+    def query(self, score: float, at, credit_type: str = None) -> list:
+        """Ids of proposals whose score band contains score and whose rotation is active at `at`"""
+        credit_types = [credit_type] if credit_type else self._get_credit_types()
+
+        return [
+            proposal['id']
+            for credit_type in credit_types
+            for proposal in self._get_tree(credit_type).query(score)
+            if proposal['start_rotation_date'] <= at <= proposal['end_rotation_date']
+        ]
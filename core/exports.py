@@ -0,0 +1,41 @@
+import csv
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .constants import CSV, NDJSON, EXPORT_FIELDS
+
+EXPORT_CONTENT_TYPES = {
+    CSV: 'text/csv',
+    NDJSON: 'application/x-ndjson',
+}
+
+
+class _Echo:
+    """File-like object handing every written line back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def _iter_csv(rows: Iterable[dict]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in (row[field] for field in EXPORT_FIELDS)
+        ])
+
+
+def _iter_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def stream_export(rows: Iterable[dict], file_format: str) -> Iterator[str]:
+    if file_format == NDJSON:
+        return _iter_ndjson(rows)
+
+    return _iter_csv(rows)
@@ -0,0 +1,80 @@
+import datetime
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db.models import Model
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from common.compiled_serializers import compile_serializer
+from core.constants import CONSUMER, NEW
+from core.models import Organization, Proposal, ClientApplication, OrganizationClientApplication
+from core.serializers import (
+    ClientApplicationSerializer, ProposalSerializer, OrganizationClientApplicationSerializer)
+from users.models import User
+
+
+def _values_row(instance, fields) -> dict:
+    """Emulate a values() row from an in-memory instance"""
+    row = {}
+    for field in fields:
+        value = instance
+        for attribute in field.split('__'):
+            value = getattr(value, attribute) if value is not None else None
+        row[field] = value.pk if isinstance(value, Model) else value
+    return row
+
+
+def _build_instances(count: int) -> dict:
+    now = timezone.now()
+    organization = Organization(id=1, name='Organization')
+    proposal = Proposal(id=1, organization=organization, name='Proposal', credit_type=CONSUMER,
+                        start_rotation_date=now, end_rotation_date=now, min_score=0, max_score=100)
+    partner = User(id=1, first_name='John', last_name='Smith', email='partner@example.com')
+    applications = [
+        ClientApplication(id=index, partner=partner, first_name='Bob', last_name='Martin', middle_name='Petrovich',
+                          date_of_birth=datetime.date(1990, 1, 1), phone_number='+996777666555',
+                          passport_number='AN54325325', score=index % 100)
+        for index in range(count)
+    ]
+
+    return {
+        ClientApplicationSerializer: applications,
+        ProposalSerializer: [proposal] * count,
+        OrganizationClientApplicationSerializer: [
+            OrganizationClientApplication(id=index, client_application=application, proposal=proposal, status=NEW)
+            for index, application in enumerate(applications)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF and compiled list serializers rendering, per 1000 rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+
+        for serializer_class, instances in _build_instances(rows).items():
+            compiled_serializer = compile_serializer(serializer_class)
+            values_rows = [_values_row(instance, compiled_serializer.fields) for instance in instances]
+
+            if renderer.render(serializer_class(instances, many=True).data) != \
+                    renderer.render(compiled_serializer.render_many(values_rows)):
+                self.stderr.write('{name}: compiled output differs'.format(name=serializer_class.__name__))
+                continue
+
+            drf = min(timeit.repeat(lambda: serializer_class(instances, many=True).data, number=1, repeat=repeat))
+            compiled = min(timeit.repeat(lambda: compiled_serializer.render_many(values_rows), number=1, repeat=repeat))
+
+            line = '{name:<45} drf {drf:8.2f} ms  compiled {compiled:8.2f} ms  x{speedup:.1f}  per 1000 rows'
+            self.stdout.write(line.format(
+                name=serializer_class.__name__,
+                drf=drf * 1000 * 1000 / rows,
+                compiled=compiled * 1000 * 1000 / rows,
+                speedup=drf / compiled,
+            ))
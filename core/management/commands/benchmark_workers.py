@@ -0,0 +1,101 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmarks.load import LoadTest, collect_actors
+from core.benchmarks.seed import seed
+from core.benchmarks.servers import memory_usage, parse_mode, start_gunicorn, stop, wait_healthy
+from core.models import OrganizationClientApplication
+from .load_test import _parse_mix
+
+
+class Command(BaseCommand):
+    help = 'Compare memory and throughput of gunicorn concurrency models serving the v1 API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', default=['sync', 'sync+preload', 'gthread', 'gthread+preload'],
+                            help='Worker classes to start, sync or gthread, with an optional +preload')
+        parser.add_argument('--workers', type=int, default=4, help='Workers of every mode')
+        parser.add_argument('--threads', type=int, default=4, help='Threads of every gthread worker')
+        parser.add_argument('--port', type=int, default=5100, help='Port the servers are started on, one at a time')
+        parser.add_argument('--mix', default='partner=60,specialist=30,administrator=10',
+                            help='Weights of roles issuing the requests')
+        parser.add_argument('--read-only', action='store_true', help='Only issue the GET requests of every scenario')
+        parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent clients')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to load every mode')
+        parser.add_argument('--users-per-role', type=int, default=10)
+        parser.add_argument('--seed', type=int, dest='seed_size',
+                            help='Seed this many organization applications first if the database is empty')
+        parser.add_argument('--output', help='Where to write the JSON results')
+
+    def handle(self, *args, **options):
+        mix = _parse_mix(options['mix'])
+        try:
+            modes = [parse_mode(mode, options['threads']) for mode in options['modes']]
+        except ValueError as error:
+            raise CommandError(error)
+
+        if options['seed_size'] and not OrganizationClientApplication.objects.exists():
+            self.stdout.write('Seeding {size} rows...'.format(size=options['seed_size']))
+            seed(options['seed_size'])
+
+        actors = collect_actors(mix, users_per_role=options['users_per_role'])
+        for role, role_actors in actors.items():
+            if not role_actors:
+                raise CommandError('No {role} users with data to work on, seed the database with --seed'.format(
+                    role=role))
+
+        results = [self._run(mode, actors, mix, options) for mode in modes]
+        self._report(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write('Results written to {path}'.format(path=options['output']))
+
+    def _run(self, mode, actors: dict, mix: dict, options: dict) -> dict:
+        url = 'http://127.0.0.1:{port}'.format(port=options['port'])
+        # the servers work on the database the actors were collected from
+        server = start_gunicorn(options['port'], options['workers'], mode,
+                                environment={'POSTGRES_DB': connection.settings_dict['NAME']})
+        try:
+            if not wait_healthy(url, server):
+                raise CommandError('{mode} server did not become healthy, exit code {code}'.format(
+                    mode=mode.name, code=server.poll()))
+            self.stdout.write('{mode}: {workers} workers x {threads} threads'.format(
+                mode=mode.name, workers=options['workers'], threads=mode.threads))
+
+            started = memory_usage(server.pid)
+            load = LoadTest(base_url=url, actors=actors, mix=mix, concurrency=options['concurrency'],
+                            duration=options['duration'], read_only=options['read_only']).run()
+            loaded = memory_usage(server.pid)
+        finally:
+            stop(server)
+
+        return {
+            'mode': mode.name, 'worker_class': mode.worker_class, 'workers': options['workers'],
+            'threads': mode.threads, 'preload': mode.preload, 'concurrency': options['concurrency'],
+            'read_only': options['read_only'], 'memory_started': started, 'memory_loaded': loaded,
+            'total': load['total'], 'routes': load['routes'],
+        }
+
+    def _report(self, results: list) -> None:
+        line = '{mode:<16} {workers:>7} {threads:>7} {requests_per_sec:>10} {p50_ms:>9} {p99_ms:>9} ' \
+               '{rss_started:>12} {pss_started:>12} {pss_loaded:>11}  {errors}'
+
+        self.stdout.write(self.style.MIGRATE_HEADING(line.format(
+            mode='mode', workers='workers', threads='threads', requests_per_sec='requests/s', p50_ms='p50 ms',
+            p99_ms='p99 ms', rss_started='rss start MB', pss_started='pss start MB', pss_loaded='pss load MB',
+            errors='errors')))
+        for result in results:
+            total = result['total']
+            errors = sum(count for status, count in total['statuses'].items()
+                         if status == 'error' or status.startswith('5'))
+            style = self.style.ERROR if errors or not total['requests'] else str
+            self.stdout.write(style(line.format(
+                mode=result['mode'], workers=result['workers'], threads=result['threads'],
+                requests_per_sec=total['requests_per_sec'], p50_ms=total.get('p50_ms', '-'),
+                p99_ms=total.get('p99_ms', '-'), rss_started=result['memory_started']['rss_mb'],
+                pss_started=result['memory_started']['pss_mb'], pss_loaded=result['memory_loaded']['pss_mb'],
+                errors=errors)))
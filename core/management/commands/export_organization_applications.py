@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.constants import EXPORT_FORMATS, CSV
+from core.exports import stream_export
+from core.services import OrganizationClientApplicationService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Stream organization applications as CSV or NDJSON with bounded memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file-format', choices=[choice for choice, _ in EXPORT_FORMATS], default=CSV)
+        parser.add_argument('--output', help='File path, stdout by default')
+        parser.add_argument('--user', help='Email of the user whose role scoping is applied, all rows by default')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError('User {email} not found'.format(email=options['user']))
+            queryset = OrganizationClientApplicationService.get_user_applications(user=user)
+        else:
+            queryset = OrganizationClientApplicationService.filter()
+
+        rows = OrganizationClientApplicationService.export_rows(queryset=queryset)
+        if not options['output']:
+            for chunk in stream_export(rows, options['file_format']):
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', newline='') as output:
+            for chunk in stream_export(rows, options['file_format']):
+                output.write(chunk)
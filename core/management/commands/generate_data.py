@@ -0,0 +1,39 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.seed import Counts, BENCHMARK_PASSWORD, default_counts, generate
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, organizations, proposals and applications with PostgreSQL COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_applications', type=int,
+                            help='Number of organization applications, other tables are sized in proportion')
+        for name in Counts._fields[:-1]:
+            parser.add_argument('--{name}'.format(name=name.replace('_', '-')), type=int, dest=name,
+                                help='Override the number of {name}'.format(name=name.replace('_', ' ')))
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, equal seeds generate equal rows')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email='bench_admin@example.com').exists():
+            raise CommandError('Synthetic data is already generated in this database')
+
+        counts = default_counts(options['organization_applications'])
+        counts = counts._replace(**{name: options[name] for name in Counts._fields[:-1] if options[name] is not None})
+        if min(counts) < 1:
+            raise CommandError('Every count must be positive')
+
+        started_at = time.monotonic()
+        generate(counts, seed=options['seed'])
+        elapsed = time.monotonic() - started_at
+
+        for name, count in counts._asdict().items():
+            self.stdout.write('{name:<28} {count:>12}'.format(name=name, count=count))
+        self.stdout.write(self.style.SUCCESS(
+            'Generated {rows} rows in {elapsed:.1f}s, users log in with "{password}"'.format(
+                rows=sum(counts) + 1, elapsed=elapsed, password=BENCHMARK_PASSWORD)))
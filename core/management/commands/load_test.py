@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.load import API_PREFIXES, LoadTest, SCENARIOS, collect_actors
+from core.benchmarks.seed import seed
+from core.benchmarks.servers import stop, wait_healthy
+from core.models import OrganizationClientApplication
+
+PROCFILE = os.path.join(settings.BASE_DIR, 'scripts', 'Procfile')
+
+
+def _parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(','):
+        role, _, weight = item.partition('=')
+        if role not in SCENARIOS:
+            raise CommandError('Unknown role {role}, expected one of {roles}'.format(
+                role=role, roles=', '.join(SCENARIOS)))
+        try:
+            mix[role] = float(weight)
+        except ValueError:
+            raise CommandError('Invalid weight for {role}: {weight}'.format(role=role, weight=weight))
+    return mix
+
+
+def _get_change(current: float, previous: float):
+    """Percentage change from previous to current, None from 0"""
+    return (current - previous) / previous * 100 if previous else None
+
+
+def _format_change(change) -> str:
+    return '{change:>7}%'.format(change='n/a') if change is None else '{change:+7.1f}%'.format(change=change)
+
+
+class Command(BaseCommand):
+    help = ('Load test the v1 or async API of a running server '
+            'with a mix of partner, specialist and administrator requests')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base url of the server under test')
+        parser.add_argument('--api', choices=sorted(API_PREFIXES), default='v1',
+                            help='API under test, the async one only serves the GET requests of every scenario')
+        parser.add_argument('--read-only', action='store_true',
+                            help='Only issue the GET requests of every scenario, '
+                                 'to compare the v1 API with the async one')
+        parser.add_argument('--mix', default='partner=60,specialist=30,administrator=10',
+                            help='Weights of roles issuing the requests')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent clients')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+        parser.add_argument('--users-per-role', type=int, default=10)
+        parser.add_argument('--seed', type=int, dest='seed_size',
+                            help='Seed this many organization applications first if the database is empty')
+        parser.add_argument('--start-server', action='store_true',
+                            help='Start the WSGI and ASGI servers from scripts/Procfile for the duration of the run')
+        parser.add_argument('--workers', type=int, help='GUNICORN_WORKERS and ASGI_WORKERS of the started servers')
+        parser.add_argument('--output', help='Where to write the JSON results')
+        parser.add_argument('--compare', help='Results of a previous run to print throughput and p99 changes against')
+
+    def handle(self, *args, **options):
+        mix = _parse_mix(options['mix'])
+        baseline = self._load(options['compare']) if options['compare'] else None
+
+        if options['seed_size'] and not OrganizationClientApplication.objects.exists():
+            self.stdout.write('Seeding {size} rows...'.format(size=options['seed_size']))
+            seed(options['seed_size'])
+
+        actors = collect_actors(mix, users_per_role=options['users_per_role'])
+        for role, role_actors in actors.items():
+            if not role_actors:
+                raise CommandError('No {role} users with data to work on, seed the database with --seed'.format(
+                    role=role))
+
+        server = self._start_server(options) if options['start_server'] else None
+        try:
+            results = LoadTest(base_url=options['url'], actors=actors, mix=mix,
+                               concurrency=options['concurrency'], duration=options['duration'],
+                               api=options['api'], read_only=options['read_only']).run()
+        finally:
+            if server is not None:
+                stop(server)
+
+        results.update(api=options['api'], read_only=options['read_only'] or options['api'] == 'async', mix=mix,
+                       concurrency=options['concurrency'], workers=options['workers'])
+        self._report(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write('Results written to {path}'.format(path=options['output']))
+
+        if baseline is not None:
+            self._compare(baseline, results)
+
+    @staticmethod
+    def _load(path: str) -> dict:
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as error:
+            raise CommandError('Can not read {path}: {error}'.format(path=path, error=error))
+
+    def _start_server(self, options: dict) -> subprocess.Popen:
+        environment = dict(os.environ)
+        if options['workers']:
+            environment['GUNICORN_WORKERS'] = environment['ASGI_WORKERS'] = str(options['workers'])
+        if not environment.get('GUNICORN_WORKERS'):
+            raise CommandError('Pass --workers or set GUNICORN_WORKERS to start the server')
+        environment.setdefault('ASGI_WORKERS', environment['GUNICORN_WORKERS'])
+
+        # own process group, so honcho and every gunicorn worker are stopped together
+        server = subprocess.Popen(['honcho', '-f', PROCFILE, 'start'], cwd=settings.BASE_DIR,
+                                  env=environment, start_new_session=True)
+        if not wait_healthy(options['url'], server):
+            exited = server.poll() is not None
+            stop(server)
+            if exited:
+                raise CommandError('Server exited with code {code}'.format(code=server.returncode))
+            raise CommandError('Server did not become healthy in 30 seconds')
+        return server
+
+    def _report(self, results: dict) -> None:
+        line = '{route:<55} {requests:>8} {requests_per_sec:>9.1f}/s  p50 {p50_ms:8.2f}  p90 {p90_ms:8.2f}  ' \
+               'p99 {p99_ms:8.2f}  max {max_ms:8.2f} ms  {status_counts}'
+
+        self.stdout.write(self.style.MIGRATE_HEADING('{elapsed}s, {concurrency} clients'.format(**results)))
+        for route, summary in list(results['routes'].items()) + [('total', results['total'])]:
+            if not summary['requests']:
+                continue
+            status_counts = ' '.join('{status}:{count}'.format(status=status, count=count)
+                                     for status, count in sorted(summary['statuses'].items()))
+            failed = any(status == 'error' or status.startswith('5') for status in summary['statuses'])
+            style = self.style.ERROR if failed else str
+            self.stdout.write(style(line.format(route=route, status_counts=status_counts, **summary)))
+
+    def _compare(self, baseline: dict, results: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING('Compared to the {api} API with {concurrency} clients'.format(
+            api=baseline.get('api', 'v1'), concurrency=baseline.get('concurrency'))))
+
+        for route, summary in list(results['routes'].items()) + [('total', results['total'])]:
+            previous = baseline['total'] if route == 'total' else baseline.get('routes', {}).get(route)
+            if not previous or not previous['requests'] or not summary['requests']:
+                continue
+
+            throughput = _get_change(summary['requests_per_sec'], previous['requests_per_sec'])
+            p99 = _get_change(summary['p99_ms'], previous['p99_ms'])
+            style = str
+            if throughput is not None:
+                style = self.style.ERROR if throughput < -10 else self.style.SUCCESS if throughput > 10 else str
+            self.stdout.write(style('  {route:<55} {throughput} requests/s  {p99} p99'.format(
+                route=route, throughput=_format_change(throughput), p99=_format_change(p99))))
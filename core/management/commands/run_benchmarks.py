@@ -0,0 +1,105 @@
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmarks.cases import get_cases, GROUPS
+from core.benchmarks.runner import measure
+from core.benchmarks.seed import seed, get_dataset
+from core.models import OrganizationClientApplication
+
+
+class Command(BaseCommand):
+    help = 'Benchmark services, serializers and pagination on seeded datasets of the given sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000],
+                            help='Number of organization applications to seed, one run per size')
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--group', choices=GROUPS, action='append', dest='groups',
+                            help='Run only the given group, may be repeated')
+        parser.add_argument('--output', default='benchmark_results.json', help='Where to write the JSON results')
+        parser.add_argument('--compare', help='Results of a previous run to print p50 deltas against')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the seeded benchmark databases and reuse them on the next run')
+
+    def handle(self, *args, **options):
+        baseline = self._load(options['compare']) if options['compare'] else None
+        results = {
+            'started_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'iterations': options['iterations'],
+            'sizes': {},
+        }
+
+        for size in options['sizes']:
+            results['sizes'][str(size)] = self._run_size(size, options)
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2)
+        self.stdout.write('Results written to {path}'.format(path=options['output']))
+
+        if baseline is not None:
+            self._compare(baseline, results)
+
+    def _run_size(self, size: int, options: dict) -> dict:
+        # every size gets its own throwaway database, the configured one is never touched
+        settings_dict = connection.settings_dict
+        old_name = settings_dict['NAME']
+        settings_dict['TEST'] = dict(settings_dict.get('TEST') or {},
+                                     NAME='{name}_benchmark_{size}'.format(name=old_name, size=size))
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+
+        try:
+            if OrganizationClientApplication.objects.exists():
+                dataset = get_dataset(size)
+            else:
+                self.stdout.write('Seeding {size} rows...'.format(size=size))
+                dataset = seed(size)
+
+            return self._run_cases(size, dataset, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+    def _run_cases(self, size: int, dataset, options: dict) -> dict:
+        results = {}
+        for group, cases in get_cases(dataset).items():
+            if options['groups'] and group not in options['groups']:
+                continue
+
+            self.stdout.write(self.style.MIGRATE_HEADING('{group} @ {size}'.format(group=group, size=size)))
+            results[group] = {}
+            for name, func in cases.items():
+                result = measure(func, iterations=options['iterations'])
+                results[group][name] = result
+                self.stdout.write('  {name:<75} {ops_per_sec:>10.1f} ops/s  p50 {p50_ms:8.3f} ms  '
+                                  'p99 {p99_ms:8.3f} ms  {queries:5.1f} queries'.format(name=name, **result))
+        return results
+
+    @staticmethod
+    def _load(path: str) -> dict:
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as error:
+            raise CommandError('Can not read {path}: {error}'.format(path=path, error=error))
+
+    def _compare(self, baseline: dict, results: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING('p50 compared to {started_at}'.format(
+            started_at=baseline.get('started_at'))))
+
+        line = '  {size:>8} {name:<75} {change:+7.1f}%  queries {previous} -> {queries}'
+        for size, groups in results['sizes'].items():
+            for group, cases in groups.items():
+                for name, result in cases.items():
+                    previous = baseline.get('sizes', {}).get(size, {}).get(group, {}).get(name)
+                    if not previous or not previous['p50_ms']:
+                        continue
+
+                    change = (result['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100
+                    style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                    self.stdout.write(style(line.format(
+                        size=size, name=name, change=change,
+                        previous=previous['queries'], queries=result['queries'])))
@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = 'Measure how long a fresh worker takes to boot: import time per package and module and app ready() cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to boot, medians are reported')
+        parser.add_argument('--top', type=int, default=20, help='Number of packages and modules to print')
+        parser.add_argument('--output', help='Where to write the JSON results')
+        parser.add_argument('--compare', help='Results of a previous run to print boot time changes against')
+
+    def handle(self, *args, **options):
+        baseline = self._load(options['compare']) if options['compare'] else None
+        try:
+            results = measure_startup(options['runs'])
+        except RuntimeError as error:
+            raise CommandError(error)
+
+        self._report(results, options['top'])
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write('Results written to {path}'.format(path=options['output']))
+
+        if baseline is not None:
+            self._compare(baseline, results)
+
+    @staticmethod
+    def _load(path: str) -> dict:
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as error:
+            raise CommandError('Can not read {path}: {error}'.format(path=path, error=error))
+
+    def _report(self, results: dict, top: int) -> None:
+        line = '  {name:<60} {ms:>9.2f} ms'
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Median of {runs} boots: {process_ms:.1f} ms process, {imports_ms:.1f} ms importing'.format(**results)))
+        for name, ms in results['phases_ms'].items():
+            self.stdout.write(line.format(name=name, ms=ms))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('ready()'))
+        for name, ms in sorted(results['ready_ms'].items(), key=lambda item: -item[1]):
+            self.stdout.write(line.format(name=name, ms=ms))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Import time by package, own modules only'))
+        for name, ms in sorted(results['packages_ms'].items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(line.format(name=name, ms=ms))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Import time by module, with the modules it imported first'))
+        for name, ms in sorted(results['modules_ms'].items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(line.format(name=name, ms=ms))
+
+    def _compare(self, baseline: dict, results: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING('Compared to the previous run'))
+
+        timings = [('process', baseline['process_ms'], results['process_ms']),
+                   ('imports', baseline['imports_ms'], results['imports_ms'])]
+        timings += [(name, baseline['phases_ms'].get(name), ms) for name, ms in results['phases_ms'].items()]
+        for name, previous, ms in timings:
+            if not previous:
+                continue
+            change = (ms - previous) / previous * 100
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+            self.stdout.write(style('  {name:<60} {previous:>9.2f} -> {ms:>9.2f} ms {change:+7.1f}%'.format(
+                name=name, previous=previous, ms=ms, change=change)))
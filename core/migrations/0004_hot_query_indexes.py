@@ -0,0 +1,48 @@
+# Generated by Django 3.1.2 on 2026-10-18 09:32
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_auto_20201019_1716'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='clientapplication',
+            index=models.Index(fields=['-created_at', 'id'], name='client_app_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientapplication',
+            index=models.Index(fields=['partner', '-created_at'], name='client_app_partner_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['-created_at', 'id'], name='organization_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organizationclientapplication',
+            index=models.Index(fields=['-created_at', 'id'], name='org_app_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organizationclientapplication',
+            index=models.Index(fields=['proposal', 'status', '-created_at'], name='org_app_proposal_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organizationclientapplication',
+            index=models.Index(condition=models.Q(status__in=('new', 'sent', 'received')), fields=['proposal', '-created_at'], name='org_app_open_proposal_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organizationclientapplication',
+            index=models.Index(condition=models.Q(status__in=('new', 'sent', 'received')), fields=['-created_at', 'id'], name='org_app_open_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='proposal',
+            index=models.Index(fields=['-created_at', 'id'], name='proposal_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizationclientapplication',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True,
+                                    on_delete=django.db.models.deletion.CASCADE, to='core.organization'),
+        ),
+        migrations.RunSQL(
+            sql='UPDATE core_organizationclientapplication AS application '
+                'SET organization_id = proposal.organization_id '
+                'FROM core_proposal AS proposal '
+                'WHERE proposal.id = application.proposal_id',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
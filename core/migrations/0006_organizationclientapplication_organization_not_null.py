@@ -0,0 +1,26 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # the backfill has to be committed before the column can be altered,
+    # and the index is built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_organizationclientapplication_organization'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organizationclientapplication',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False,
+                                    on_delete=django.db.models.deletion.CASCADE, to='core.organization'),
+        ),
+        AddIndexConcurrently(
+            model_name='organizationclientapplication',
+            index=models.Index(fields=['organization', '-created_at'], name='org_app_org_created_idx'),
+        ),
+    ]
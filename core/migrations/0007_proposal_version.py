@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_organizationclientapplication_organization_not_null'),
+    ]
+
+    # Every statement writing proposals or organizations, ORM or not, moves the version to the next value
+    # of a sequence. The row is updated in the writing transaction, so the new version becomes visible
+    # together with the written rows, and values of rolled back transactions are never reused
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'CREATE SEQUENCE core_proposal_version_seq',
+                'CREATE TABLE core_proposal_version (version bigint NOT NULL)',
+                'INSERT INTO core_proposal_version (version) VALUES (0)',
+                '''
+                CREATE FUNCTION core_bump_proposal_version() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE core_proposal_version SET version = nextval('core_proposal_version_seq');
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                ''',
+                'CREATE TRIGGER core_proposal_bump_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_proposal '
+                'FOR EACH STATEMENT EXECUTE PROCEDURE core_bump_proposal_version()',
+                'CREATE TRIGGER core_organization_bump_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_organization '
+                'FOR EACH STATEMENT EXECUTE PROCEDURE core_bump_proposal_version()',
+            ],
+            reverse_sql=[
+                'DROP TRIGGER core_organization_bump_version ON core_organization',
+                'DROP TRIGGER core_proposal_bump_version ON core_proposal',
+                'DROP FUNCTION core_bump_proposal_version()',
+                'DROP TABLE core_proposal_version',
+                'DROP SEQUENCE core_proposal_version_seq',
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_proposal_version'),
+        ('users', '0006_shared_version'),
+    ]
+
+    # Cached employer -> organization ids are stale after any change of the employers m2m table.
+    # Deleted organizations and users cascade to it, so they move the version as well
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "INSERT INTO common_shared_version (name, version) VALUES ('employer_organizations', 0)",
+                'CREATE TRIGGER core_organization_employers_bump_shared_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_organization_employers '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('employer_organizations')",
+            ],
+            reverse_sql=[
+                'DROP TRIGGER core_organization_employers_bump_shared_version ON core_organization_employers',
+                "DELETE FROM common_shared_version WHERE name = 'employer_organizations'",
+            ],
+        ),
+    ]
@@ -0,0 +1,102 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_employer_organizations_shared_version'),
+    ]
+
+    # core_proposal_version moves to two shared versions:
+    # proposal_list, moved by any write to proposals or organizations, which the cached /proposals/ pages show;
+    # proposal_eligibility, moved only when a proposal is added, removed or changes its credit type,
+    # score band or rotation. Every such change records the proposal id with the version it moved to,
+    # so workers apply the proposals changed since the version of their index instead of rebuilding it.
+    # The version row is locked until the writing transaction commits, so versions are recorded in commit order.
+    # A truncate can not tell the removed ids and records proposal 0, telling workers to rebuild
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'DROP TRIGGER core_organization_bump_version ON core_organization',
+                'DROP TRIGGER core_proposal_bump_version ON core_proposal',
+                'DROP FUNCTION core_bump_proposal_version()',
+                'DROP TABLE core_proposal_version',
+                'DROP SEQUENCE core_proposal_version_seq',
+                "INSERT INTO common_shared_version (name, version) VALUES ('proposal_list', 0), "
+                "('proposal_eligibility', 0)",
+                'CREATE TRIGGER core_proposal_bump_shared_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_proposal '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('proposal_list')",
+                'CREATE TRIGGER core_organization_bump_shared_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_organization '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('proposal_list')",
+                'CREATE TABLE core_proposal_change (proposal_id integer PRIMARY KEY, version bigint NOT NULL)',
+                'CREATE INDEX core_proposal_change_version_idx ON core_proposal_change (version)',
+                '''
+                CREATE FUNCTION core_record_proposal_change() RETURNS trigger AS $$
+                DECLARE
+                    changed_version bigint;
+                    changed_id integer;
+                BEGIN
+                    UPDATE common_shared_version SET version = nextval('common_shared_version_seq')
+                    WHERE name = 'proposal_eligibility' RETURNING version INTO changed_version;
+
+                    IF TG_OP = 'TRUNCATE' THEN
+                        DELETE FROM core_proposal_change;
+                        changed_id := 0;
+                    ELSIF TG_OP = 'DELETE' THEN
+                        changed_id := OLD.id;
+                    ELSE
+                        changed_id := NEW.id;
+                    END IF;
+
+                    INSERT INTO core_proposal_change (proposal_id, version) VALUES (changed_id, changed_version)
+                    ON CONFLICT (proposal_id) DO UPDATE SET version = EXCLUDED.version;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                ''',
+                'CREATE TRIGGER core_proposal_record_change '
+                'AFTER INSERT OR DELETE ON core_proposal '
+                'FOR EACH ROW EXECUTE PROCEDURE core_record_proposal_change()',
+                'CREATE TRIGGER core_proposal_record_eligibility_change '
+                'AFTER UPDATE OF credit_type, min_score, max_score, start_rotation_date, end_rotation_date '
+                'ON core_proposal FOR EACH ROW '
+                'WHEN (OLD.credit_type IS DISTINCT FROM NEW.credit_type '
+                'OR OLD.min_score IS DISTINCT FROM NEW.min_score OR OLD.max_score IS DISTINCT FROM NEW.max_score '
+                'OR OLD.start_rotation_date IS DISTINCT FROM NEW.start_rotation_date '
+                'OR OLD.end_rotation_date IS DISTINCT FROM NEW.end_rotation_date) '
+                'EXECUTE PROCEDURE core_record_proposal_change()',
+                'CREATE TRIGGER core_proposal_record_truncate '
+                'AFTER TRUNCATE ON core_proposal '
+                'FOR EACH STATEMENT EXECUTE PROCEDURE core_record_proposal_change()',
+            ],
+            reverse_sql=[
+                'DROP TRIGGER core_proposal_record_truncate ON core_proposal',
+                'DROP TRIGGER core_proposal_record_eligibility_change ON core_proposal',
+                'DROP TRIGGER core_proposal_record_change ON core_proposal',
+                'DROP FUNCTION core_record_proposal_change()',
+                'DROP TABLE core_proposal_change',
+                'DROP TRIGGER core_organization_bump_shared_version ON core_organization',
+                'DROP TRIGGER core_proposal_bump_shared_version ON core_proposal',
+                "DELETE FROM common_shared_version WHERE name IN ('proposal_list', 'proposal_eligibility')",
+                'CREATE SEQUENCE core_proposal_version_seq',
+                'CREATE TABLE core_proposal_version (version bigint NOT NULL)',
+                'INSERT INTO core_proposal_version (version) VALUES (0)',
+                '''
+                CREATE FUNCTION core_bump_proposal_version() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE core_proposal_version SET version = nextval('core_proposal_version_seq');
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                ''',
+                'CREATE TRIGGER core_proposal_bump_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_proposal '
+                'FOR EACH STATEMENT EXECUTE PROCEDURE core_bump_proposal_version()',
+                'CREATE TRIGGER core_organization_bump_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON core_organization '
+                'FOR EACH STATEMENT EXECUTE PROCEDURE core_bump_proposal_version()',
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_proposal_shared_versions'),
+    ]
+
+    # Applications copy the organization of their proposal. Moving a proposal to another organization
+    # moves its applications in the same statement, whether it was saved, updated by a queryset or raw SQL
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                '''
+                CREATE FUNCTION core_sync_application_organization() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE core_organizationclientapplication SET organization_id = NEW.organization_id
+                    WHERE proposal_id = NEW.id;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                ''',
+                'CREATE TRIGGER core_proposal_sync_application_organization '
+                'AFTER UPDATE OF organization_id ON core_proposal FOR EACH ROW '
+                'WHEN (OLD.organization_id IS DISTINCT FROM NEW.organization_id) '
+                'EXECUTE PROCEDURE core_sync_application_organization()',
+            ],
+            reverse_sql=[
+                'DROP TRIGGER core_proposal_sync_application_organization ON core_proposal',
+                'DROP FUNCTION core_sync_application_organization()',
+            ],
+        ),
+    ]
@@ -4,7 +4,7 @@ from django.db import models
 from common.models import TimestampModel
 from .constants import (
     PROPOSAL_TYPES, ORGANIZATION_APPLICATION_TYPES,
-    NEW)
+    OPEN_ORGANIZATION_APPLICATION_STATUSES, NEW)
 
 User = get_user_model()
 
@@ -16,6 +16,9 @@ class Organization(TimestampModel):
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('-created_at', 'id'), name='organization_created_id_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -34,6 +37,9 @@ class Proposal(TimestampModel):
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('-created_at', 'id'), name='proposal_created_id_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -52,6 +58,10 @@ class ClientApplication(TimestampModel):
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('-created_at', 'id'), name='client_app_created_id_idx'),
+            models.Index(fields=('partner', '-created_at'), name='client_app_partner_created_idx'),
+        )
 
     def __str__(self):
         return self.first_name
@@ -60,10 +70,22 @@ class ClientApplication(TimestampModel):
 class OrganizationClientApplication(TimestampModel):
     client_application = models.ForeignKey(ClientApplication, on_delete=models.CASCADE)
     proposal = models.ForeignKey(Proposal, on_delete=models.CASCADE)
+    # copy of proposal.organization for employer scoping, set on save and moved
+    # by a trigger with its proposal, indexed by org_app_org_created_idx
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, editable=False, db_index=False)
     status = models.CharField(max_length=20, choices=ORGANIZATION_APPLICATION_TYPES, default=NEW)
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('-created_at', 'id'), name='org_app_created_id_idx'),
+            models.Index(fields=('proposal', 'status', '-created_at'), name='org_app_proposal_status_idx'),
+            models.Index(fields=('organization', '-created_at'), name='org_app_org_created_idx'),
+            models.Index(fields=('proposal', '-created_at'), name='org_app_open_proposal_idx',
+                         condition=models.Q(status__in=OPEN_ORGANIZATION_APPLICATION_STATUSES)),
+            models.Index(fields=('-created_at', 'id'), name='org_app_open_created_idx',
+                         condition=models.Q(status__in=OPEN_ORGANIZATION_APPLICATION_STATUSES)),
+        )
 
     def __str__(self):
         return self.client_application.first_name
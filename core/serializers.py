@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from core.constants import ORGANIZATION_APPLICATION_TYPES
+from core.constants import ORGANIZATION_APPLICATION_TYPES, BULK_MAX_SIZE, EXPORT_FORMATS, CSV
 from .models import (
     ClientApplication, Organization, Proposal,
     OrganizationClientApplication)
@@ -22,6 +22,23 @@ class ClientApplicationCreateSerializer(serializers.ModelSerializer):
         )
 
 
+class ClientApplicationBulkItemSerializer(serializers.ModelSerializer):
+    # partners of the whole batch are resolved by the service in one query
+    partner = serializers.IntegerField()
+
+    class Meta:
+        model = ClientApplication
+        fields = (
+            'partner', 'first_name', 'last_name',
+            'middle_name', 'date_of_birth', 'phone_number',
+            'passport_number', 'score'
+        )
+
+
+class ClientApplicationBulkCreateSerializer(serializers.Serializer):
+    applications = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=BULK_MAX_SIZE)
+
+
 class ClientApplicationSerializer(serializers.ModelSerializer):
     partner = UserShortSerializer()
 
@@ -91,5 +108,18 @@ class OrganizationClientApplicationUpdateSerializer(OrganizationClientApplicatio
     pass
 
 
+class OrganizationClientApplicationExportSerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default=CSV)
+
+
+class OrganizationClientApplicationFanOutSerializer(serializers.Serializer):
+    client_application = serializers.IntegerField()
+
+
 class ChangeOrgApplicationStatusSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=ORGANIZATION_APPLICATION_TYPES)
+
+
+class BulkChangeOrgApplicationStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=BULK_MAX_SIZE)
+    status = serializers.ChoiceField(choices=ORGANIZATION_APPLICATION_TYPES)
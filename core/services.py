@@ -1,11 +1,24 @@
+import math
+import threading
+from typing import Iterator, List, Tuple
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 
+from common import async_db
+from common.cache import LRUCache
 from common.exceptions import (
     ObjectNotFoundException, IntegrityException,
     PermissionDeniedException)
-from users import roles
+from common.shared_versions import get_shared_version, get_shared_version_async
+from users.services import UserService
+from .constants import (
+    BULK_CREATE_BATCH_SIZE, NEW, ORGANIZATION_APPLICATION_TRANSITIONS,
+    EXPORT_FIELDS, EXPORT_CHUNK_SIZE)
+from .eligibility import ProposalEligibilityIndex
 from .models import (
     ClientApplication, Proposal, Organization,
     OrganizationClientApplication)
@@ -16,25 +29,44 @@ User = get_user_model()
 class ClientApplicationService:
     model = ClientApplication
 
+    @classmethod
+    def _get_queryset(cls) -> QuerySet:
+        return cls.model.objects.select_related('partner')
+
     @classmethod
     def filter(cls, **filters) -> QuerySet:
-        return cls.model.objects.filter(**filters)
+        return cls._get_queryset().filter(**filters)
 
     @classmethod
     def get(cls, **filters) -> ClientApplication:
         try:
-            return cls.model.objects.get(**filters)
+            return cls._get_queryset().get(**filters)
         except cls.model.DoesNotExist:
             raise ObjectNotFoundException('Application not found')
 
+    @classmethod
+    def check_access(cls, user: User, partner_id: int) -> None:
+        """Raise unless `user` may see an application of the partner `partner_id`"""
+        if UserService.is_partner_user(user=user) and partner_id == user.pk:
+            return
+        elif UserService.is_organization_specialist_user(user=user):
+            raise PermissionDeniedException('You do not have permission to perform this action')
+
     @classmethod
     def get_application(cls, user: User, application_pk) -> ClientApplication:
         application = cls.get(pk=application_pk)
-        if user.role.codename == roles.PARTNER['codename'] and application.partner == user:
-            return application
-        elif user.role.codename == roles.ORGANIZATION_SPECIALIST['codename']:
-            raise PermissionDeniedException('You do not have permission to perform this action')
+        cls.check_access(user=user, partner_id=application.partner_id)
+        return application
+
+    @classmethod
+    async def get_application_values_async(cls, user: User, application_pk, fields) -> dict:
+        """get_application() for async views, a values() row of `fields` fetched through the async connection pool"""
+        rows = await async_db.fetch(cls.filter(pk=application_pk).values(*fields, 'partner'))
+        if not rows:
+            raise ObjectNotFoundException('Application not found')
 
+        application = rows[0]
+        cls.check_access(user=user, partner_id=application['partner'])
         return application
 
     @classmethod
@@ -60,6 +92,36 @@ class ClientApplicationService:
         except IntegrityError as e:
             raise IntegrityException('Error while creating Application {e}'.format(e=str(e)))
 
+    @classmethod
+    def bulk_create(cls, applications: List[dict]) -> List[dict]:
+        """
+        Create validated applications in one transaction.
+        Returns a result per application in input order: {'id': ...} or {'errors': ...}
+        """
+        partner_ids = {application['partner'] for application in applications}
+        existing_partner_ids = set(User.objects.filter(pk__in=partner_ids).values_list('pk', flat=True))
+
+        results = []
+        instances = []
+        for application in applications:
+            if application['partner'] not in existing_partner_ids:
+                results.append({'errors': {'partner': ['Invalid pk "{pk}" - object does not exist.'.format(
+                    pk=application['partner'])]}})
+                continue
+
+            instance = cls.model(partner_id=application['partner'],
+                                 **{key: value for key, value in application.items() if key != 'partner'})
+            instances.append(instance)
+            results.append(instance)
+
+        try:
+            with transaction.atomic():
+                cls.model.objects.bulk_create(instances, batch_size=BULK_CREATE_BATCH_SIZE)
+        except IntegrityError as e:
+            raise IntegrityException('Error while creating Applications {e}'.format(e=str(e)))
+
+        return [{'id': result.pk} if isinstance(result, cls.model) else result for result in results]
+
     @classmethod
     def update(cls, application: ClientApplication, first_name: str, last_name: str,
                middle_name: str, date_of_birth, phone_number: str, partner: User,
@@ -85,16 +147,32 @@ class ClientApplicationService:
 class ProposalService:
     model = Proposal
 
+    # (proposal_eligibility version, eligibility index) of this process,
+    # moved to a newer version by applying the proposals changed since its own
+    _eligibility_index = None
+    _eligibility_index_lock = threading.Lock()
+    list_shared_version = 'proposal_list'
+    eligibility_shared_version = 'proposal_eligibility'
+
+    @classmethod
+    def _get_queryset(cls) -> QuerySet:
+        return cls.model.objects.select_related('organization')
+
     @classmethod
     def get(cls, **filters) -> Proposal:
         try:
-            return cls.model.objects.get(**filters)
+            return cls._get_queryset().get(**filters)
         except cls.model.DoesNotExist:
             raise ObjectNotFoundException('Proposal not found')
 
     @classmethod
     def filter(cls, **filters) -> QuerySet:
-        return cls.model.objects.filter(**filters)
+        return cls._get_queryset().filter(**filters)
+
+    @classmethod
+    def get_version(cls) -> int:
+        """Version of proposals and organizations, changed by every write to them once it is committed"""
+        return get_shared_version(cls.list_shared_version)
 
     @classmethod
     def create(cls, organization: Organization, name: str, credit_type: str,
@@ -113,28 +191,176 @@ class ProposalService:
         except IntegrityError as e:
             raise IntegrityException('Error while creating Proposal {e}'.format(e=str(e)))
 
+    @classmethod
+    def _get_changed_proposal_ids(cls, since: int) -> set:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT proposal_id FROM core_proposal_change WHERE version > %s', [since])
+            return {proposal_id for proposal_id, in cursor.fetchall()}
+
+    @classmethod
+    def _update_eligibility_index(cls, index: ProposalEligibilityIndex, since: int) -> bool:
+        """Apply the proposals changed after version `since` to `index`, False if it has to be rebuilt instead"""
+        changed_ids = cls._get_changed_proposal_ids(since)
+        # recorded by a truncate
+        if 0 in changed_ids:
+            return False
+
+        changed = {values['id']: values for values in
+                   cls.model.objects.filter(pk__in=changed_ids).values(*ProposalEligibilityIndex.fields)}
+        for proposal_id in changed_ids:
+            if proposal_id in changed:
+                index.add(changed[proposal_id])
+            else:
+                index.remove(proposal_id)
+
+        return True
+
+    @classmethod
+    def get_eligibility_index(cls) -> ProposalEligibilityIndex:
+        # read before the changes, a change committed meanwhile is applied with the next version
+        version = get_shared_version(cls.eligibility_shared_version)
+        versioned_index = cls._eligibility_index
+        if versioned_index is not None and versioned_index[0] == version:
+            return versioned_index[1]
+
+        with cls._eligibility_index_lock:
+            versioned_index = cls._eligibility_index
+            if versioned_index is not None and versioned_index[0] == version:
+                return versioned_index[1]
+
+            # an older version than the one of the index was read after a rolled back write
+            if versioned_index is None or versioned_index[0] > version or \
+                    not cls._update_eligibility_index(versioned_index[1], since=versioned_index[0]):
+                versioned_index = (version, ProposalEligibilityIndex(
+                    cls.model.objects.values(*ProposalEligibilityIndex.fields).iterator()
+                ))
+            cls._eligibility_index = (version, versioned_index[1])
+
+            return versioned_index[1]
+
+    @classmethod
+    def get_eligible_proposal_ids(cls, score: float, credit_type: str = None, at=None) -> List[int]:
+        return cls.get_eligibility_index().query(score=score, at=at or timezone.now(), credit_type=credit_type)
+
+    @classmethod
+    def get_eligible_proposals(cls, score: float, credit_type: str = None, at=None) -> QuerySet:
+        return cls.filter(pk__in=cls.get_eligible_proposal_ids(score=score, credit_type=credit_type, at=at))
+
+    @classmethod
+    def invalidate_eligibility_index(cls) -> None:
+        with cls._eligibility_index_lock:
+            cls._eligibility_index = None
+
+
+class OrganizationService:
+    model = Organization
+
+    # employer user id -> tuple of organization ids, per process,
+    # cached with the employer_organizations shared version any change of employers moves
+    _employer_organization_ids = LRUCache(settings.EMPLOYER_ORGANIZATIONS_CACHE_SIZE, ttl=math.inf)
+    shared_version = 'employer_organizations'
+
+    @classmethod
+    def _get_employer_queryset(cls, user: User) -> QuerySet:
+        return cls.model.employers.through.objects.filter(user_id=user.pk).values_list('organization_id', flat=True)
+
+    @classmethod
+    def get_employer_organization_ids(cls, user: User) -> Tuple[int, ...]:
+        # only organization specialists work for organizations, no query for anyone else
+        if not UserService.is_organization_specialist_user(user=user):
+            return ()
+
+        # read before the lookup, a change made meanwhile leaves the entry stale
+        version = get_shared_version(cls.shared_version)
+        organization_ids = cls._employer_organization_ids.get(user.pk, version=version)
+        if organization_ids is None:
+            organization_ids = tuple(cls._get_employer_queryset(user))
+            cls._employer_organization_ids.set(user.pk, organization_ids, version=version)
+
+        return organization_ids
+
+    @classmethod
+    async def get_employer_organization_ids_async(cls, user: User) -> Tuple[int, ...]:
+        if not UserService.is_organization_specialist_user(user=user):
+            return ()
+
+        version = await get_shared_version_async(cls.shared_version)
+        organization_ids = cls._employer_organization_ids.get(user.pk, version=version)
+        if organization_ids is None:
+            organization_ids = tuple(await async_db.fetch(cls._get_employer_queryset(user)))
+            cls._employer_organization_ids.set(user.pk, organization_ids, version=version)
+
+        return organization_ids
+
+    @classmethod
+    def is_employer(cls, user: User, organization_id: int) -> bool:
+        """Membership check for object-level permissions, answered from the cache while no worker changed employers"""
+        return organization_id in cls.get_employer_organization_ids(user)
+
 
 class OrganizationClientApplicationService:
     model = OrganizationClientApplication
 
+    @classmethod
+    def _get_queryset(cls) -> QuerySet:
+        # joins everything OrganizationClientApplicationSerializer renders
+        return cls.model.objects.select_related(
+            'client_application__partner',
+            'proposal__organization'
+        )
+
     @classmethod
     def get(cls, **filters):
         try:
-            return cls.model.objects.get(**filters)
+            return cls._get_queryset().get(**filters)
         except cls.model.DoesNotExist:
             raise ObjectNotFoundException('Not found')
 
     @classmethod
     def filter(cls, **filters):
-        return cls.model.objects.filter(**filters)
+        return cls._get_queryset().filter(**filters)
 
     @classmethod
     def get_organization_application_by_employer(cls, user: User) -> QuerySet:
-        return cls.model.objects.filter(proposal__organization__employers__in=[user])
+        return cls._get_queryset().filter(organization_id__in=OrganizationService.get_employer_organization_ids(user))
 
     @classmethod
     def get_org_application_by_partner(cls, user: User) -> QuerySet:
-        return cls.model.objects.filter(client_application__partner=user)
+        return cls._get_queryset().filter(client_application__partner=user)
+
+    @classmethod
+    def get_user_applications(cls, user: User) -> QuerySet:
+        if UserService.is_administrator_user(user=user):
+            return cls.filter()
+        elif UserService.is_organization_specialist_user(user=user):
+            return cls.get_organization_application_by_employer(user=user)
+        elif UserService.is_partner_user(user=user):
+            return cls.get_org_application_by_partner(user=user)
+
+        raise PermissionDeniedException('You do not have permission to perform this action')
+
+    @classmethod
+    async def get_user_applications_async(cls, user: User) -> QuerySet:
+        """get_user_applications() for async views, employer organizations are fetched through the async pool"""
+        if UserService.is_organization_specialist_user(user=user):
+            organization_ids = await OrganizationService.get_employer_organization_ids_async(user=user)
+            return cls._get_queryset().filter(organization_id__in=organization_ids)
+
+        return cls.get_user_applications(user=user)
+
+    @classmethod
+    async def get_values_async(cls, fields, **filters) -> dict:
+        """get() for async views, a values() row of `fields` fetched through the async connection pool"""
+        rows = await async_db.fetch(cls.filter(**filters).values(*fields))
+        if not rows:
+            raise ObjectNotFoundException('Not found')
+
+        return rows[0]
+
+    @classmethod
+    def export_rows(cls, queryset: QuerySet) -> Iterator[dict]:
+        """Flat rows streamed through a server-side cursor, memory does not grow with row count"""
+        return queryset.values(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
 
     @classmethod
     def create(cls, proposal: Proposal, client_application: ClientApplication, status: str) -> model:
@@ -148,6 +374,34 @@ class OrganizationClientApplicationService:
         except IntegrityError as e:
             raise IntegrityException('Error while creating organization application: {e}'.format(e=str(e)))
 
+    @classmethod
+    def fan_out(cls, client_application: ClientApplication,
+                at=None) -> Tuple[List[OrganizationClientApplication], int]:
+        """
+        Send client application to every eligible proposal at once.
+        Returns created organization applications and the number of already existing ones
+        """
+        proposals = list(ProposalService.get_eligible_proposals(score=client_application.score, at=at))
+
+        try:
+            with transaction.atomic():
+                # lock the client application so concurrent fan-outs can not create duplicates
+                list(ClientApplication.objects.select_for_update().filter(pk=client_application.pk).values_list('pk'))
+                existing_proposal_ids = set(cls.model.objects.filter(
+                    client_application=client_application).values_list('proposal_id', flat=True))
+
+                applications = cls.model.objects.bulk_create([
+                    cls.model(proposal=proposal, organization_id=proposal.organization_id,
+                              client_application=client_application, status=NEW)
+                    for proposal in proposals
+                    if proposal.pk not in existing_proposal_ids
+                ], batch_size=BULK_CREATE_BATCH_SIZE)
+
+        except IntegrityError as e:
+            raise IntegrityException('Error while creating organization applications: {e}'.format(e=str(e)))
+
+        return applications, len(proposals) - len(applications)
+
     @classmethod
     def update(cls, application: model, proposal: Proposal,
                client_application: ClientApplication, status: str) -> model:
@@ -161,11 +415,22 @@ class OrganizationClientApplicationService:
         except IntegrityError as e:
             raise IntegrityException('Error while updating organization application: {e}'.format(e=str(e)))
 
+    @classmethod
+    def can_see_organization(cls, user: User, organization_id: int, employer_organization_ids) -> bool:
+        """Whether `user` may see applications of an organization, given the organizations employing the user"""
+        return UserService.is_administrator_user(user=user) or (
+            UserService.is_organization_specialist_user(user=user) and organization_id in employer_organization_ids)
+
     @classmethod
     def can_see_this_application(cls, application: model, user: User) -> bool:
-        return (user.role.codename == roles.ADMINISTRATOR['codename']) or \
-               (user.role.codename == roles.ORGANIZATION_SPECIALIST['codename'] and
-                user in application.proposal.organization.employers)
+        return cls.can_see_organization(user, application.organization_id,
+                                        OrganizationService.get_employer_organization_ids(user))
+
+    @classmethod
+    async def can_see_organization_async(cls, organization_id: int, user: User) -> bool:
+        """can_see_this_application() for async views, given the organization of the application"""
+        return cls.can_see_organization(user, organization_id,
+                                        await OrganizationService.get_employer_organization_ids_async(user))
 
     @classmethod
     def update_status(cls, application: model, status: str) -> model:
@@ -177,3 +442,41 @@ class OrganizationClientApplicationService:
 
         except IntegrityError as e:
             raise IntegrityException('Error while updating organization application status: {e}'.format(e=str(e)))
+
+    @classmethod
+    def bulk_update_status(cls, user: User, application_ids: List[int], status: str) -> Tuple[List[int], List[int]]:
+        """
+        Move applications to status if ORGANIZATION_APPLICATION_TRANSITIONS allows it, in one UPDATE.
+        Returns changed and rejected ids
+        """
+        allowed_statuses = [
+            current_status for current_status, next_statuses in ORGANIZATION_APPLICATION_TRANSITIONS.items()
+            if status in next_statuses
+        ]
+        changed_ids = []
+
+        if allowed_statuses:
+            queryset = cls.model.objects.filter(pk__in=application_ids, status__in=allowed_statuses)
+            if UserService.is_organization_specialist_user(user=user):
+                queryset = queryset.filter(organization_id__in=OrganizationService.get_employer_organization_ids(user))
+
+            subquery, params = queryset.values('pk').query.sql_with_params()
+            try:
+                with connection.cursor() as cursor:
+                    # the subquery reads the statement snapshot, the status of rows changed by a concurrent
+                    # transition is only seen by the row recheck of the UPDATE itself
+                    cursor.execute(
+                        'UPDATE {table} SET status = %s, updated_at = %s '
+                        'WHERE id IN ({subquery}) AND status = ANY(%s) RETURNING id'.format(
+                            table=cls.model._meta.db_table, subquery=subquery),
+                        [status, timezone.now(), *params, allowed_statuses]
+                    )
+                    changed_ids = sorted(row[0] for row in cursor.fetchall())
+            except IntegrityError as e:
+                raise IntegrityException('Error while updating organization applications status: {e}'.format(e=str(e)))
+
+        changed = set(changed_ids)
+        rejected_ids = [application_id for application_id in dict.fromkeys(application_ids)
+                        if application_id not in changed]
+
+        return changed_ids, rejected_ids
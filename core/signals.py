@@ -0,0 +1,9 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .models import OrganizationClientApplication
+
+
+@receiver(pre_save, sender=OrganizationClientApplication)
+def set_organization_application_organization(sender, instance, **kwargs):
+    instance.organization_id = instance.proposal.organization_id
@@ -0,0 +1,143 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TransactionTestCase, LiveServerTestCase
+
+from core.benchmarks.cases import get_cases, GROUPS
+from core.benchmarks.load import LoadTest, SCENARIOS, collect_actors
+from core.benchmarks.runner import measure
+from core.benchmarks.seed import BENCHMARK_PASSWORD, Counts, generate, seed
+from core.management.commands.load_test import Command as LoadTestCommand
+from core.models import Organization, Proposal, ClientApplication, OrganizationClientApplication
+from core.services import ProposalService
+
+User = get_user_model()
+
+
+# TransactionTestCase runs after the TestCases, so seeded rows do not shift their primary keys
+class BenchmarkCasesTest(TransactionTestCase):
+    # keep the roles created by the data migrations across flushes
+    serialized_rollback = True
+
+    def tearDown(self):
+        ProposalService.invalidate_eligibility_index()
+
+    def test_seed_creates_given_number_of_organization_applications(self):
+        seed(200)
+
+        self.assertEqual(OrganizationClientApplication.objects.count(), 200)
+        self.assertEqual(ClientApplication.objects.count(), 100)
+
+    def test_generate_copies_given_counts_with_usable_passwords(self):
+        generate(Counts(partners=3, specialists=4, organizations=2, proposals=5,
+                        client_applications=50, organization_applications=120))
+
+        self.assertEqual(User.objects.filter(email__startswith='bench_').count(), 1 + 3 + 4)
+        self.assertEqual(Organization.employers.through.objects.count(), 4)
+        self.assertEqual(Proposal.objects.count(), 5)
+        self.assertEqual(ClientApplication.objects.count(), 50)
+        self.assertEqual(OrganizationClientApplication.objects.count(), 120)
+        self.assertTrue(User.objects.get(email='bench_partner_0@example.com').check_password(BENCHMARK_PASSWORD))
+
+        # primary key sequences are moved past the copied ids
+        copied_ids = set(ClientApplication.objects.values_list('pk', flat=True))
+        application = ClientApplication.objects.create(
+            first_name='Bob', last_name='Martin', middle_name='Petrovich', date_of_birth='1990-01-01',
+            phone_number='+996777666555', passport_number='AN54325325', score=50)
+        self.assertGreater(application.pk, max(copied_ids))
+
+    def test_every_case_runs_and_writing_cases_are_rolled_back(self):
+        dataset = seed(200)
+        cases = get_cases(dataset)
+
+        self.assertEqual(tuple(cases), GROUPS)
+        for group_cases in cases.values():
+            for name, func in group_cases.items():
+                with self.subTest(case=name):
+                    result = measure(func, iterations=2, warmup=0)
+                    self.assertGreater(result['ops_per_sec'], 0)
+                    self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+        self.assertEqual(OrganizationClientApplication.objects.count(), 200)
+        self.assertEqual(ClientApplication.objects.count(), 100)
+
+
+class LoadTestTest(LiveServerTestCase):
+    serialized_rollback = True
+
+    def tearDown(self):
+        ProposalService.invalidate_eligibility_index()
+
+    def test_every_role_drives_its_routes_without_server_errors(self):
+        seed(200)
+        mix = {role: 1 for role in SCENARIOS}
+        actors = collect_actors(mix, users_per_role=2)
+
+        results = LoadTest(base_url=self.live_server_url, actors=actors, mix=mix, concurrency=2, duration=2).run()
+
+        self.assertEqual(set(actors), set(SCENARIOS))
+        self.assertGreater(results['total']['requests'], 0)
+        for route, summary in results['routes'].items():
+            with self.subTest(route=route):
+                self.assertTrue(all(status[0] in '24' for status in summary['statuses']), summary['statuses'])
+
+
+class LoadTestCompareTest(SimpleTestCase):
+
+    def test_change_is_not_available_given_zero_baseline(self):
+        summary = {'requests': 10, 'requests_per_sec': 5.0, 'p99_ms': 20.0}
+        baseline = {'total': {'requests': 10, 'requests_per_sec': 0, 'p99_ms': 0}, 'routes': {}}
+        output = StringIO()
+
+        LoadTestCommand(stdout=output)._compare(baseline, {'total': summary, 'routes': {}})
+
+        self.assertIn('n/a% requests/s      n/a% p99', output.getvalue())
+
+
+class BenchmarkWorkersTest(TransactionTestCase):
+    # the gunicorn servers read the seeded rows through connections of their own
+    serialized_rollback = True
+
+    def tearDown(self):
+        ProposalService.invalidate_eligibility_index()
+
+    def test_every_mode_is_served_and_measured(self):
+        seed(200)
+
+        with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as output:
+            call_command('benchmark_workers', modes=['sync', 'gthread+preload'], workers=1, threads=2,
+                         concurrency=2, duration=1, users_per_role=2, output=output.name, stdout=StringIO())
+            results = json.load(output)
+
+        self.assertEqual([(result['mode'], result['threads'], result['preload']) for result in results],
+                         [('sync', 1, False), ('gthread+preload', 2, True)])
+        for result in results:
+            with self.subTest(mode=result['mode']):
+                self.assertGreater(result['total']['requests'], 0)
+                self.assertTrue(all(status[0] in '24' for status in result['total']['statuses']))
+                # the master and its worker
+                self.assertEqual(result['memory_started']['processes'], 2)
+                self.assertGreater(result['memory_loaded']['pss_mb'], 0)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_workers', modes=['gevent'], stdout=StringIO())
+
+
+class StartupReportTest(SimpleTestCase):
+
+    def test_boot_is_measured_without_docs_and_async_database_stack(self):
+        with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as output:
+            call_command('startup_report', runs=1, output=output.name, stdout=StringIO())
+            results = json.load(output)
+
+        self.assertEqual(list(results['phases_ms']), ['setup', 'middleware', 'urls'])
+        self.assertIn('core', results['ready_ms'])
+        self.assertGreater(results['packages_ms']['django'], 0)
+        self.assertIn('core.views', results['modules_ms'])
+        # loaded by the first request to docs/ and the first async query
+        self.assertNotIn('rest_framework.documentation', results['modules_ms'])
+        self.assertNotIn('asyncpg', results['modules_ms'])
@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from common.interval_tree import IntervalTree
+from core.constants import CONSUMER, MORTGAGE
+from core.eligibility import ProposalEligibilityIndex
+
+
+class IntervalTreeTest(SimpleTestCase):
+
+    def test_query_matches_brute_force_given_random_intervals(self):
+        rng = random.Random(42)
+        intervals = []
+        for value in range(300):
+            low = rng.uniform(0, 1000)
+            intervals.append((low, low + rng.uniform(0, 200), value))
+        tree = IntervalTree(intervals)
+
+        for point in [rng.uniform(-10, 1250) for _ in range(200)] + [intervals[0][0], intervals[0][1]]:
+            expected = sorted(value for low, high, value in intervals if low <= point <= high)
+            self.assertEqual(sorted(tree.query(point)), expected)
+
+    def test_query_returns_nothing_given_empty_tree(self):
+        self.assertEqual(IntervalTree([]).query(1), [])
+
+
+class ProposalEligibilityIndexTest(SimpleTestCase):
+    def setUp(self) -> None:
+        self.now = timezone.make_aware(datetime(2020, 10, 20))
+        self.active = {'start_rotation_date': self.now - timedelta(days=1),
+                       'end_rotation_date': self.now + timedelta(days=1)}
+        self.index = ProposalEligibilityIndex([
+            dict(id=1, credit_type=CONSUMER, min_score=0, max_score=50, **self.active),
+            dict(id=2, credit_type=CONSUMER, min_score=40, max_score=100, **self.active),
+            dict(id=3, credit_type=MORTGAGE, min_score=0, max_score=100, **self.active),
+            dict(id=4, credit_type=CONSUMER, min_score=0, max_score=100,
+                 start_rotation_date=self.now - timedelta(days=10), end_rotation_date=self.now - timedelta(days=5)),
+        ])
+
+    def test_query_filters_by_score_band_rotation_window_and_credit_type(self):
+        self.assertEqual(sorted(self.index.query(score=45, at=self.now)), [1, 2, 3])
+        self.assertEqual(sorted(self.index.query(score=45, at=self.now, credit_type=CONSUMER)), [1, 2])
+        self.assertEqual(sorted(self.index.query(score=70, at=self.now, credit_type=CONSUMER)), [2])
+        self.assertEqual(self.index.query(score=101, at=self.now), [])
+
+    def test_query_reflects_changed_and_removed_proposals(self):
+        self.index.add(dict(id=1, credit_type=MORTGAGE, min_score=60, max_score=80, **self.active))
+        self.index.remove(2)
+
+        self.assertEqual(self.index.query(score=70, at=self.now, credit_type=CONSUMER), [])
+        self.assertEqual(sorted(self.index.query(score=70, at=self.now, credit_type=MORTGAGE)), [1, 3])
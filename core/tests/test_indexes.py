@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+
+from common.pagination import GeneralPagination
+from core.benchmarks.seed import default_counts, generate
+from core.constants import NEW, OPEN_ORGANIZATION_APPLICATION_STATUSES
+from core.models import ClientApplication, Proposal
+from core.services import ClientApplicationService, OrganizationClientApplicationService
+from users import roles
+
+User = get_user_model()
+
+
+def _index_scans(queryset) -> set:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0][0]['Plan']
+
+    index_names = set()
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if 'Index Name' in node:
+            index_names.add(node['Index Name'])
+        nodes += node.get('Plans', [])
+    return index_names
+
+
+# TransactionTestCase runs after the TestCases, so seeded rows do not shift their primary keys
+class HotQueryIndexTest(TransactionTestCase):
+    serialized_rollback = True
+
+    def test_hot_list_queries_scan_their_indexes(self):
+        generate(default_counts(20000))
+        partner_id = ClientApplication.objects.values_list('partner', flat=True).first()
+        proposal = Proposal.objects.first()
+        specialist = User.objects.filter(role_id=roles.ORGANIZATION_SPECIALIST['codename']).first()
+        page = slice(0, GeneralPagination.page_size)
+
+        expected_indexes = (
+            (ClientApplicationService.filter()[page], 'client_app_created_id_idx'),
+            (ClientApplicationService.filter(partner_id=partner_id)[page], 'client_app_partner_created_idx'),
+            (OrganizationClientApplicationService.filter()[page], 'org_app_created_id_idx'),
+            (OrganizationClientApplicationService.filter().order_by(*GeneralPagination.cursor_ordering)[page],
+             'org_app_created_id_idx'),
+            (OrganizationClientApplicationService.filter(proposal=proposal, status=NEW)[page],
+             'org_app_proposal_status_idx'),
+            (OrganizationClientApplicationService.filter(
+                proposal=proposal, status__in=OPEN_ORGANIZATION_APPLICATION_STATUSES)[page],
+             'org_app_open_proposal_idx'),
+            (OrganizationClientApplicationService.filter(status__in=OPEN_ORGANIZATION_APPLICATION_STATUSES)[page],
+             'org_app_open_created_idx'),
+            (OrganizationClientApplicationService.get_organization_application_by_employer(user=specialist)[page],
+             'org_app_org_created_idx'),
+        )
+
+        for queryset, index_name in expected_indexes:
+            with self.subTest(index=index_name, query=str(queryset.query)):
+                self.assertIn(index_name, _index_scans(queryset))
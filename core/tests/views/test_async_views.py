@@ -0,0 +1,129 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from common import async_db
+from core.tests.client_application_factory import ClientApplicationFactory
+from core.tests.organization_application_factories import OrganizationClientApplicationFactory
+from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
+from users import roles
+from users.tests.user_factory import UserFactory
+
+
+class AsyncViewsTestCase(TransactionTestCase):
+    # async views query through their own connections, so the rows must be committed
+    serialized_rollback = True
+
+    def setUp(self) -> None:
+        self.partner = UserFactory(role_id=roles.PARTNER['codename'])
+        self.other_partner = UserFactory(role_id=roles.PARTNER['codename'])
+        self.specialist = UserFactory(role_id=roles.ORGANIZATION_SPECIALIST['codename'])
+        self.administrator = UserFactory(role_id=roles.ADMINISTRATOR['codename'])
+        self.token = Token.objects.create(user=self.administrator)
+
+        self.organization = OrganizationFactory()
+        self.organization.employers.add(self.specialist)
+        other_organization = OrganizationFactory()
+
+        proposal = ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        other_proposal = ProposalFactory(organization=other_organization, min_score=0, max_score=100)
+
+        self.client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=100, partner=self.partner)
+        other_client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=50,
+                                                            partner=self.other_partner)
+        self.application = OrganizationClientApplicationFactory(
+            client_application=self.client_application, proposal=proposal)
+        self.other_application = OrganizationClientApplicationFactory(
+            client_application=other_client_application, proposal=other_proposal)
+
+    def _client(self, user) -> APIClient:
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get_or_create(user=user)[0].key)
+        return client
+
+    def _assert_same_response(self, client, name: str, query: str = '', **kwargs):
+        response = client.get(reverse('v1:' + name, kwargs=kwargs) + query)
+        async_response = client.get(reverse('async_v1:' + name, kwargs=kwargs) + query)
+
+        self.assertEqual(async_response.status_code, response.status_code)
+        self.assertEqual(async_response.content, response.content)
+        return async_response
+
+    def test_responses_match_v1_api(self):
+        client = self._client(self.administrator)
+
+        self._assert_same_response(client, 'client_applications')
+        self._assert_same_response(client, 'client_applications', query='?cursor=&limit=1')
+        self._assert_same_response(client, 'client_applications_retrieve', pk=self.client_application.pk)
+        self._assert_same_response(client, 'organization_applications', query='?page=last&limit=1')
+        self._assert_same_response(client, 'organization_applications_detail', pk=self.application.pk)
+        self._assert_same_response(client, 'proposals')
+
+    def test_partner_lists_own_applications(self):
+        response = self._assert_same_response(self._client(self.partner), 'client_applications')
+
+        self.assertEqual([application['id'] for application in response.json()['list']], [self.client_application.pk])
+
+    def test_specialist_lists_applications_of_own_organizations(self):
+        response = self._assert_same_response(self._client(self.specialist), 'organization_applications')
+
+        self.assertEqual([application['id'] for application in response.json()['list']], [self.application.pk])
+
+    def test_specialist_can_not_retrieve_application_of_other_organization(self):
+        client = self._client(self.specialist)
+
+        response = client.get(reverse('async_v1:organization_applications_detail', kwargs={'pk': self.application.pk}))
+        forbidden_response = client.get(
+            reverse('async_v1:organization_applications_detail', kwargs={'pk': self.other_application.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(forbidden_response.status_code, 403)
+
+    def test_specialist_can_not_list_client_applications(self):
+        response = self._client(self.specialist).get(reverse('async_v1:client_applications'))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_missing_objects_and_pages_are_not_found(self):
+        client = self._client(self.administrator)
+
+        response = client.get(reverse('async_v1:client_applications_retrieve', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(client.get(reverse('async_v1:proposals') + '?page=2').status_code, 404)
+
+    def test_requests_without_valid_token_are_unauthorized(self):
+        client = APIClient()
+        self.assertEqual(client.get(reverse('async_v1:proposals')).status_code, 401)
+
+        client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        self.assertEqual(client.get(reverse('async_v1:proposals')).status_code, 401)
+
+    def test_only_reads_are_allowed(self):
+        response = self._client(self.administrator).post(reverse('async_v1:proposals'), {})
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_query_count_header_counts_pooled_queries(self):
+        client = self._client(self.administrator)
+        client.get(reverse('async_v1:proposals'))
+
+        response = client.get(reverse('async_v1:proposals'))
+
+        # shared versions, estimate, count and page, the token is cached
+        self.assertEqual(response['X-Query-Count'], '4')
+
+    async def test_asgi_requests_share_the_pool_of_their_event_loop(self):
+        # the AsyncClient of Django 3.1 takes raw ASGI headers
+        headers = {'headers': [(b'host', b'testserver'), (b'authorization', b'Token ' + self.token.key.encode())]}
+        try:
+            response = await self.async_client.get(reverse('async_v1:proposals'), **headers)
+            pool = await async_db.get_pool()
+            detail_response = await self.async_client.get(
+                reverse('async_v1:organization_applications_detail', kwargs={'pk': self.application.pk}), **headers)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(detail_response.status_code, 200)
+            self.assertIs(await async_db.get_pool(), pool)
+        finally:
+            await async_db.close_pool()
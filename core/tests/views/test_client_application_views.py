@@ -1,10 +1,17 @@
+from datetime import timedelta
+
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase, APIClient
 
+from core.constants import CONSUMER, MORTGAGE
+from core.services import ClientApplicationService, ProposalService
 from core.tests.client_application_factory import ClientApplicationFactory
+from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
 from users import roles
+from users.services import RoleService
 from users.tests.user_factory import UserFactory
 
 
@@ -47,6 +54,17 @@ class ClientApplicationCreateTestCase(APITestCase):
         response_json = response.json()
         self.assertEqual(response_json['total_count'], 3)
 
+    def test_success_client_application_list_query_count_does_not_depend_on_rows(self):
+        for _ in range(5):
+            ClientApplicationFactory(date_of_birth='2020-10-10', score=100)
+        # role permissions are compiled once per process
+        RoleService.get_permissions_by_role()
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.json()['list']), 5)
+
     def test_success_client_application_creation_with_valid_data(self):
         input_data = {
             'partner': self.user.id,
@@ -121,6 +139,10 @@ class ClientApplicationRetrieveTestCase(APITestCase):
 
         self.assertEqual(expected_response, response_json)
 
+    def test_client_application_retrieve_query_count_given_administrator_role(self):
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
     def test_success_client_application_retrieve_given_partner_role(self):
         partner = UserFactory(email="user1@example.com", first_name='John', last_name='Smith',
                               role_id=roles.PARTNER['codename'])
@@ -218,3 +240,130 @@ class ClientApplicationRetrieveTestCase(APITestCase):
         url = reverse('v1:client_applications_retrieve', kwargs={'pk': application.id})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ClientApplicationIngestTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory(email="user@example.com", first_name='John', last_name='Smith',
+                                role_id=roles.PARTNER['codename'])
+        token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:client_applications_bulk')
+        RoleService.get_permissions_by_role()
+
+    def _application(self, **kwargs):
+        application = {
+            'partner': self.user.id,
+            'first_name': 'Bob',
+            'last_name': 'Martin',
+            'middle_name': 'Petrovich',
+            'date_of_birth': '1996-02-12',
+            'phone_number': '+996777666555',
+            'passport_number': 'AN54325325',
+            'score': 100.0
+        }
+        application.update(kwargs)
+        return application
+
+    def test_success_bulk_creation_returns_result_per_item(self):
+        input_data = {'applications': [
+            self._application(),
+            self._application(score='not a number'),
+            self._application(partner=0),
+            self._application(first_name='Alice'),
+        ]}
+
+        response = self.client.post(self.url, input_data, format='json')
+
+        response_json = response.json()
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response_json['created_count'], 2)
+        self.assertEqual(response_json['failed_count'], 2)
+        self.assertIn('score', response_json['results'][1]['errors'])
+        self.assertIn('partner', response_json['results'][2]['errors'])
+        self.assertEqual(
+            ClientApplicationService.filter(pk__in=[response_json['results'][0]['id'],
+                                                    response_json['results'][3]['id']]).count(),
+            2
+        )
+
+    def test_bulk_creation_query_count_does_not_depend_on_batch_size(self):
+        input_data = {'applications': [self._application() for _ in range(50)]}
+
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, input_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['created_count'], 50)
+
+    def test_bad_request_given_every_item_failed(self):
+        input_data = {'applications': [self._application(score='not a number'), self._application(partner=0)]}
+
+        response = self.client.post(self.url, input_data, format='json')
+
+        response_json = response.json()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_json['created_count'], 0)
+        self.assertEqual(response_json['failed_count'], 2)
+        self.assertFalse(ClientApplicationService.filter(partner=self.user).exists())
+
+    def test_not_acceptable_given_empty_batch(self):
+        response = self.client.post(self.url, {'applications': []}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_permission_denied_error_given_organization_specialist_role(self):
+        user = UserFactory(email='user1@example.com',
+                           role_id=roles.ORGANIZATION_SPECIALIST['codename'])
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.post(self.url, {'applications': [self._application()]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ClientApplicationEligibleProposalsTestCase(APITestCase):
+    def setUp(self) -> None:
+        ProposalService.invalidate_eligibility_index()
+        self.user = UserFactory(email="user@example.com", role_id=roles.PARTNER['codename'])
+        token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.application = ClientApplicationFactory(date_of_birth='2020-10-10', score=70, partner=self.user)
+        self.url = reverse('v1:client_application_eligible_proposals', kwargs={'pk': self.application.id})
+
+        now = timezone.now()
+        self.organization = OrganizationFactory()
+        self.active_rotation = {'start_rotation_date': now - timedelta(days=1),
+                                'end_rotation_date': now + timedelta(days=1)}
+        self.eligible = ProposalFactory(organization=self.organization, credit_type=CONSUMER,
+                                        min_score=50, max_score=80, **self.active_rotation)
+        ProposalFactory(organization=self.organization, credit_type=CONSUMER,
+                        min_score=80, max_score=100, **self.active_rotation)
+        ProposalFactory(organization=self.organization, credit_type=CONSUMER, min_score=0, max_score=100,
+                        start_rotation_date=now - timedelta(days=10), end_rotation_date=now - timedelta(days=5))
+
+    def tearDown(self) -> None:
+        ProposalService.invalidate_eligibility_index()
+
+    def test_success_eligible_proposals_list(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual([proposal['id'] for proposal in response.json()['list']], [self.eligible.id])
+
+    def test_eligible_proposals_list_follows_proposal_changes(self):
+        self.client.get(self.url)
+        mortgage = ProposalFactory(organization=self.organization, credit_type=MORTGAGE,
+                                   min_score=60, max_score=75, **self.active_rotation)
+        self.eligible.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual([proposal['id'] for proposal in response.json()['list']], [mortgage.id])
+
+        response = self.client.get(self.url, {'credit_type': CONSUMER})
+        self.assertEqual(response.json()['list'], [])
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from common.compiled_serializers import compile_serializer
+from core.models import ClientApplication, Proposal, OrganizationClientApplication
+from core.serializers import (
+    ClientApplicationSerializer, ProposalSerializer, OrganizationClientApplicationSerializer)
+from core.tests.client_application_factory import ClientApplicationFactory
+from core.tests.organization_application_factories import OrganizationClientApplicationFactory
+from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
+from users.tests.user_factory import UserFactory
+
+
+class CompiledSerializerTestCase(TestCase):
+    def setUp(self) -> None:
+        partner = UserFactory(email='user@example.com', first_name='John', last_name='Smith')
+        proposal = ProposalFactory(organization=OrganizationFactory(name='test_organization'), name='Loan',
+                                   credit_type='consumer', min_score=0, max_score=99.5)
+        applications = [
+            ClientApplicationFactory(date_of_birth='2020-10-10', score=100, partner=partner, first_name='Bob'),
+            ClientApplicationFactory(date_of_birth='1990-01-31', score=12.25, partner=None),
+        ]
+        for application in applications:
+            OrganizationClientApplicationFactory(proposal=proposal, client_application=application)
+
+    def assertRendersIdentically(self, serializer_class, queryset):
+        compiled_serializer = compile_serializer(serializer_class)
+
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = JSONRenderer().render(compiled_serializer.render_many(queryset.values(*compiled_serializer.fields)))
+
+        self.assertEqual(actual, expected)
+
+    def test_client_application_serializer_output_is_identical(self):
+        self.assertRendersIdentically(ClientApplicationSerializer, ClientApplication.objects.all())
+
+    def test_proposal_serializer_output_is_identical(self):
+        self.assertRendersIdentically(ProposalSerializer, Proposal.objects.all())
+
+    def test_organization_client_application_serializer_output_is_identical(self):
+        self.assertRendersIdentically(OrganizationClientApplicationSerializer,
+                                      OrganizationClientApplication.objects.all())
@@ -1,9 +1,22 @@
+import csv
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase, APIClient
 
-from core.constants import ACCEPTED, NEW, DECLINED
+from core.constants import ACCEPTED, NEW, DECLINED, RECEIVED, SENT, NDJSON
+from core.models import Organization, Proposal
+from core.services import ProposalService, OrganizationClientApplicationService
 from core.tests.client_application_factory import ClientApplicationFactory
 from core.tests.organization_application_factories import OrganizationClientApplicationFactory
 from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
@@ -67,6 +80,43 @@ class OrganizationClientApplicationCreateTestCase(APITestCase):
         response_json = response.json()
         self.assertEqual(response_json['total_count'], 4)
 
+    def test_org_client_application_list_query_count_does_not_depend_on_rows_given_administrator_role(self):
+        for _ in range(5):
+            proposal = ProposalFactory(organization=OrganizationFactory(), min_score=0, max_score=100)
+            client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=100)
+            OrganizationClientApplicationFactory(proposal=proposal, client_application=client_application)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.json()['list']), 5)
+
+    def test_org_client_application_list_query_count_does_not_depend_on_rows_given_org_specialist_role(self):
+        for _ in range(5):
+            OrganizationClientApplicationFactory(proposal=self.proposal, client_application=self.client_application)
+
+        token = Token.objects.create(user=self.org_specialist)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        # warms the token and employer organizations caches
+        self.client.get(self.url)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.json()['list']), 5)
+
+    def test_org_client_application_list_query_count_does_not_depend_on_rows_given_partner_role(self):
+        for _ in range(5):
+            OrganizationClientApplicationFactory(proposal=self.proposal, client_application=self.client_application)
+
+        token = Token.objects.create(user=self.partner)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.json()['list']), 5)
+
     def test_success_org_client_application_creation_given_all_filled_data(self):
         input_data = {
             'proposal': self.proposal.id,
@@ -171,6 +221,57 @@ class OrganizationClientApplicationRetrieveTestCase(APITestCase):
 
         self.assertEqual(response.json(), expected_data)
 
+    def test_org_client_application_retrieve_query_count_given_administrator_role(self):
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_success_org_client_application_retrieve_given_org_specialist_role(self):
+        token = Token.objects.create(user=self.org_specialist)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['id'], self.org_application.id)
+
+    def test_org_client_application_retrieve_query_count_given_org_specialist_role(self):
+        token = Token.objects.create(user=self.org_specialist)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        # warms the token and employer organizations caches
+        self.client.get(self.url)
+
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_error_org_client_application_retrieve_given_specialist_of_another_organization(self):
+        another_specialist = UserFactory(role_id=roles.ORGANIZATION_SPECIALIST['codename'])
+        OrganizationFactory().employers.add(another_specialist)
+        token = Token.objects.create(user=another_specialist)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_org_client_application_retrieve_given_specialist_removed_from_organization(self):
+        token = Token.objects.create(user=self.org_specialist)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        self.organization.employers.clear()
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_org_client_application_retrieve_given_specialist_removed_from_organization_in_another_worker(self):
+        token = Token.objects.create(user=self.org_specialist)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        # a queryset delete of the m2m rows sends no m2m_changed, like a change made by another worker process
+        Organization.employers.through.objects.filter(organization=self.organization).delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
     def test_success_org_client_application_retrieve_given_non_linked_user(self):
         empty_user = UserFactory(email="user100@example.com", first_name='John', last_name='Smith',
                                  role_id=roles.PARTNER['codename'])
@@ -327,3 +428,336 @@ class OrganizationClientApplicationChangeStatusTestCase(APITestCase):
         }
 
         self.assertEqual(response.json(), expected_data)
+
+
+class OrganizationClientApplicationFanOutTestCase(APITestCase):
+    def setUp(self) -> None:
+        ProposalService.invalidate_eligibility_index()
+        self.partner = UserFactory(email="user2@example.com", first_name='John', last_name='Smith',
+                                   role_id=roles.PARTNER['codename'])
+        token = Token.objects.create(user=self.partner)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:organization_applications_fan_out')
+
+        self.client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=70, partner=self.partner)
+
+        now = timezone.now()
+        active_rotation = {'start_rotation_date': now - timedelta(days=1), 'end_rotation_date': now + timedelta(days=1)}
+        self.eligible_proposals = [
+            ProposalFactory(organization=OrganizationFactory(), min_score=50, max_score=100, **active_rotation)
+            for _ in range(3)
+        ]
+        self.ineligible_proposal = ProposalFactory(organization=OrganizationFactory(), min_score=80, max_score=100,
+                                                   **active_rotation)
+
+    def tearDown(self) -> None:
+        ProposalService.invalidate_eligibility_index()
+
+    def test_fan_out_skips_proposal_changed_by_another_worker(self):
+        ProposalService.get_eligibility_index()
+        # a queryset update sends no signal, like a write made by another worker process
+        Proposal.objects.filter(pk=self.eligible_proposals[0].pk).update(min_score=90)
+
+        response = self.client.post(self.url, {'client_application': self.client_application.id})
+
+        self.assertEqual(
+            sorted(application['proposal']['id'] for application in response.json()['list']),
+            sorted(proposal.id for proposal in self.eligible_proposals[1:])
+        )
+
+    def test_fan_out_applies_changed_proposals_to_built_index(self):
+        index = ProposalService.get_eligibility_index()
+        Proposal.objects.filter(pk=self.ineligible_proposal.pk).update(min_score=50)
+        Proposal.objects.filter(pk=self.eligible_proposals[0].pk).delete()
+
+        response = self.client.post(self.url, {'client_application': self.client_application.id})
+
+        self.assertEqual(
+            sorted(application['proposal']['id'] for application in response.json()['list']),
+            sorted(proposal.id for proposal in self.eligible_proposals[1:] + [self.ineligible_proposal])
+        )
+        # updated in place, not rebuilt
+        self.assertIs(ProposalService.get_eligibility_index(), index)
+
+    def test_eligibility_index_is_kept_given_organization_or_unrelated_proposal_change(self):
+        index = ProposalService.get_eligibility_index()
+        Organization.objects.filter(pk=self.eligible_proposals[0].organization_id).update(name='renamed')
+        Proposal.objects.filter(pk=self.eligible_proposals[0].pk).update(name='renamed')
+
+        # only the shared versions are read
+        with self.assertNumQueries(1):
+            self.assertIs(ProposalService.get_eligibility_index(), index)
+
+    def test_success_fan_out_creates_application_per_eligible_proposal(self):
+        OrganizationClientApplicationFactory(proposal=self.eligible_proposals[0],
+                                             client_application=self.client_application)
+
+        response = self.client.post(self.url, {'client_application': self.client_application.id})
+
+        response_json = response.json()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response_json['created_count'], 2)
+        self.assertEqual(response_json['skipped_count'], 1)
+        self.assertEqual(
+            sorted(application['proposal']['id'] for application in response_json['list']),
+            sorted(proposal.id for proposal in self.eligible_proposals[1:])
+        )
+        self.assertTrue(all(application['status'] == NEW for application in response_json['list']))
+
+    def test_fan_out_is_idempotent(self):
+        self.client.post(self.url, {'client_application': self.client_application.id})
+
+        response = self.client.post(self.url, {'client_application': self.client_application.id})
+
+        self.assertEqual(response.json()['created_count'], 0)
+        self.assertEqual(response.json()['skipped_count'], 3)
+
+    def test_permission_denied_error_given_organization_specialist_role(self):
+        user = UserFactory(email='user1@example.com', role_id=roles.ORGANIZATION_SPECIALIST['codename'])
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.post(self.url, {'client_application': self.client_application.id})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OrganizationClientApplicationBulkChangeStatusTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.org_specialist = UserFactory(email="user1@example.com", first_name='John', last_name='Smith',
+                                          role_id=roles.ORGANIZATION_SPECIALIST['codename'])
+        token = Token.objects.create(user=self.org_specialist)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:bulk_change_org_application_status')
+
+        self.organization = OrganizationFactory(name='test_organization')
+        self.organization.employers.add(self.org_specialist)
+        self.proposal = ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        self.client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=100)
+
+    def _org_application(self, proposal=None, **kwargs):
+        return OrganizationClientApplicationFactory(proposal=proposal or self.proposal,
+                                                    client_application=self.client_application, **kwargs)
+
+    def test_success_bulk_change_status_applies_only_allowed_transitions(self):
+        received = [self._org_application(status=RECEIVED) for _ in range(3)]
+        new = self._org_application(status=NEW)
+        foreign = self._org_application(proposal=ProposalFactory(organization=OrganizationFactory(),
+                                                                 min_score=0, max_score=100), status=RECEIVED)
+
+        ids = [application.id for application in received] + [new.id, foreign.id, 0]
+        response = self.client.post(self.url, {'ids': ids, 'status': ACCEPTED}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            'changed': sorted(application.id for application in received),
+            'rejected': [new.id, foreign.id, 0]
+        })
+        self.assertEqual(
+            OrganizationClientApplicationService.filter(pk__in=ids, status=ACCEPTED).count(), 3
+        )
+
+    def test_bulk_change_status_rejects_all_given_status_without_incoming_transitions(self):
+        application = self._org_application(status=SENT)
+
+        response = self.client.post(self.url, {'ids': [application.id], 'status': NEW}, format='json')
+
+        self.assertEqual(response.json(), {'changed': [], 'rejected': [application.id]})
+
+    def test_permission_denied_error_given_partner_role(self):
+        partner = UserFactory(email='user2@example.com', role_id=roles.PARTNER['codename'])
+        token = Token.objects.create(user=partner)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.post(self.url, {'ids': [self._org_application().id], 'status': SENT}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OrganizationClientApplicationConcurrentBulkChangeStatusTestCase(TransactionTestCase):
+    # the transitions run on connections of their own threads, so the rows must be committed
+    serialized_rollback = True
+
+    def setUp(self) -> None:
+        self.administrator = UserFactory(role_id=roles.ADMINISTRATOR['codename'])
+        proposal = ProposalFactory(organization=OrganizationFactory(), min_score=0, max_score=100)
+        self.application = OrganizationClientApplicationFactory(
+            proposal=proposal, client_application=ClientApplicationFactory(date_of_birth='2020-10-10', score=100),
+            status=RECEIVED)
+
+    def _waiting_for_lock(self) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_stat_activity "
+                           "WHERE datname = current_database() AND wait_event_type = 'Lock'")
+            return cursor.fetchone()[0] > 0
+
+    def test_only_first_of_overlapping_transitions_changes_application(self):
+        accepted = threading.Event()
+        commit = threading.Event()
+        results = {}
+
+        def transition(status, hold=False):
+            try:
+                with transaction.atomic():
+                    results[status] = OrganizationClientApplicationService.bulk_update_status(
+                        self.administrator, [self.application.id], status)
+                    if hold:
+                        accepted.set()
+                        commit.wait(10)
+            finally:
+                connection.close()
+
+        accept = threading.Thread(target=transition, args=(ACCEPTED, True))
+        accept.start()
+        accepted.wait(10)
+        # received -> declined waits for the uncommitted received -> accepted
+        decline = threading.Thread(target=transition, args=(DECLINED,))
+        decline.start()
+        for _ in range(100):
+            if self._waiting_for_lock():
+                break
+            time.sleep(0.05)
+        commit.set()
+        accept.join()
+        decline.join()
+
+        self.assertEqual(results[ACCEPTED], ([self.application.id], []))
+        self.assertEqual(results[DECLINED], ([], [self.application.id]))
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, ACCEPTED)
+
+
+class OrganizationClientApplicationExportTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.partner = UserFactory(email="user2@example.com", first_name='John', last_name='Smith',
+                                   role_id=roles.PARTNER['codename'])
+        token = Token.objects.create(user=self.partner)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:organization_applications_export')
+
+        self.proposal = ProposalFactory(organization=OrganizationFactory(name='test_organization'),
+                                        min_score=0, max_score=100)
+        client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=100, partner=self.partner)
+        self.applications = [
+            OrganizationClientApplicationFactory(proposal=self.proposal, client_application=client_application)
+            for _ in range(3)
+        ]
+        # not visible for the partner
+        OrganizationClientApplicationFactory(
+            proposal=self.proposal,
+            client_application=ClientApplicationFactory(date_of_birth='2020-10-10', score=100)
+        )
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_success_csv_export_given_partner_role(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual(sorted(int(row['id']) for row in rows), sorted(app.id for app in self.applications))
+        self.assertEqual(rows[0]['proposal__organization__name'], 'test_organization')
+        self.assertEqual(rows[0]['client_application__date_of_birth'], '2020-10-10')
+
+    def test_success_ndjson_export_given_partner_role(self):
+        response = self.client.get(self.url, {'file_format': NDJSON})
+
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(sorted(row['id'] for row in rows), sorted(app.id for app in self.applications))
+        self.assertEqual(rows[0]['client_application__partner__email'], 'user2@example.com')
+
+    def test_not_acceptable_given_unknown_file_format(self):
+        response = self.client.get(self.url, {'file_format': 'xml'})
+
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_export_command_applies_user_scoping(self):
+        output = io.StringIO()
+
+        call_command('export_organization_applications', file_format=NDJSON, user=self.partner.email, stdout=output)
+
+        self.assertEqual(len(output.getvalue().splitlines()), 3)
+
+
+class OrganizationClientApplicationEmployerScopingTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.org_specialist = UserFactory(role_id=roles.ORGANIZATION_SPECIALIST['codename'])
+        token = Token.objects.create(user=self.org_specialist)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.url = reverse('v1:organization_applications')
+
+        self.organization = OrganizationFactory()
+        self.organization.employers.add(self.org_specialist)
+        self.other_organization = OrganizationFactory()
+        self.proposal = ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        self.other_proposal = ProposalFactory(organization=self.other_organization, min_score=0, max_score=100)
+        self.client_application = ClientApplicationFactory(date_of_birth='2020-10-10', score=50)
+
+    def test_organization_is_copied_from_proposal_on_create(self):
+        application = OrganizationClientApplicationFactory(
+            proposal=self.proposal, client_application=self.client_application)
+
+        application.refresh_from_db()
+        self.assertEqual(application.organization_id, self.organization.id)
+
+    def test_applications_follow_proposal_moved_to_another_organization(self):
+        application = OrganizationClientApplicationFactory(
+            proposal=self.proposal, client_application=self.client_application)
+
+        self.proposal.organization = self.other_organization
+        self.proposal.save()
+
+        application.refresh_from_db()
+        self.assertEqual(application.organization_id, self.other_organization.id)
+
+    def test_applications_follow_proposal_moved_by_queryset_update(self):
+        application = OrganizationClientApplicationFactory(
+            proposal=self.proposal, client_application=self.client_application)
+        other_application = OrganizationClientApplicationFactory(
+            proposal=self.other_proposal, client_application=self.client_application)
+
+        # sends no signal, like raw SQL or a bulk update
+        Proposal.objects.filter(pk=self.proposal.pk).update(organization=self.other_organization)
+
+        application.refresh_from_db()
+        other_application.refresh_from_db()
+        self.assertEqual(application.organization_id, self.other_organization.id)
+        self.assertEqual(other_application.organization_id, self.other_organization.id)
+
+    def test_specialist_does_not_see_applications_of_other_organizations(self):
+        own_application = OrganizationClientApplicationFactory(
+            proposal=self.proposal, client_application=self.client_application)
+        OrganizationClientApplicationFactory(proposal=self.other_proposal, client_application=self.client_application)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([row['id'] for row in response.json()['list']], [own_application.id])
+
+    def test_specialist_sees_applications_of_organization_joined_after_caching(self):
+        OrganizationClientApplicationFactory(proposal=self.proposal, client_application=self.client_application)
+        OrganizationClientApplicationFactory(proposal=self.other_proposal, client_application=self.client_application)
+        self.assertEqual(self.client.get(self.url).json()['total_count'], 1)
+
+        self.org_specialist.organizations.add(self.other_organization)
+        self.assertEqual(self.client.get(self.url).json()['total_count'], 2)
+
+        self.other_organization.employers.remove(self.org_specialist)
+        self.assertEqual(self.client.get(self.url).json()['total_count'], 1)
+
+    def test_specialist_stops_seeing_applications_of_organization_left_in_another_worker(self):
+        OrganizationClientApplicationFactory(proposal=self.proposal, client_application=self.client_application)
+        self.assertEqual(self.client.get(self.url).json()['total_count'], 1)
+
+        # raw SQL sends no signal, like a change made by another worker process
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM core_organization_employers WHERE user_id = %s', [self.org_specialist.pk])
+
+        self.assertEqual(self.client.get(self.url).json()['total_count'], 0)
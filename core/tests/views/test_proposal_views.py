@@ -1,9 +1,14 @@
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase, APIClient
 
 from core.constants import CONSUMER
+from core.models import Proposal
 from core.tests.proposal_factories import ProposalFactory, OrganizationFactory
+from common.cache import LRUCache
+from common.mixins import VersionedListCacheMixin
+from core.views import ProposalListCreateAPIView
 from users import roles
 from users.tests.user_factory import UserFactory
 
@@ -18,6 +23,9 @@ class ProposalTestCase(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
         self.url = reverse('v1:proposals')
 
+    def tearDown(self) -> None:
+        ProposalListCreateAPIView.list_cache.clear()
+
     def test_success_proposal_list_view(self):
         ProposalFactory(organization=self.organization, min_score=0, max_score=100)
         ProposalFactory(organization=self.organization, min_score=0, max_score=100)
@@ -28,6 +36,16 @@ class ProposalTestCase(APITestCase):
         response_json = response.json()
         self.assertEqual(response_json['total_count'], 3)
 
+    def test_proposal_list_query_count_does_not_depend_on_rows(self):
+        for _ in range(5):
+            ProposalFactory(organization=OrganizationFactory(), min_score=0, max_score=100)
+
+        # the shared versions, the token, the count estimate, the count and the page
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.json()['list']), 5)
+
     def test_success_proposal_creation_given_valid_data(self):
         input_data = {
             'organization': self.organization.id,
@@ -56,3 +74,62 @@ class ProposalTestCase(APITestCase):
         }
 
         self.assertEqual(response.data, expected_data)
+
+    def test_cached_proposal_list_is_served_until_proposals_change(self):
+        ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        response = self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            cached_response = self.client.get(self.url)
+        ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        changed_response = self.client.get(self.url)
+
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response['ETag'], response['ETag'])
+        self.assertEqual(changed_response.json()['total_count'], 2)
+        self.assertNotEqual(changed_response['ETag'], response['ETag'])
+
+    def test_proposal_list_pages_are_cached_by_query_params(self):
+        for _ in range(3):
+            ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+
+        first_page = self.client.get(self.url, {'limit': 2})
+        second_page = self.client.get(self.url, {'limit': 2, 'page': 2})
+
+        self.assertEqual(len(first_page.json()['list']), 2)
+        self.assertEqual(len(second_page.json()['list']), 1)
+        self.assertNotEqual(first_page['ETag'], second_page['ETag'])
+
+    def test_organization_change_invalidates_cached_proposal_list(self):
+        ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        self.client.get(self.url)
+
+        self.organization.name = 'Renamed organization'
+        self.organization.save()
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['list'][0]['organization']['name'], 'Renamed organization')
+
+    def test_queryset_update_invalidates_cached_proposal_list(self):
+        ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        self.client.get(self.url)
+
+        # no signals are sent, the version is changed by the database
+        Proposal.objects.update(name='Updated')
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['list'][0]['name'], 'Updated')
+
+    def test_not_modified_given_matching_etag(self):
+        ProposalFactory(organization=self.organization, min_score=0, max_score=100)
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cached_list_view_without_version_is_rejected_when_defined(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type('UnversionedListView', (VersionedListCacheMixin,), {'list_cache': LRUCache(1, ttl=1)})
@@ -1,15 +1,27 @@
 from django.urls import path
 
 from .views import (
-    ClientApplicationListCreateAPIView, ProposalListCreateAPIView,
-    ClientApplicationRetrieveAPIView, OrganizationClientApplicationListCreateAPIView,
-    OrganizationApplicationRetrieveDeleteUpdateAPIView, ChangeOrgApplicationStatusAPIView)
+    ClientApplicationListCreateAPIView, ClientApplicationBulkCreateAPIView, ProposalListCreateAPIView,
+    ClientApplicationRetrieveAPIView, ClientApplicationEligibleProposalsAPIView,
+    OrganizationClientApplicationListCreateAPIView, OrganizationClientApplicationFanOutAPIView,
+    OrganizationClientApplicationExportAPIView,
+    OrganizationApplicationRetrieveDeleteUpdateAPIView, ChangeOrgApplicationStatusAPIView,
+    BulkChangeOrgApplicationStatusAPIView)
 
 urlpatterns = [
     path('applications/', ClientApplicationListCreateAPIView.as_view(), name='client_applications'),
+    path('applications/bulk/', ClientApplicationBulkCreateAPIView.as_view(), name='client_applications_bulk'),
     path('applications/<int:pk>/', ClientApplicationRetrieveAPIView.as_view(), name='client_applications_retrieve'),
+    path('applications/<int:pk>/eligible_proposals/', ClientApplicationEligibleProposalsAPIView.as_view(),
+         name='client_application_eligible_proposals'),
     path('organization_applications/', OrganizationClientApplicationListCreateAPIView.as_view(),
          name='organization_applications'),
+    path('organization_applications/export/', OrganizationClientApplicationExportAPIView.as_view(),
+         name='organization_applications_export'),
+    path('organization_applications/fan_out/', OrganizationClientApplicationFanOutAPIView.as_view(),
+         name='organization_applications_fan_out'),
+    path('organization_applications/doChangeStatus/', BulkChangeOrgApplicationStatusAPIView.as_view(),
+         name='bulk_change_org_application_status'),
     path('organization_applications/<int:pk>/', OrganizationApplicationRetrieveDeleteUpdateAPIView.as_view(),
          name='organization_applications_detail'),
     path('organization_applications/<int:pk>/doChangeStatus/',
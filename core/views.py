@@ -1,32 +1,41 @@
+import math
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import status
-from rest_framework.generics import GenericAPIView, ListCreateAPIView
+from rest_framework.generics import GenericAPIView, ListAPIView, ListCreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from common.cache import LRUCache
 from common.exceptions import PermissionDeniedException
+from common.mixins import CompiledListMixin, VersionedListCacheMixin
 from common.pagination import GeneralPagination
 from users.services import UserService
+from .exports import stream_export, EXPORT_CONTENT_TYPES
 from .serializers import (
     ClientApplicationCreateSerializer, ClientApplicationSerializer,
+    ClientApplicationBulkCreateSerializer, ClientApplicationBulkItemSerializer,
     ProposalSerializer, ProposalCreateSerializer,
     ClientApplicationRetrieveSerializer, ClientApplicationUpdateSerializer,
     OrganizationClientApplicationCreateSerializer, OrganizationClientApplicationSerializer,
-    OrganizationClientApplicationUpdateSerializer, ChangeOrgApplicationStatusSerializer)
+    OrganizationClientApplicationUpdateSerializer, ChangeOrgApplicationStatusSerializer,
+    OrganizationClientApplicationFanOutSerializer, BulkChangeOrgApplicationStatusSerializer,
+    OrganizationClientApplicationExportSerializer)
 from .services import (
     ClientApplicationService, ProposalService,
     OrganizationClientApplicationService
 )
-from users import roles
 from users.permissions import CanCreateClientApplication
 
 
-class ClientApplicationListCreateAPIView(ListCreateAPIView):
+class ClientApplicationListCreateAPIView(CompiledListMixin, ListCreateAPIView):
     permission_classes = (IsAuthenticated, CanCreateClientApplication)
     serializer_class = ClientApplicationSerializer
     pagination_class = GeneralPagination
 
     def get_queryset(self):
-        if self.request.user.role.codename == roles.PARTNER['codename']:
+        if UserService.is_partner_user(user=self.request.user):
             return ClientApplicationService.filter(partner=self.request.user)
         return ClientApplicationService.filter()
 
@@ -42,11 +51,54 @@ class ClientApplicationListCreateAPIView(ListCreateAPIView):
         return Response(self.serializer_class(application, many=False).data, status=status.HTTP_201_CREATED)
 
 
-class ProposalListCreateAPIView(ListCreateAPIView):
+class ClientApplicationBulkCreateAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated, CanCreateClientApplication)
+    serializer_class = ClientApplicationBulkCreateSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(data={
+                'message': 'Invalid input',
+                'errors': serializer.errors
+            }, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        results = []
+        valid_applications = []
+        for item in serializer.validated_data['applications']:
+            item_serializer = ClientApplicationBulkItemSerializer(data=item)
+            if item_serializer.is_valid():
+                valid_applications.append(item_serializer.validated_data)
+                results.append(None)
+            else:
+                results.append({'errors': item_serializer.errors})
+
+        created_results = iter(ClientApplicationService.bulk_create(applications=valid_applications))
+        results = [result if result is not None else next(created_results) for result in results]
+
+        created_count = sum(1 for result in results if 'id' in result)
+        failed_count = len(results) - created_count
+        if not created_count:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed_count:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+
+        return Response(data={
+            'created_count': created_count,
+            'failed_count': failed_count,
+            'results': results
+        }, status=response_status)
+
+
+class ProposalListCreateAPIView(VersionedListCacheMixin, CompiledListMixin, ListCreateAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = ProposalSerializer
     pagination_class = GeneralPagination
     queryset = ProposalService.filter()
+    list_cache = LRUCache(settings.PROPOSAL_LIST_CACHE_SIZE, ttl=math.inf)
+    list_version = ProposalService.get_version
 
     def post(self, request, *args, **kwargs):
         serializer = ProposalCreateSerializer(data=request.data)
@@ -102,20 +154,27 @@ class ClientApplicationRetrieveAPIView(GenericAPIView):
         return Response(self.serializer_class(updated_application).data, status=status.HTTP_200_OK)
 
 
-class OrganizationClientApplicationListCreateAPIView(ListCreateAPIView):
+class ClientApplicationEligibleProposalsAPIView(CompiledListMixin, ListAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ProposalSerializer
+    pagination_class = GeneralPagination
+
+    def get_queryset(self):
+        application = ClientApplicationService.get_application(user=self.request.user, application_pk=self.kwargs['pk'])
+
+        return ProposalService.get_eligible_proposals(
+            score=application.score,
+            credit_type=self.request.query_params.get('credit_type')
+        )
+
+
+class OrganizationClientApplicationListCreateAPIView(CompiledListMixin, ListCreateAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = OrganizationClientApplicationSerializer
     pagination_class = GeneralPagination
 
     def get_queryset(self):
-        if UserService.is_administrator_user(user=self.request.user):
-            return OrganizationClientApplicationService.filter()
-        elif self.request.user.role.codename == roles.ORGANIZATION_SPECIALIST['codename']:
-            return OrganizationClientApplicationService.get_organization_application_by_employer(user=self.request.user)
-        elif self.request.user.role.codename == roles.PARTNER['codename']:
-            return OrganizationClientApplicationService.get_org_application_by_partner(user=self.request.user)
-        else:
-            raise PermissionDeniedException('You do not have permission to perform this action')
+        return OrganizationClientApplicationService.get_user_applications(user=self.request.user)
 
     def post(self, request, *args, **kwargs):
         serializer = OrganizationClientApplicationCreateSerializer(data=request.data)
@@ -135,6 +194,61 @@ class OrganizationClientApplicationListCreateAPIView(ListCreateAPIView):
         return Response(self.serializer_class(application).data, status=status.HTTP_201_CREATED)
 
 
+class OrganizationClientApplicationExportAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = OrganizationClientApplicationExportSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(data={
+                'message': 'Invalid input',
+                'errors': serializer.errors
+            }, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        file_format = serializer.validated_data.get('file_format')
+        rows = OrganizationClientApplicationService.export_rows(
+            queryset=OrganizationClientApplicationService.get_user_applications(user=request.user)
+        )
+
+        response = StreamingHttpResponse(stream_export(rows, file_format),
+                                         content_type=EXPORT_CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = 'attachment; filename="organization_applications.{extension}"'.format(
+            extension=file_format)
+
+        return response
+
+
+class OrganizationClientApplicationFanOutAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = OrganizationClientApplicationFanOutSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(data={
+                'message': 'Invalid input',
+                'errors': serializer.errors
+            }, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        client_application = ClientApplicationService.get_application(
+            user=request.user,
+            application_pk=serializer.validated_data.get('client_application')
+        )
+
+        applications, skipped_count = OrganizationClientApplicationService.fan_out(
+            client_application=client_application
+        )
+
+        return Response(data={
+            'created_count': len(applications),
+            'skipped_count': skipped_count,
+            'list': OrganizationClientApplicationSerializer(applications, many=True).data
+        }, status=status.HTTP_201_CREATED)
+
+
 class OrganizationApplicationRetrieveDeleteUpdateAPIView(GenericAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = OrganizationClientApplicationSerializer
@@ -203,3 +317,32 @@ class ChangeOrgApplicationStatusAPIView(GenericAPIView):
         )
 
         return Response(OrganizationClientApplicationSerializer(updated_application).data, status=status.HTTP_200_OK)
+
+
+class BulkChangeOrgApplicationStatusAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = BulkChangeOrgApplicationStatusSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(data={
+                'message': 'Invalid input',
+                'errors': serializer.errors
+            }, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        if not (UserService.is_administrator_user(user=request.user) or
+                UserService.is_organization_specialist_user(user=request.user)):
+            raise PermissionDeniedException('You do not have permission to perform this action')
+
+        changed_ids, rejected_ids = OrganizationClientApplicationService.bulk_update_status(
+            user=request.user,
+            application_ids=serializer.validated_data.get('ids'),
+            status=serializer.validated_data.get('status')
+        )
+
+        return Response(data={
+            'changed': changed_ids,
+            'rejected': rejected_ids
+        }, status=status.HTTP_200_OK)
@@ -56,7 +56,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.instrumentation_middleware.RequestInstrumentationMiddleware',
     'common.exception_handler_middleware.RequestExceptionHandlerMiddleware',
+    'common.shared_versions.SharedVersionsMiddleware',
 ]
 
 ROOT_URLCONF = 'project.urls'
@@ -85,7 +87,8 @@ WSGI_APPLICATION = 'project.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # django.db.backends.postgresql with a pool of warm connections per worker process
+        'ENGINE': 'common.db_pool',
         'NAME': config('POSTGRES_DB'),
         'PASSWORD': config('POSTGRES_PASSWORD'),
         'USER': config('POSTGRES_USER'),
@@ -95,6 +98,16 @@ DATABASES = {
     }
 }
 
+# Connections are returned to the pool at the end of every request (CONN_MAX_AGE is 0)
+# and shared by the threads of a worker, at most DB_POOL_MAX_SIZE of them are open
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+# Seconds a connection is reused before it is reopened
+DB_POOL_MAX_AGE = config('DB_POOL_MAX_AGE', default=1800, cast=float)
+# A connection idle for longer than this is checked with SELECT 1 before reuse
+DB_POOL_HEALTH_CHECK_INTERVAL = config('DB_POOL_HEALTH_CHECK_INTERVAL', default=30, cast=float)
+# Seconds to wait for a free connection once all of them are in use
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=float)
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -137,7 +150,7 @@ MEDIA_URL = '/media/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'common.authentications.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.NamespaceVersioning',
@@ -146,5 +159,39 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'common.schemas.DefaultSchema',
 }
 
+# Pre-rendered /proposals/ list pages a worker keeps, one per version and query params
+PROPOSAL_LIST_CACHE_SIZE = config('PROPOSAL_LIST_CACHE_SIZE', default=1000, cast=int)
+
+# Lists estimated to be larger than this report a planner estimate instead of COUNT(*)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = config('PAGINATION_COUNT_ESTIMATE_THRESHOLD', default=100000, cast=int)
+# Seconds a worker reuses the row estimate of a table it read from the PostgreSQL statistics
+PAGINATION_TABLE_ESTIMATE_TTL = config('PAGINATION_TABLE_ESTIMATE_TTL', default=60, cast=int)
+
+# Bearer token Prometheus scrapes /metrics with, the endpoint answers 404 while it is empty
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Requests making more queries than this are logged with a warning
+REQUEST_QUERY_BUDGET = config('REQUEST_QUERY_BUDGET', default=20, cast=int)
+
+# asyncpg pool of every ASGI worker event loop, used by the async API
+ASYNC_DB_POOL_MIN_SIZE = config('ASYNC_DB_POOL_MIN_SIZE', default=1, cast=int)
+ASYNC_DB_POOL_MAX_SIZE = config('ASYNC_DB_POOL_MAX_SIZE', default=10, cast=int)
+# Seconds an idle pooled connection is kept open
+ASYNC_DB_POOL_MAX_IDLE = config('ASYNC_DB_POOL_MAX_IDLE', default=300, cast=float)
+
 AUTH_USER_MODEL = 'users.User'
+
+# Seconds a worker reuses the shared versions of worker caches it read for the requests that follow.
+# Bounds how long a change made by another worker goes unnoticed, 0 reads them once per request
+SHARED_VERSIONS_MAX_AGE = config('SHARED_VERSIONS_MAX_AGE', default=1, cast=float)
+
+# Per-worker token -> user cache used by CachedTokenAuthentication, entries are dropped
+# as soon as any worker deletes a token or changes the activity, role or password of a user
+AUTH_TOKEN_CACHE_SIZE = config('AUTH_TOKEN_CACHE_SIZE', default=10000, cast=int)
+# Seconds a cached auth token is trusted, bounds staleness of the other user fields
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=60, cast=int)
+
+# Per-worker employer -> organization ids cache used to scope specialists' applications,
+# entries are dropped as soon as any worker changes organization employers
+EMPLOYER_ORGANIZATIONS_CACHE_SIZE = config('EMPLOYER_ORGANIZATIONS_CACHE_SIZE', default=10000, cast=int)
 SITE_ID = 1
@@ -1 +1,5 @@
-from .base import *
\ No newline at end of file
+from .base import *
+
+# tests change data with raw SQL or analyze tables and expect the next request to notice
+SHARED_VERSIONS_MAX_AGE = 0
+PAGINATION_TABLE_ESTIMATE_TTL = 0
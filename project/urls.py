@@ -4,17 +4,24 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import HttpResponse
 
-from rest_framework.documentation import include_docs_urls
+from common.docs import include_lazy_docs_urls
+from common.metrics import metrics_view
 
 v1 = ([
           path('', include('core.urls')),
       ], 'v1')
 
+async_v1 = ([
+                path('', include('core.async_urls')),
+            ], 'async_v1')
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include(v1)),
+    path('api/async/v1/', include(async_v1)),
     path('health', lambda request: HttpResponse(status=200)),
-    path('docs/', include_docs_urls(title='Test API', description='', public=True), name='docs'),
+    path('metrics', metrics_view),
+    path('docs/', include_lazy_docs_urls(title='Test API', description='', public=True), name='docs'),
     path('api-auth/', include('rest_framework.urls')),
     path('rest-auth/', include('rest_auth.urls')),
 ]
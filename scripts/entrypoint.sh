@@ -6,5 +6,15 @@ timeout -t 60 sh -c "until nc -z ${POSTGRES_HOST} ${POSTGRES_PORT}; do sleep 1;
 python /app/manage.py migrate
 python /app/manage.py collectstatic --no-input
 
-export GUNICORN_WORKERS=$((2 * $(nproc) + 1))
+if [ "${GUNICORN_WORKER_CLASS:-sync}" = "gthread" ]; then
+    # threads serve the concurrent requests of a worker, so one worker per core
+    export GUNICORN_WORKERS=${GUNICORN_WORKERS:-$(nproc)}
+else
+    export GUNICORN_WORKERS=${GUNICORN_WORKERS:-$((2 * $(nproc) + 1))}
+fi
+# one event loop per core serves many concurrent requests
+export ASGI_WORKERS=${ASGI_WORKERS:-$(nproc)}
+export prometheus_multiproc_dir=${prometheus_multiproc_dir:-/tmp/prometheus_multiproc}
+# metric files of both servers, those of an earlier start of the container would be added to the new ones
+rm -rf "${prometheus_multiproc_dir}" && mkdir -p "${prometheus_multiproc_dir}"
 exec "$@"
@@ -0,0 +1,40 @@
+import gc
+import os
+
+from prometheus_client import multiprocess
+
+# shared by the WSGI and ASGI servers of scripts/Procfile, emptied by scripts/entrypoint.sh before they start
+MULTIPROCESS_DIR = os.environ.get('prometheus_multiproc_dir')
+
+# Concurrency model of a deployment, command line flags of scripts/Procfile take precedence.
+# `sync` workers serve one request at a time, `gthread` workers serve GUNICORN_THREADS at once
+# (gunicorn switches sync workers to gthread when GUNICORN_THREADS is above 1)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+# import the app once in the master, forked workers then share its memory pages copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+# restart a worker after this many requests, plus up to the jitter so workers do not restart together. 0 never
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '2'))
+
+
+def pre_fork(server, worker):
+    # with a preloaded app a connection opened in the master would be inherited by every worker,
+    # whose pools drop connections of another pid, so the master keeps none open
+    if server.cfg.preload_app:
+        from django.db import connections
+        from common.db_pool.pool import close_pools
+
+        connections.close_all()
+        close_pools()
+        # objects of the master are left out of garbage collection, whose bookkeeping
+        # would otherwise write to, and so copy, their shared pages in every worker
+        gc.freeze()
+
+
+def child_exit(server, worker):
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(worker.pid, MULTIPROCESS_DIR)
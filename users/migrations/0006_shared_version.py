@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_auto_20201019_1012'),
+        ('authtoken', '0003_tokenproxy'),
+    ]
+
+    # common.shared_versions reads one row per kind of data cached by every worker. Triggers of the tables
+    # the data is read from call common_bump_shared_version('<name>'), moving the row to the next value
+    # of a sequence in the writing transaction, so the new version becomes visible with the written rows.
+    # common is not an installed app, the table is created with the first rows that need it.
+    # Cached (user, token) pairs are stale after any change of a token or a user,
+    # including queryset updates and raw SQL that send no signals
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'CREATE SEQUENCE common_shared_version_seq',
+                'CREATE TABLE common_shared_version (name varchar(64) PRIMARY KEY, version bigint NOT NULL)',
+                '''
+                CREATE FUNCTION common_bump_shared_version() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE common_shared_version SET version = nextval('common_shared_version_seq')
+                    WHERE name = TG_ARGV[0];
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                ''',
+                "INSERT INTO common_shared_version (name, version) VALUES ('auth_tokens', 0)",
+                'CREATE TRIGGER authtoken_token_bump_shared_version '
+                'AFTER UPDATE OR DELETE OR TRUNCATE ON authtoken_token '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('auth_tokens')",
+                'CREATE TRIGGER users_user_bump_shared_version '
+                'AFTER UPDATE OR DELETE OR TRUNCATE ON users_user '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('auth_tokens')",
+            ],
+            reverse_sql=[
+                'DROP TRIGGER users_user_bump_shared_version ON users_user',
+                'DROP TRIGGER authtoken_token_bump_shared_version ON authtoken_token',
+                'DROP FUNCTION common_bump_shared_version()',
+                'DROP TABLE common_shared_version',
+                'DROP SEQUENCE common_shared_version_seq',
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_shared_version'),
+    ]
+
+    # The compiled role -> permissions map of every worker is stale after any change of roles,
+    # permissions or the permissions granted to a role
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "INSERT INTO common_shared_version (name, version) VALUES ('role_permissions', 0)",
+                'CREATE TRIGGER users_role_bump_shared_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON users_role '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('role_permissions')",
+                'CREATE TRIGGER users_permission_bump_shared_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON users_permission '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('role_permissions')",
+                'CREATE TRIGGER users_role_permissions_bump_shared_version '
+                'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON users_role_permissions '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('role_permissions')",
+            ],
+            reverse_sql=[
+                'DROP TRIGGER users_role_permissions_bump_shared_version ON users_role_permissions',
+                'DROP TRIGGER users_permission_bump_shared_version ON users_permission',
+                'DROP TRIGGER users_role_bump_shared_version ON users_role',
+                "DELETE FROM common_shared_version WHERE name = 'role_permissions'",
+            ],
+        ),
+    ]
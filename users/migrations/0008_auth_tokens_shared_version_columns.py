@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_role_permissions_shared_version'),
+    ]
+
+    # Only changes of the columns authentication depends on make cached tokens stale,
+    # so saving last_login or a profile does not flush the token cache of every worker
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'DROP TRIGGER users_user_bump_shared_version ON users_user',
+                'CREATE TRIGGER users_user_bump_shared_version '
+                'AFTER DELETE OR TRUNCATE ON users_user '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('auth_tokens')",
+                'CREATE TRIGGER users_user_credentials_bump_shared_version '
+                'AFTER UPDATE OF is_active, role_id, password ON users_user FOR EACH ROW '
+                'WHEN (OLD.is_active IS DISTINCT FROM NEW.is_active OR OLD.role_id IS DISTINCT FROM NEW.role_id '
+                'OR OLD.password IS DISTINCT FROM NEW.password) '
+                "EXECUTE PROCEDURE common_bump_shared_version('auth_tokens')",
+            ],
+            reverse_sql=[
+                'DROP TRIGGER users_user_credentials_bump_shared_version ON users_user',
+                'DROP TRIGGER users_user_bump_shared_version ON users_user',
+                'CREATE TRIGGER users_user_bump_shared_version '
+                'AFTER UPDATE OR DELETE OR TRUNCATE ON users_user '
+                "FOR EACH STATEMENT EXECUTE PROCEDURE common_bump_shared_version('auth_tokens')",
+            ],
+        ),
+    ]
@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission
 
+from users.services import UserService
+
 CAN_DO_ANYTHING = 'CAN_DO_ANYTHING'
 CAN_CREATE_CLIENT_APPLICATION = 'CAN_CREATE_CLIENT_APPLICATION'
 
@@ -20,4 +22,4 @@ PARTNER_PERMISSIONS = [
 
 class CanCreateClientApplication(BasePermission):
     def has_permission(self, request, view):
-        return request.user.role.permissions.filter(codename=CAN_CREATE_CLIENT_APPLICATION).exists()
+        return UserService.has_permission(user=request.user, permission_codename=CAN_CREATE_CLIENT_APPLICATION)
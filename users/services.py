@@ -1,13 +1,124 @@
+import threading
+
 from django.contrib.auth import get_user_model
 
+from common import async_db
+from common.shared_versions import get_shared_version, get_shared_version_async
 from users import roles
+from .models import Role
 
 User = get_user_model()
 
 
+class RoleService:
+    model = Role
+
+    # (shared version, role codename -> frozenset of permission codenames), shared by the whole process
+    # and compiled again once any worker changed roles or permissions
+    _compiled = None
+    _lock = threading.Lock()
+    shared_version = 'role_permissions'
+
+    @classmethod
+    def _get_compile_querysets(cls) -> tuple:
+        return (cls.model.objects.values_list('codename', flat=True),
+                cls.model.permissions.through.objects.values_list('role_id', 'permission_id'))
+
+    @staticmethod
+    def _build(codenames, role_permissions) -> dict:
+        permissions_by_role = {codename: set() for codename in codenames}
+        for role_id, permission_id in role_permissions:
+            permissions_by_role.setdefault(role_id, set()).add(permission_id)
+
+        return {codename: frozenset(permissions) for codename, permissions in permissions_by_role.items()}
+
+    @classmethod
+    def _compile(cls) -> dict:
+        codenames, role_permissions = cls._get_compile_querysets()
+        return cls._build(codenames, role_permissions)
+
+    @classmethod
+    async def _compile_async(cls) -> dict:
+        codenames, role_permissions = cls._get_compile_querysets()
+        return cls._build(await async_db.fetch(codenames), await async_db.fetch(role_permissions))
+
+    @classmethod
+    def get_permissions_by_role(cls) -> dict:
+        # read before compiling, a change made meanwhile leaves the compiled map stale
+        version = get_shared_version(cls.shared_version)
+        compiled = cls._compiled
+        if compiled is not None and compiled[0] == version:
+            return compiled[1]
+
+        with cls._lock:
+            if cls._compiled is None or cls._compiled[0] != version:
+                cls._compiled = (version, cls._compile())
+
+            return cls._compiled[1]
+
+    @classmethod
+    async def get_permissions_by_role_async(cls) -> dict:
+        """get_permissions_by_role() for async views, recompiled through the async connection pool"""
+        version = await get_shared_version_async(cls.shared_version)
+        compiled = cls._compiled
+        if compiled is not None and compiled[0] == version:
+            return compiled[1]
+
+        # the lock is not held while awaiting, a concurrent compilation only repeats the same two queries
+        permissions_by_role = await cls._compile_async()
+        with cls._lock:
+            # another compilation stored meanwhile may be of a newer version
+            if cls._compiled is compiled:
+                cls._compiled = (version, permissions_by_role)
+
+        return permissions_by_role
+
+    @staticmethod
+    def _get_role_permissions(permissions_by_role: dict, role_codename: str) -> frozenset:
+        return permissions_by_role.get(role_codename, frozenset())
+
+    @classmethod
+    def _has_permission(cls, permissions_by_role: dict, role_codename: str, permission_codename: str) -> bool:
+        return permission_codename in cls._get_role_permissions(permissions_by_role, role_codename)
+
+    @classmethod
+    def get_permissions(cls, role_codename: str) -> frozenset:
+        return cls._get_role_permissions(cls.get_permissions_by_role(), role_codename)
+
+    @classmethod
+    def has_permission(cls, role_codename: str, permission_codename: str) -> bool:
+        return cls._has_permission(cls.get_permissions_by_role(), role_codename, permission_codename)
+
+    @classmethod
+    async def has_permission_async(cls, role_codename: str, permission_codename: str) -> bool:
+        """has_permission() for async views, recompiled through the async connection pool"""
+        return cls._has_permission(await cls.get_permissions_by_role_async(), role_codename, permission_codename)
+
+
 class UserService:
     model = User
 
+    @classmethod
+    def get_role_codename(cls, user: User) -> str:
+        # Role primary key is its codename, so there is no need to load the Role row
+        return user.role_id
+
     @classmethod
     def is_administrator_user(cls, user: User) -> bool:
-        return user.role.codename == roles.ADMINISTRATOR['codename']
+        return cls.get_role_codename(user) == roles.ADMINISTRATOR['codename']
+
+    @classmethod
+    def is_organization_specialist_user(cls, user: User) -> bool:
+        return cls.get_role_codename(user) == roles.ORGANIZATION_SPECIALIST['codename']
+
+    @classmethod
+    def is_partner_user(cls, user: User) -> bool:
+        return cls.get_role_codename(user) == roles.PARTNER['codename']
+
+    @classmethod
+    def has_permission(cls, user: User, permission_codename: str) -> bool:
+        return RoleService.has_permission(cls.get_role_codename(user), permission_codename)
+
+    @classmethod
+    async def has_permission_async(cls, user: User, permission_codename: str) -> bool:
+        return await RoleService.has_permission_async(cls.get_role_codename(user), permission_codename)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase
+
+from common import async_db, shared_versions
+from users import roles
+from users.models import Role, Permission
+from users.permissions import CAN_CREATE_CLIENT_APPLICATION, CAN_DO_ANYTHING
+from users.services import RoleService, UserService
+from users.tests.user_factory import UserFactory
+
+
+class RoleServiceTestCase(TestCase):
+    def setUp(self) -> None:
+        # the versions of another test can be the same, its compiled permissions would be reused
+        RoleService._compiled = None
+
+    def test_permissions_are_compiled_with_a_fixed_number_of_queries(self):
+        with shared_versions.read_once():
+            # the shared versions, then roles and role permissions
+            with self.assertNumQueries(3):
+                RoleService.get_permissions_by_role()
+
+            with self.assertNumQueries(0):
+                self.assertTrue(RoleService.has_permission(roles.ADMINISTRATOR['codename'], CAN_DO_ANYTHING))
+                self.assertTrue(RoleService.has_permission(roles.PARTNER['codename'], CAN_CREATE_CLIENT_APPLICATION))
+                self.assertFalse(RoleService.has_permission(roles.PARTNER['codename'], CAN_DO_ANYTHING))
+                self.assertFalse(RoleService.has_permission('UNKNOWN', CAN_DO_ANYTHING))
+
+    def test_user_permission_check_does_not_query_database(self):
+        user = UserFactory(email='user@example.com', role_id=roles.PARTNER['codename'])
+
+        with shared_versions.read_once():
+            RoleService.get_permissions_by_role()
+
+            with self.assertNumQueries(0):
+                self.assertTrue(UserService.has_permission(user=user,
+                                                           permission_codename=CAN_CREATE_CLIENT_APPLICATION))
+                self.assertTrue(UserService.is_partner_user(user=user))
+
+    def test_compiled_permissions_are_reused_while_version_does_not_change(self):
+        RoleService.get_permissions_by_role()
+
+        # only the shared versions are read
+        with self.assertNumQueries(1):
+            RoleService.get_permissions_by_role()
+
+    def test_cache_is_invalidated_given_role_permissions_change(self):
+        role = Role.objects.get(codename=roles.ORGANIZATION_SPECIALIST['codename'])
+        self.assertFalse(RoleService.has_permission(role.codename, CAN_CREATE_CLIENT_APPLICATION))
+
+        role.permissions.add(CAN_CREATE_CLIENT_APPLICATION)
+        self.assertTrue(RoleService.has_permission(role.codename, CAN_CREATE_CLIENT_APPLICATION))
+
+        role.permissions.remove(CAN_CREATE_CLIENT_APPLICATION)
+        self.assertFalse(RoleService.has_permission(role.codename, CAN_CREATE_CLIENT_APPLICATION))
+
+    def test_cache_is_invalidated_given_new_role_or_deleted_permission(self):
+        self.assertEqual(RoleService.get_permissions('AUDITOR'), frozenset())
+
+        Role.objects.create(codename='AUDITOR').permissions.add(CAN_DO_ANYTHING)
+        self.assertEqual(RoleService.get_permissions('AUDITOR'), frozenset({CAN_DO_ANYTHING}))
+
+        Permission.objects.get(codename=CAN_DO_ANYTHING).delete()
+        self.assertEqual(RoleService.get_permissions('AUDITOR'), frozenset())
+
+    def test_cache_is_invalidated_given_permission_revoked_by_another_worker(self):
+        administrator = roles.ADMINISTRATOR['codename']
+        self.assertTrue(RoleService.has_permission(administrator, CAN_CREATE_CLIENT_APPLICATION))
+
+        # raw SQL sends no signal, like a change made in another worker
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM users_role_permissions WHERE role_id = %s AND permission_id = %s',
+                           [administrator, CAN_CREATE_CLIENT_APPLICATION])
+
+        self.assertFalse(RoleService.has_permission(administrator, CAN_CREATE_CLIENT_APPLICATION))
+
+    def test_async_compilation_does_not_replace_one_stored_meanwhile(self):
+        stored = (-1, {'AUDITOR': frozenset({CAN_DO_ANYTHING})})
+
+        async def compile_while_another_is_stored():
+            RoleService._compiled = stored
+            return {}
+
+        async def get_permissions_by_role():
+            try:
+                return await RoleService.get_permissions_by_role_async()
+            finally:
+                await async_db.close_pool()
+
+        with mock.patch.object(RoleService, '_compile_async', compile_while_another_is_stored):
+            permissions_by_role = async_to_sync(get_permissions_by_role)()
+
+        # served to the request that compiled it
+        self.assertEqual(permissions_by_role, {})
+        self.assertIs(RoleService._compiled, stored)